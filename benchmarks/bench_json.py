@@ -0,0 +1,149 @@
+"""
+Measures the CPU time each JSON codec spends encoding request bodies and decoding
+Kuda's replies, on the largest payloads: the list of banks and a page of virtual
+accounts.
+
+For every installed codec (the standard library's json, orjson and msgspec), the
+benchmark reports CPU microseconds per encode and decode, the CPU time of a full
+banks_list and retrieve_all_virtual_accounts call answered in-process by a
+FakeKudaServer, and the saving against the standard library. With msgspec, the
+page of accounts is also decoded straight into typed Structs.
+
+Usage:
+    PYTHONPATH=src python benchmarks/bench_json.py --accounts 1000 --output json.json
+"""
+
+import argparse
+
+from harness import measure_allocations, measure_cpu, metadata, stub_session, write_results
+
+from pykuda.classes.json_codec import JsonCodec, MsgspecCodec, OrjsonCodec
+from pykuda.fake_server import FakeKudaServer
+from pykuda.pykuda import PyKuda
+
+
+def typed_accounts_reply():
+    """Returns msgspec Structs matching Kuda's reply to ADMIN_VIRTUAL_ACCOUNTS."""
+    import msgspec
+
+    class Account(msgspec.Struct, rename="camel"):
+        account_number: str
+        email: str | None
+        phone_number: str | None
+        last_name: str | None
+        first_name: str | None
+        middle_name: str | None
+        account_name: str | None
+        tracking_reference: str
+        creation_date: str
+        is_deleted: bool
+
+    class Accounts(msgspec.Struct, rename="camel"):
+        accounts: list[Account]
+        total_count: int
+
+    class Reply(msgspec.Struct):
+        status: bool
+        message: str
+        data: Accounts | None = None
+
+    return Reply
+
+
+def available_codecs() -> list:
+    codecs = [JsonCodec()]
+    for codec_class in (OrjsonCodec, MsgspecCodec):
+        try:
+            codecs.append(codec_class())
+        except ImportError:
+            pass
+    return codecs
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--accounts", type=int, default=1000,
+                        help="Number of virtual accounts in the retrieved page.")
+    parser.add_argument("--iterations", type=int, default=500)
+    parser.add_argument("--output", help="Path of the JSON results, stdout by default.")
+    args = parser.parse_args()
+
+    server = FakeKudaServer()
+    kuda = PyKuda(server.credentials, session=stub_session(server), json_codec=JsonCodec())
+    kuda.reference_cache = None
+    kuda.retry_budget = None
+
+    for index in range(args.accounts):
+        kuda.create_virtual_account(
+            "Bench", f"Mark{index}", "08000000000", f"bench{index}@example.com", 1,
+            "https://x/y.png",
+        )
+
+    request_data = kuda._generate_common_data("ADMIN_VIRTUAL_ACCOUNTS")
+    request_data["Data"] = {"PageSize": str(args.accounts), "PageNumber": "1"}
+    accounts_reply = kuda._http.post(
+        server.credentials["REQUEST_URL"],
+        data=kuda.codec.encode(request_data),
+        headers=kuda._generate_headers(),
+    ).content
+    banks_reply = kuda._http.post(
+        server.credentials["REQUEST_URL"],
+        data=kuda.codec.encode(kuda._generate_common_data("BANK_LIST")),
+        headers=kuda._generate_headers(),
+    ).content
+
+    results = []
+    baseline = {}
+    try:
+        for codec in available_codecs():
+            kuda.codec = codec
+            calls = {
+                "encode_request": lambda: codec.encode(request_data),
+                "decode_banks_list": lambda: codec.decode(banks_reply),
+                "decode_virtual_accounts": lambda: codec.decode(accounts_reply),
+                "banks_list": kuda.banks_list,
+                "retrieve_all_virtual_accounts": lambda: kuda.retrieve_all_virtual_accounts(
+                    page_size=args.accounts
+                ),
+            }
+            if isinstance(codec, MsgspecCodec):
+                reply_type = typed_accounts_reply()
+                calls["decode_virtual_accounts_typed"] = lambda: codec.decode(
+                    accounts_reply, reply_type
+                )
+
+            for name, call in calls.items():
+                iterations = args.iterations if name.startswith(("encode", "decode")) else max(
+                    1, args.iterations // 10
+                )
+                result = {
+                    "codec": codec.name,
+                    "operation": name,
+                    **measure_cpu(call, iterations),
+                    **measure_allocations(call, min(iterations, 50)),
+                }
+                baseline.setdefault(name, result["cpu_us_per_call"])
+                reference = baseline.get(name.removesuffix("_typed"))
+                result["cpu_saved_vs_json"] = 1 - result["cpu_us_per_call"] / reference
+                results.append(result)
+    finally:
+        kuda.close()
+        server.httpd.server_close()
+
+    write_results(
+        args.output,
+        {
+            "benchmark": "json",
+            "meta": metadata(
+                accounts=args.accounts,
+                iterations=args.iterations,
+                banks_list_bytes=len(banks_reply),
+                virtual_accounts_bytes=len(accounts_reply),
+            ),
+            "results": results,
+        },
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""
+Measures PyKuda's per-call overhead and throughput for every public ServiceType method.
+
+Each method is called against a FakeKudaServer, either in-process through a stub
+transport (the default, which isolates PyKuda's own cost: building request data,
+headers, JSON encoding and decoding and PyKudaResponse construction) or over
+loopback HTTP (`--transport server`). Calls per second and p50/p99 latencies are
+reported for sequential and concurrent calls, along with allocations per call,
+as JSON that can be compared across releases.
+
+Usage:
+    PYTHONPATH=src python benchmarks/bench_service_type.py --output results.json
+"""
+
+import argparse
+
+from harness import measure, measure_allocations, metadata, stub_session, write_results
+
+from pykuda.fake_server import FakeKudaServer
+from pykuda.pykuda import PyKuda
+
+ACCOUNT_NUMBER = "0123456789"
+BANK_CODE = "000014"
+
+METHODS = {
+    "banks_list": lambda kuda, ref: kuda.banks_list(),
+    "create_virtual_account": lambda kuda, ref: kuda.create_virtual_account(
+        "Ogbeni", "Lagbaja", "08011122233", "ogbeni@example.com", 1, "https://x/y.png"
+    ),
+    "upgrade_virtual_account": lambda kuda, ref: kuda.upgrade_virtual_account(
+        ref, 1, "https://x/y.png"
+    ),
+    "virtual_account_balance": lambda kuda, ref: kuda.virtual_account_balance(ref),
+    "main_account_balance": lambda kuda, ref: kuda.main_account_balance(),
+    "fund_virtual_account": lambda kuda, ref: kuda.fund_virtual_account(
+        ref, "1", "Benchmark"
+    ),
+    "withdraw_from_virtual_account": lambda kuda, ref: kuda.withdraw_from_virtual_account(
+        ref, "1", "Benchmark"
+    ),
+    "confirm_transfer_recipient": lambda kuda, ref: kuda.confirm_transfer_recipient(
+        ACCOUNT_NUMBER, BANK_CODE
+    ),
+    "send_funds_from_main_account": lambda kuda, ref: kuda.send_funds_from_main_account(
+        "2000000000", BANK_CODE, ACCOUNT_NUMBER, "Beneficiary", "1", "Benchmark", "session", "Sender"
+    ),
+    "send_funds_from_virtual_account": lambda kuda, ref: kuda.send_funds_from_virtual_account(
+        ref, BANK_CODE, ACCOUNT_NUMBER, "Beneficiary", "1", "Benchmark", "session", "Sender"
+    ),
+    "billers": lambda kuda, ref: kuda.billers("airtime"),
+    "verify_bill_customer": lambda kuda, ref: kuda.verify_bill_customer(
+        "KD-VTU-MTNNG", "08030001234"
+    ),
+    "virtual_account_purchase_bill": lambda kuda, ref: kuda.virtual_account_purchase_bill(
+        "1", "KD-VTU-MTNNG", "08030001234", ref
+    ),
+    "admin_purchase_bill": lambda kuda, ref: kuda.admin_purchase_bill(
+        "1", "KD-VTU-MTNNG", "08030001234", ref, "Ogbeni"
+    ),
+    "disable_virtual_account": lambda kuda, ref: kuda.disable_virtual_account(ref),
+    "enable_virtual_account": lambda kuda, ref: kuda.enable_virtual_account(ref),
+    "retrieve_single_virtual_account": lambda kuda, ref: kuda.retrieve_single_virtual_account(
+        ref
+    ),
+    "retrieve_all_virtual_accounts": lambda kuda, ref: kuda.retrieve_all_virtual_accounts(),
+    "update_virtual_account_name": lambda kuda, ref: kuda.update_virtual_account_name(
+        ref, "Ogbeni", "Lagbaja"
+    ),
+    "update_virtual_account_email": lambda kuda, ref: kuda.update_virtual_account_email(
+        ref, "lagbaja@example.com"
+    ),
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--transport", choices=["stub", "server"], default="stub")
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=0.0,
+                        help="Server latency in seconds, for --transport server.")
+    parser.add_argument("--methods", nargs="*", choices=sorted(METHODS))
+    parser.add_argument("--output", help="Path of the JSON results, stdout by default.")
+    args = parser.parse_args()
+
+    server = FakeKudaServer(latency=args.latency, main_balance=10**15)
+    if args.transport == "server":
+        server.start()
+        kuda = PyKuda(server.credentials, pool_maxsize=args.concurrency)
+    else:
+        kuda = PyKuda(server.credentials, session=stub_session(server))
+
+    # Caches would hide the cost of the request path being measured.
+    kuda.reference_cache = None
+
+    tracking_reference = kuda.create_virtual_account(
+        "Bench", "Mark", "08000000000", "bench@example.com", 1, "https://x/y.png"
+    ).data["tracking_reference"]
+    kuda.fund_virtual_account(tracking_reference, str(10**12), "Benchmark float")
+
+    results = []
+    try:
+        for name in args.methods or METHODS:
+            method = METHODS[name]
+
+            def call():
+                return method(kuda, tracking_reference)
+
+            call()  # Warm up.
+            for mode, concurrency in (("sequential", 1), ("concurrent", args.concurrency)):
+                results.append(
+                    {
+                        "method": name,
+                        "mode": mode,
+                        "concurrency": concurrency,
+                        **measure(call, args.iterations, concurrency),
+                    }
+                )
+            results[-2].update(measure_allocations(call, min(args.iterations, 200)))
+    finally:
+        kuda.close()
+        if args.transport == "server":
+            server.stop()
+        else:
+            server.httpd.server_close()
+
+    write_results(
+        args.output,
+        {
+            "benchmark": "service_type",
+            "meta": metadata(
+                transport=args.transport,
+                iterations=args.iterations,
+                concurrency=args.concurrency,
+                latency=args.latency,
+            ),
+            "results": results,
+        },
+    )
+
+
+if __name__ == "__main__":
+    main()
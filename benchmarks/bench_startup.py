@@ -0,0 +1,99 @@
+"""
+Measures PyKuda's cold start, as paid by short-lived processes such as serverless
+functions: the time to import pykuda, to construct PyKuda and to send the first
+request, each in a fresh interpreter.
+
+Every run starts a new Python process, which imports PyKuda, constructs it with
+credentials pointing at a FakeKudaServer running in this process, and calls
+main_account_balance over loopback HTTP. The median and p90 of each phase, of
+the whole process, and the number of modules loaded after the import, are
+reported as JSON.
+
+Usage:
+    PYTHONPATH=src python benchmarks/bench_startup.py --runs 20 --output startup.json
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from harness import metadata, percentile, write_results
+
+from pykuda.fake_server import FakeKudaServer
+
+CHILD = """
+import json, sys, time
+start = time.perf_counter()
+from pykuda.pykuda import PyKuda
+imported = time.perf_counter()
+modules = len(sys.modules)
+kuda = PyKuda(json.loads(sys.argv[1]))
+constructed = time.perf_counter()
+response = kuda.main_account_balance()
+called = time.perf_counter()
+assert not response.error, response
+print(json.dumps({
+    "import_ms": (imported - start) * 1000,
+    "construct_ms": (constructed - imported) * 1000,
+    "first_call_ms": (called - constructed) * 1000,
+    "modules_after_import": modules,
+}))
+"""
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--output", help="Path of the JSON results, stdout by default.")
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    src = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [src, env.get("PYTHONPATH")]))
+
+    samples = []
+    with FakeKudaServer() as server:
+        credentials = json.dumps(server.credentials)
+        for _ in range(args.runs):
+            start = time.perf_counter()
+            output = subprocess.run(
+                [sys.executable, "-c", CHILD, credentials],
+                env=env,
+                capture_output=True,
+                check=True,
+                text=True,
+            ).stdout
+            sample = json.loads(output)
+            sample["process_ms"] = (time.perf_counter() - start) * 1000
+            samples.append(sample)
+
+    results = []
+    for phase in ("import_ms", "construct_ms", "first_call_ms", "process_ms"):
+        values = [sample[phase] for sample in samples]
+        results.append(
+            {
+                "phase": phase.removesuffix("_ms"),
+                "p50_ms": statistics.median(values),
+                "p90_ms": percentile(values, 0.90),
+            }
+        )
+
+    write_results(
+        args.output,
+        {
+            "benchmark": "startup",
+            "meta": metadata(
+                runs=args.runs,
+                modules_after_import=samples[-1]["modules_after_import"],
+            ),
+            "results": results,
+        },
+    )
+
+
+if __name__ == "__main__":
+    main()
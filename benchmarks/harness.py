@@ -0,0 +1,166 @@
+"""
+Shared helpers for the PyKuda benchmarks.
+
+Run the benchmarks from the repository root with the package on the path, e.g.
+    PYTHONPATH=src python benchmarks/bench_service_type.py --output results.json
+"""
+
+import json
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from http import HTTPStatus
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import BaseAdapter
+from requests.structures import CaseInsensitiveDict
+
+from pykuda.fake_server import FakeKudaServer
+
+
+class StubAdapter(BaseAdapter):
+    """
+    A requests transport adapter that answers requests in-process with a
+    FakeKudaServer, so benchmarks measure PyKuda's own overhead without sockets.
+    """
+
+    def __init__(self, server: FakeKudaServer):
+        super().__init__()
+        self.server = server
+
+    def send(self, request, **kwargs):
+        body = request.body or b""
+        if isinstance(body, str):
+            body = body.encode()
+
+        status, content_type, payload = self.server.handle(
+            urlsplit(request.url).path, request.headers, body
+        )
+
+        response = requests.Response()
+        response.status_code = status
+        response.reason = HTTPStatus(status).phrase
+        response.headers = CaseInsensitiveDict({"content-type": content_type})
+        response._content = payload
+        response.encoding = "utf-8"
+        response.url = request.url
+        response.request = request
+        return response
+
+    def close(self):
+        pass
+
+
+def stub_session(server: FakeKudaServer) -> requests.Session:
+    """Returns a session whose requests are all answered by `server` in-process."""
+    session = requests.Session()
+    adapter = StubAdapter(server)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def percentile(samples: list[float], fraction: float) -> float:
+    """Returns the `fraction` percentile of `samples` (nearest rank)."""
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(fraction * len(ordered)) - 1))
+    return ordered[index]
+
+
+def measure(call, iterations: int, concurrency: int = 1) -> dict:
+    """
+    Calls `call` `iterations` times, across `concurrency` threads.
+
+    Returns:
+        dict: calls, calls_per_sec, p50_ms, p99_ms and mean_ms.
+    """
+
+    def timed(_):
+        start = time.perf_counter()
+        call()
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    if concurrency == 1:
+        samples = [timed(None) for _ in range(iterations)]
+    else:
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            samples = list(executor.map(timed, range(iterations)))
+    elapsed = time.perf_counter() - start
+
+    return {
+        "calls": iterations,
+        "calls_per_sec": iterations / elapsed,
+        "p50_ms": percentile(samples, 0.50) * 1000,
+        "p99_ms": percentile(samples, 0.99) * 1000,
+        "mean_ms": statistics.fmean(samples) * 1000,
+    }
+
+
+def measure_cpu(call, iterations: int) -> dict:
+    """
+    Calls `call` `iterations` times on the current thread.
+
+    Returns:
+        dict: Mean CPU microseconds per call, as measured by time.process_time.
+    """
+    call()  # Warm up.
+    start = time.process_time()
+    for _ in range(iterations):
+        call()
+    return {"cpu_us_per_call": (time.process_time() - start) / iterations * 1e6}
+
+
+def measure_allocations(call, iterations: int) -> dict:
+    """
+    Calls `call` `iterations` times under tracemalloc.
+
+    Returns:
+        dict: Mean peak bytes allocated during a call, and mean memory blocks
+        still allocated after a call.
+    """
+    call()  # Warm up caches and lazy imports before tracing.
+    tracemalloc.start()
+    try:
+        peaks = []
+        blocks_before = sys.getallocatedblocks()
+        for _ in range(iterations):
+            tracemalloc.reset_peak()
+            current, _ = tracemalloc.get_traced_memory()
+            call()
+            peaks.append(tracemalloc.get_traced_memory()[1] - current)
+        blocks_after = sys.getallocatedblocks()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "alloc_peak_bytes_per_call": statistics.fmean(peaks),
+        "retained_blocks_per_call": (blocks_after - blocks_before) / iterations,
+    }
+
+
+def metadata(**extra) -> dict:
+    """Returns information about the environment the benchmark ran in."""
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "requests": requests.__version__,
+        **extra,
+    }
+
+
+def write_results(path: str | None, results: dict) -> None:
+    """Writes `results` as JSON to `path`, or to stdout if no path is given."""
+    content = json.dumps(results, indent=2)
+    if path:
+        with open(path, "w", encoding="utf-8") as file:
+            file.write(content + "\n")
+    else:
+        print(content)
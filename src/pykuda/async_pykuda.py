@@ -0,0 +1,383 @@
+import asyncio
+import time
+from functools import partial
+
+try:
+    import httpx
+except ImportError:  # pragma: no cover
+    httpx = None
+
+from pykuda.classes.circuit_breaker import TOKEN_CIRCUIT, CircuitBreakers
+from pykuda.classes.json_codec import JsonCodec
+from pykuda.classes.py_kuda_response import PyKudaResponse
+from pykuda.classes.rate_limiter import TokenBucket
+from pykuda.classes.reference_cache import ReferenceCache
+from pykuda.classes.retry_policy import RetryBudget, RetryPolicy
+from pykuda.classes.service_type import ServiceType
+from pykuda.classes.token_cache import TokenCache
+from pykuda.constants import (
+    HTTP_REQUEST_TIMEOUT,
+    POOL_MAXSIZE,
+    REFERENCE_DATA_TTL,
+    TOKEN_REFRESH_MARGIN,
+    TOKEN_TTL,
+)
+from pykuda.utils import check_envs_are_set
+
+
+class AsyncPyKuda(ServiceType):
+    """
+    AsyncPyKuda is the asyncio counterpart of PyKuda.
+
+    It exposes the same methods as ServiceType (banks_list, fund_virtual_account,
+    send_funds_from_main_account, ...), which build their request data exactly as
+    they do for PyKuda and parse Kuda's reply with the same REQUEST_SPECS table.
+    Only the HTTP layer differs: every method returns a coroutine that has to be
+    awaited, and requests are sent through a shared httpx.AsyncClient pool.
+
+    Example:
+        async with AsyncPyKuda(credentials) as kuda:
+            response = await kuda.banks_list()
+    """
+
+    def __init__(
+        self,
+        credentials: dict | None = None,
+        token_ttl: float | None = TOKEN_TTL,
+        token_refresh_margin: float = TOKEN_REFRESH_MARGIN,
+        client: "httpx.AsyncClient | None" = None,
+        max_connections: int = POOL_MAXSIZE,
+        reference_data_ttl: float | None = REFERENCE_DATA_TTL,
+        reference_cache: ReferenceCache | None = None,
+        instruments: list | None = None,
+        retry_policy: RetryPolicy | None = None,
+        retry_policies: dict | None = None,
+        retry_budget: RetryBudget | None = None,
+        rate_limit: TokenBucket | None = None,
+        rate_limits: dict | None = None,
+        circuit_breakers: CircuitBreakers | None = None,
+        json_codec: JsonCodec | None = None,
+    ):
+        """
+        Initializes the AsyncPyKuda instance with the provided credentials.
+
+        Args:
+            credentials (dict | None): A dictionary of credentials, or None if
+                                       the credentials are to be fetched from
+                                       the environment variables.
+            token_ttl (float | None): Number of seconds a generated token is reused
+                                      for. None generates a new token for every request.
+            token_refresh_margin (float): Number of seconds before expiry at which
+                                          the token is refreshed ahead of time.
+            client (httpx.AsyncClient | None): A client to send requests with. If
+                                               None, AsyncPyKuda creates and owns one.
+            max_connections (int): Maximum number of connections in the pool.
+            reference_data_ttl (float | None): Number of seconds the list of banks and
+                                               billers is cached in memory for. None
+                                               disables the cache.
+            reference_cache (ReferenceCache | None): A reference cache to use instead,
+                                                     e.g. one with a FileBackend.
+            instruments (list | None): Instrumentation hooks called around every request.
+            retry_policy (RetryPolicy | None): Retry policy of every service type,
+                                               see PyKuda. None uses RetryPolicy().
+            retry_policies (dict | None): Retry policies per ServiceTypeConstants.
+            retry_budget (RetryBudget | None): Caps retries to a share of requests.
+                                               None creates a RetryBudget().
+            rate_limit (TokenBucket | None): Paces requests of every service type without
+                                             its own bucket, see PyKuda.
+            rate_limits (dict | None): Token buckets per ServiceTypeConstants.
+            circuit_breakers (CircuitBreakers | None): Circuit breakers per service
+                                                       type, see PyKuda.
+            json_codec (JsonCodec | None): Encodes and decodes request and response
+                                           bodies. None uses the fastest installed codec.
+
+        Raises:
+            ImportError: If httpx is not installed.
+            ValueError: If the environmental variables or credentials are not properly set.
+        """
+        if httpx is None:
+            raise ImportError(
+                "AsyncPyKuda requires httpx, please install it with `pip install httpx`."
+            )
+
+        response = check_envs_are_set(credentials)
+
+        if not isinstance(response, dict):
+            raise ValueError(response)
+
+        self.credentials = response
+
+        self.token_cache = (
+            TokenCache(ttl=token_ttl, refresh_margin=token_refresh_margin)
+            if token_ttl
+            else None
+        )
+
+        if reference_cache is None and reference_data_ttl:
+            reference_cache = ReferenceCache(ttl=reference_data_ttl)
+        self.reference_cache = reference_cache
+
+        self.instruments = tuple(instruments or ())
+
+        self._configure_retries(retry_policy, retry_policies, retry_budget)
+        self._configure_rate_limits(rate_limit, rate_limits)
+        self.circuit_breakers = circuit_breakers
+        self.codec = json_codec
+
+        # Clients passed in by the caller are not closed by AsyncPyKuda.
+        self._owns_client = client is None
+        self.client = (
+            client
+            if client is not None
+            else httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=max_connections,
+                    max_keepalive_connections=max_connections,
+                )
+            )
+        )
+
+    @property
+    def _retryable_exceptions(self) -> tuple:
+        """Transport errors that may be retried, see RetryPolicy.retry_timeouts."""
+        return (httpx.TransportError,)
+
+    @staticmethod
+    def _is_unsent_error(exc: Exception) -> bool:
+        """
+        Checks whether a transport error was raised before the request reached Kuda,
+        i.e. the connection could not be established.
+        """
+        return isinstance(exc, (httpx.ConnectError, httpx.ConnectTimeout))
+
+    async def _cached_reference_data(self, key: str, fetch) -> PyKudaResponse:
+        """
+        Asynchronous version of ServiceType._cached_reference_data.
+
+        Args:
+            key (str): The cache key of the reference data.
+            fetch (Callable): A coroutine function making the request for the
+                reference data.
+
+        Returns:
+            PyKudaResponse: The cached or fetched reference data.
+        """
+        if self.reference_cache is None:
+            return await fetch()
+        return await self.reference_cache.aget(key, fetch)
+
+    async def bank_name(self, bank_code: str) -> str | None:
+        """
+        Asynchronous version of ServiceType.bank_name.
+
+        Args:
+            bank_code (str): Code of the bank.
+
+        Returns:
+            str | None: Name of the bank, or None if the code is unknown or the
+            list of banks could not be retrieved.
+        """
+        return self._bank_name_from(await self.banks_list(), bank_code)
+
+    async def _get_token(self) -> "httpx.Response":
+        """
+        Generates a token from KUDA's TOKEN URL.
+
+        Returns:
+            The response of the token request.
+        """
+        return await self.client.post(
+            self.credentials["TOKEN_URL"],
+            json={
+                "email": self.credentials["EMAIL"],
+                "apiKey": self.credentials["KUDA_KEY"],
+            },
+            headers={"content-type": "application/json"},
+            timeout=10,
+        )
+
+    async def _generate_headers(self) -> "httpx.Response | dict":
+        """
+        Generates headers for requests, reusing the cached token when possible.
+
+        Returns:
+            A dictionary containing headers for API requests or a response object.
+        """
+        breaker = self._circuit_breaker(TOKEN_CIRCUIT)
+        fetch = (
+            self._get_token
+            if breaker is None
+            else partial(breaker.acall, self._get_token)
+        )
+
+        if self.token_cache is None:
+            response = await fetch()
+            token = response.text if response.status_code == 200 else response
+        else:
+            token = await self.token_cache.aget(fetch)
+
+        return self._token_headers(token)
+
+    async def _post_request(
+        self, data: dict, headers: dict, delivery: dict | None = None
+    ) -> "httpx.Response":
+        """
+        Sends a request to KUDA's REQUEST URL, retrying once with a new token on a 401.
+
+        Args:
+            data (dict): Request data for the API call.
+            headers (dict): Headers generated by _generate_headers.
+            delivery (dict | None): See _mark_sent.
+
+        Returns:
+            The response object of the request.
+        """
+        body = self.codec.encode(data)
+        try:
+            response = await self.client.post(
+                self.credentials["REQUEST_URL"],
+                content=body,
+                headers=headers,
+                timeout=HTTP_REQUEST_TIMEOUT,
+            )
+        except Exception as exc:
+            self._mark_sent(delivery, exc)
+            raise
+        self._mark_sent(delivery)
+
+        if response.status_code == 401 and self.token_cache is not None:
+            self.token_cache.invalidate(
+                headers["Authorization"].removeprefix("bearer ")
+            )
+            headers = await self._generate_headers()
+
+            if isinstance(headers, dict):
+                response = await self.client.post(
+                    self.credentials["REQUEST_URL"],
+                    content=body,
+                    headers=headers,
+                    timeout=HTTP_REQUEST_TIMEOUT,
+                )
+
+        return response
+
+    async def _request(
+        self, data: dict, delivery: dict | None = None
+    ) -> PyKudaResponse:
+        """
+        Sends a request to KUDA's REQUEST URL and parses the response.
+
+        Args:
+            data (dict): Request data for the API call, including its serviceType.
+            delivery (dict | None): If set, its "sent" key is set to True once the
+                request may have reached Kuda, see _mark_sent.
+
+        Returns:
+            A PyKudaResponse object with the parsed data or an error message.
+        """
+        if self.instruments:
+            return await self._instrumented_request(data, delivery)
+
+        return self._reply(data, *await self._send(data, delivery=delivery))
+
+    async def _send(
+        self, data: dict, timings: dict | None = None, delivery: dict | None = None
+    ) -> tuple:
+        """
+        Asynchronous version of ServiceTypeUtils._send, taking the same decisions
+        through the same helpers.
+
+        A token bucket that blocks on IO, such as a FileTokenBucket, is reserved
+        in a worker thread so the event loop is not blocked.
+
+        Args:
+            data (dict): Request data for the API call, including its serviceType.
+            timings (dict | None): If set, seconds spent generating headers ("token")
+                and sending the request ("send") are added to it.
+            delivery (dict | None): See _request.
+
+        Returns:
+            tuple: The last response, whether it is the reply to the request (False
+            if generating the token failed) and the number of retries.
+
+        Raises:
+            CircuitOpenError: If the circuit of the service type or the token is open.
+        """
+        policy, bucket, breaker = self._start_send(data["serviceType"])
+
+        attempt = 1
+        while True:
+            if bucket is not None:
+                wait = (
+                    await asyncio.to_thread(bucket.reserve)
+                    if bucket.blocking
+                    else bucket.reserve()
+                )
+                if wait:
+                    await asyncio.sleep(wait)
+            posted = False
+            try:
+                start = time.perf_counter()
+                headers = await self._generate_headers()
+                self._add_timing(timings, "token", start)
+
+                if isinstance(headers, dict):
+                    start = time.perf_counter()
+                    posted = True
+                    response = await (
+                        self._post_request(data, headers, delivery)
+                        if breaker is None
+                        else breaker.acall(self._post_request, data, headers, delivery)
+                    )
+                    self._add_timing(timings, "send", start)
+                    sent = True
+                else:
+                    response, sent = headers, False
+
+                if not self._retries_response(policy, attempt, response):
+                    return response, sent, attempt - 1
+            except self._retryable_exceptions as exc:
+                if not self._retries_exception(policy, attempt, exc, posted):
+                    raise
+
+            await asyncio.sleep(policy.delay(attempt))
+            attempt += 1
+
+    async def _instrumented_request(
+        self, data: dict, delivery: dict | None = None
+    ) -> PyKudaResponse:
+        """
+        Same as _request, timing each phase and reporting it to the registered instruments.
+
+        Args:
+            data (dict): Request data for the API call, including its serviceType.
+            delivery (dict | None): See _request.
+
+        Returns:
+            A PyKudaResponse object with the parsed data or an error message.
+        """
+        event = self._start_event(data)
+        try:
+            response, sent, event.retries = await self._send(
+                data, event.timings, delivery
+            )
+            return self._finish_event(event, data, response, sent)
+        except Exception as exc:
+            event.exception = exc
+            event.error = True
+            raise
+        finally:
+            self._emit("after_request", event)
+
+    async def aclose(self) -> None:
+        """
+        Closes the HTTP client and its pooled connections, if AsyncPyKuda created it.
+        """
+        if self._owns_client:
+            await self.client.aclose()
+
+    async def __aenter__(self) -> "AsyncPyKuda":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
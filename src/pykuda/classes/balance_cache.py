@@ -0,0 +1,144 @@
+import copy
+import threading
+from typing import Callable, Hashable
+
+from pykuda.classes.py_kuda_response import PyKudaResponse
+from pykuda.classes.ttl_cache import TTLCache
+from pykuda.constants import BALANCE_TTL, TTL_CACHE_MAXSIZE
+
+
+class _Flight:
+    """A balance request in flight, awaited by the callers asking for it meanwhile."""
+
+    __slots__ = ("done", "response", "exception", "stale")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.response = None
+        self.exception = None
+        self.stale = False
+
+
+class BalanceCache:
+    """
+    A cache of balance snapshots that coalesces concurrent requests.
+
+    Snapshots are served for `ttl` seconds. When there is none, the first caller
+    requests the balance while callers asking for the same account meanwhile wait
+    for its response instead of sending their own (single-flight). Failed
+    responses are shared with the waiting callers but never cached.
+
+    Snapshots are invalidated when money moves in or out of the account. A
+    request that was in flight when its account was invalidated is not cached,
+    since it may predate the movement.
+
+    Every caller gets its own copy of the balance, so modifying it does not
+    affect the snapshot or the other callers.
+
+    Attributes:
+        ttl (float): Number of seconds a snapshot is served for.
+        hits (int): Number of lookups served with a snapshot.
+        misses (int): Number of lookups that requested the balance.
+        coalesced (int): Number of lookups that waited on another caller's request.
+    """
+
+    def __init__(self, ttl: float = BALANCE_TTL, maxsize: int = TTL_CACHE_MAXSIZE):
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self._snapshots = TTLCache(ttl=ttl, maxsize=maxsize)
+        self._flights = {}
+        self._lock = threading.Lock()
+
+    def get(
+        self, key: Hashable, fetch: Callable[[], PyKudaResponse]
+    ) -> PyKudaResponse:
+        """
+        Returns the balance snapshot of an account, requesting it when there is none.
+
+        Args:
+            key (Hashable): The tracking reference of a virtual account, or
+                constants.MAIN_ACCOUNT.
+            fetch (Callable): A callable making the balance request.
+
+        Returns:
+            PyKudaResponse: The snapshot, or the response of `fetch`.
+        """
+        balance = self._snapshots.get(key)
+        if balance is not None:
+            self.hits += 1
+            return PyKudaResponse(status_code=200, data=copy.copy(balance))
+
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+                self.misses += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            flight.done.wait()
+            if flight.exception is not None:
+                raise flight.exception
+            response = flight.response
+            return PyKudaResponse(
+                status_code=response.status_code,
+                data=copy.copy(response.data),
+                error=response.error,
+                retries=response.retries,
+            )
+
+        try:
+            response = fetch()
+            # Parsed before it is shared with the waiting callers.
+            if not response.error:
+                with self._lock:
+                    if not flight.stale:
+                        self._snapshots.set(key, copy.copy(response.data))
+            flight.response = response
+            return response
+        except Exception as exc:
+            flight.exception = exc
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+
+    def invalidate(self, key: Hashable) -> None:
+        """
+        Drops the snapshot of an account, e.g. after it was funded.
+
+        Args:
+            key (Hashable): The tracking reference of a virtual account, or
+                constants.MAIN_ACCOUNT.
+        """
+        with self._lock:
+            self._snapshots.invalidate(key)
+            flight = self._flights.get(key)
+            if flight is not None:
+                flight.stale = True
+
+    def clear(self) -> None:
+        """Drops every snapshot."""
+        with self._lock:
+            self._snapshots.clear()
+            for flight in self._flights.values():
+                flight.stale = True
+
+    def stats(self) -> dict:
+        """
+        Returns the cache counters.
+
+        Returns:
+            dict: The number of hits, misses, coalesced lookups and snapshots.
+        """
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "size": len(self._snapshots),
+        }
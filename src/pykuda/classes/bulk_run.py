@@ -0,0 +1,176 @@
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Any, Callable, Hashable, Iterable, Iterator
+
+from pykuda.classes.py_kuda_response import PyKudaResponse
+from pykuda.utils import run_concurrently
+
+
+@dataclass
+class BulkSummary:
+    """
+    Counters for a bulk run, updated as results stream in.
+
+    Attributes:
+        total (int): Number of items processed so far.
+        succeeded (int): Number of items whose response is not an error.
+        failed (int): Number of items whose response is an error.
+        failures_by_status (dict): Number of failed items per status code.
+        skipped (int): Number of items not run, e.g. already done by an earlier run.
+        elapsed (float): Seconds elapsed since the run started.
+    """
+
+    total: int = 0
+    succeeded: int = 0
+    failed: int = 0
+    failures_by_status: dict = field(default_factory=dict)
+    skipped: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def throughput(self) -> float:
+        """Number of items processed per second."""
+        return self.total / self.elapsed if self.elapsed else 0.0
+
+    def record(self, response: PyKudaResponse) -> None:
+        """
+        Records the response of a single item.
+
+        Args:
+            response (PyKudaResponse): The response of the item.
+        """
+        self.total += 1
+        if response.error:
+            self.failed += 1
+            self.failures_by_status[response.status_code] = (
+                self.failures_by_status.get(response.status_code, 0) + 1
+            )
+        else:
+            self.succeeded += 1
+
+
+class BulkRun:
+    """
+    A bulk run that calls a function on every item with bounded concurrency.
+
+    Iterating over the run streams `(item, PyKudaResponse)` tuples as each item
+    finishes, while `summary` is kept up to date. Nothing is sent until the run
+    is iterated or waited on. Items for which `skip` returns True are not run,
+    only counted in `summary.skipped`. `on_finish` is called once the run is
+    over, whether it ran to the end, failed or was abandoned, e.g. to close a
+    file the run opened.
+    """
+
+    def __init__(
+        self,
+        func: Callable[[Any], PyKudaResponse],
+        items: Iterable,
+        concurrency: int,
+        skip: Callable[[Any], bool] | None = None,
+        on_finish: Callable[[], None] | None = None,
+    ):
+        self.summary = BulkSummary()
+        self._func = func
+        self._items = items
+        self._concurrency = concurrency
+        self._skip = skip
+        self._on_finish = on_finish
+
+    def _pending_items(self) -> Iterator:
+        for item in self._items:
+            if self._skip is not None and self._skip(item):
+                self.summary.skipped += 1
+                continue
+            yield item
+
+    def __iter__(self) -> Iterator[tuple[Any, PyKudaResponse]]:
+        start = time.perf_counter()
+        try:
+            for item, response in run_concurrently(
+                self._func, self._pending_items(), self._concurrency
+            ):
+                self.summary.record(response)
+                self.summary.elapsed = time.perf_counter() - start
+                yield item, response
+        finally:
+            if self._on_finish is not None:
+                self._on_finish()
+
+    def wait(self) -> BulkSummary:
+        """
+        Runs every remaining item, discarding the responses.
+
+        Returns:
+            BulkSummary: The summary of the run.
+        """
+        for _ in self:
+            pass
+        return self.summary
+
+
+class RunMemo:
+    """
+    Remembers the responses of requests repeated within a bulk run, e.g. the
+    verification of a customer paid several times.
+
+    The first caller asking for a key makes the request, and callers asking for
+    it meanwhile wait for its response instead of sending their own. Responses
+    are kept for the lifetime of the memo, errors included, while a request that
+    raised is made again by the next caller.
+
+    Attributes:
+        hits (int): Number of lookups served with a remembered or in-flight response.
+        misses (int): Number of lookups that made the request.
+    """
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self._responses = {}
+        self._lock = threading.Lock()
+
+    def get(
+        self, key: Hashable, fetch: Callable[[], PyKudaResponse]
+    ) -> PyKudaResponse:
+        """
+        Returns the response remembered for a key, making the request if there is none.
+
+        Args:
+            key (Hashable): Identifies the request within the run.
+            fetch (Callable): A callable making the request.
+
+        Returns:
+            PyKudaResponse: The remembered response, or the response of `fetch`.
+        """
+        with self._lock:
+            future = self._responses.get(key)
+            leader = future is None
+            if leader:
+                future = self._responses[key] = Future()
+                self.misses += 1
+            else:
+                self.hits += 1
+
+        if not leader:
+            return future.result()
+
+        try:
+            response = fetch()
+        except BaseException as exc:
+            with self._lock:
+                del self._responses[key]
+            future.set_exception(exc)
+            raise
+        future.set_result(response)
+        return response
+
+    def stats(self) -> dict:
+        """
+        Returns the memo counters.
+
+        Returns:
+            dict: The number of hits, misses and remembered responses.
+        """
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._responses)}
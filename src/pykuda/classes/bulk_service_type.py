@@ -0,0 +1,715 @@
+import logging
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Iterable, Iterator
+
+from pykuda.classes.bulk_run import BulkRun, RunMemo
+from pykuda.classes.circuit_breaker import CircuitOpenError
+from pykuda.classes.journal import SUCCEEDED
+from pykuda.classes.provisioning_checkpoint import ProvisioningCheckpoint
+from pykuda.classes.py_kuda_response import PyKudaResponse
+from pykuda.classes.service_type import ServiceType
+from pykuda.utils import run_concurrently
+from pykuda.constants import (
+    BULK_CONCURRENCY,
+    LEDGER_DRIFT_CHECK_INTERVAL,
+    LEDGER_DRIFT_SAMPLE_SIZE,
+    MAIN_ACCOUNT,
+    VIRTUAL_ACCOUNTS_PAGE_SIZE,
+    VIRTUAL_ACCOUNTS_PREFETCH,
+)
+
+logger = logging.getLogger("pykuda")
+
+
+class BulkServiceType(ServiceType):
+    """
+    This class adds bulk operations on top of ServiceType, running many Kuda
+    requests with bounded concurrency over the shared connection pool.
+    """
+
+    _drift_checks = None
+
+    def bulk_transfer(
+        self, rows: Iterable[dict], concurrency: int = BULK_CONCURRENCY
+    ) -> BulkRun:
+        """
+        Confirms the recipient of and sends funds to every beneficiary in `rows`.
+
+        Each row goes through confirm_transfer_recipient and then
+        send_funds_from_virtual_account when it has a tracking_reference, or
+        send_funds_from_main_account otherwise. Rows are read lazily and up to
+        `concurrency` rows are in flight at once.
+
+        Args:
+            rows (Iterable[dict]): Beneficiaries to pay, each with the keys:
+                - "beneficiary_account_number" (str): Account number of the recipient.
+                - "beneficiary_bank_code" (str): Bank code of the recipient's bank.
+                - "amount" (str): Amount to be transferred.
+                - "narration" (str): Description of the transaction.
+                - "sender_name" (str): Name of the sender.
+                - "tracking_reference" (str, optional): Tracking reference of the
+                  virtual account to send from. Defaults to the main account.
+            concurrency (int): Maximum number of rows processed at once.
+
+        Returns:
+            BulkRun: Iterate over it to get `(row, PyKudaResponse)` tuples as each
+            row finishes. A failed name enquiry is returned as the row's response.
+            `BulkRun.summary` holds throughput and failure counts.
+        """
+        return BulkRun(self._transfer_row, rows, concurrency)
+
+    def _transfer_row(self, row: dict) -> PyKudaResponse:
+        """
+        Confirms the recipient of a single bulk_transfer row and sends the funds.
+
+        Args:
+            row (dict): A row passed to bulk_transfer.
+
+        Returns:
+            PyKudaResponse: The response of the transfer, or of the name enquiry if it failed.
+        """
+        import requests  # Already loaded by the request path, see utils.
+
+        tracking_reference = row.get("tracking_reference")
+
+        try:
+            recipient = self.confirm_transfer_recipient(
+                beneficiary_account_number=row["beneficiary_account_number"],
+                beneficiary_bank_code=row["beneficiary_bank_code"],
+                tracking_reference=tracking_reference,
+            )
+            if recipient.error:
+                return recipient
+
+            transfer = {
+                "beneficiary_bank_code": row["beneficiary_bank_code"],
+                "beneficiary_account_number": row["beneficiary_account_number"],
+                "beneficiary_name": recipient.data["beneficiary_name"],
+                "amount": row["amount"],
+                "naration": row["narration"],
+                "name_enquiry_session_id": recipient.data["session_id"],
+                "sender_name": row["sender_name"],
+            }
+
+            if tracking_reference:
+                return self.send_funds_from_virtual_account(
+                    tracking_reference=tracking_reference, **transfer
+                )
+            return self.send_funds_from_main_account(
+                client_account_number=self.credentials["MAIN_ACCOUNT_NUMBER"],
+                **transfer,
+            )
+        except (requests.exceptions.RequestException, CircuitOpenError) as exc:
+            # A network error or an open circuit on one row should not abort the whole run.
+            return PyKudaResponse(status_code=0, data=exc, error=True)
+
+    def create_virtual_accounts(
+        self,
+        records: Iterable[dict],
+        concurrency: int = BULK_CONCURRENCY,
+        checkpoint: str | ProvisioningCheckpoint | None = None,
+    ) -> BulkRun:
+        """
+        Creates a virtual account for every record in `records`.
+
+        Records are read lazily and up to `concurrency` accounts are created at
+        once. With a checkpoint, each record's trackingReference is written to the
+        checkpoint file before its account is created, and the outcome after. Run
+        again with the same records and checkpoint, accounts created by an earlier
+        run are skipped, and accounts whose creation was interrupted are looked up
+        by their trackingReference before being created again.
+
+        Args:
+            records (Iterable[dict]): Accounts to create, each with the keyword
+                arguments of create_virtual_account, e.g. "first_name", "email" and
+                "verification_type". A "tracking_reference" key sets the account's
+                trackingReference, otherwise a random one is generated.
+            concurrency (int): Maximum number of accounts created at once.
+            checkpoint (str | ProvisioningCheckpoint | None): Path of the checkpoint
+                file, closed when the run is over, or a checkpoint. None disables
+                checkpointing. With a checkpoint, records repeated in the run are
+                only created once, and counted as skipped.
+
+        Returns:
+            BulkRun: Iterate over it to get `(record, PyKudaResponse)` tuples as each
+            account is created. `BulkRun.summary` holds throughput, failure counts
+            and the number of records skipped.
+
+        Example:
+            run = kuda.create_virtual_accounts(records, concurrency=20, checkpoint="onboarding.ckpt")
+            for record, response in run:
+                ...
+            print(run.summary.throughput)
+        """
+        owns_checkpoint = isinstance(checkpoint, str)
+        if owns_checkpoint:
+            checkpoint = ProvisioningCheckpoint(checkpoint)
+
+        skip = None
+        if checkpoint is not None:
+            started = set()
+
+            def skip(record: dict) -> bool:
+                # A record repeated in the run would get its own trackingReference
+                # while the first one is in flight, and create a second account.
+                key = checkpoint.key(record)
+                if key in started:
+                    return True
+                started.add(key)
+                return checkpoint.is_created(record)
+
+        return BulkRun(
+            partial(self._create_virtual_account_row, checkpoint),
+            records,
+            concurrency,
+            skip=skip,
+            on_finish=checkpoint.close if owns_checkpoint else None,
+        )
+
+    def _create_virtual_account_row(
+        self, checkpoint: ProvisioningCheckpoint | None, record: dict
+    ) -> PyKudaResponse:
+        """
+        Creates the virtual account of a single create_virtual_accounts record.
+
+        Args:
+            checkpoint (ProvisioningCheckpoint | None): The checkpoint of the run.
+            record (dict): A record passed to create_virtual_accounts.
+
+        Returns:
+            PyKudaResponse: The response of the creation, or of the lookup of an
+            interrupted creation when it could not tell whether the account exists.
+        """
+        import requests  # Already loaded by the request path, see utils.
+
+        arguments = dict(record)
+        tracking_reference = arguments.pop("tracking_reference", None)
+
+        try:
+            if checkpoint is not None:
+                tracking_reference, attempted = checkpoint.start(record)
+                if attempted:
+                    existing = self.retrieve_single_virtual_account(tracking_reference)
+                    if not existing.error:
+                        checkpoint.finish(
+                            record,
+                            tracking_reference,
+                            True,
+                            account_number=existing.data.account_number,
+                        )
+                        return PyKudaResponse(
+                            status_code=201,
+                            data={
+                                "account_number": existing.data.account_number,
+                                "tracking_reference": tracking_reference,
+                            },
+                            retries=existing.retries,
+                        )
+                    if existing.status_code != 200:
+                        # Kuda did not answer, the account may still exist.
+                        return existing
+
+            response = self.create_virtual_account(
+                tracking_reference=tracking_reference, **arguments
+            )
+        except (requests.exceptions.RequestException, CircuitOpenError) as exc:
+            # A network error or an open circuit on one record should not abort the whole run.
+            response = PyKudaResponse(status_code=0, data=exc, error=True)
+
+        if checkpoint is not None:
+            checkpoint.finish(
+                record,
+                tracking_reference,
+                not response.error,
+                account_number=None if response.error else response.data["account_number"],
+                status_code=response.status_code if response.error else None,
+            )
+        return response
+
+    def bulk_purchase_bills(
+        self, rows: Iterable[dict], concurrency: int = BULK_CONCURRENCY
+    ) -> BulkRun:
+        """
+        Verifies the customer of and purchases every bill in `rows`.
+
+        Each row goes through verify_bill_customer and then
+        virtual_account_purchase_bill, or admin_purchase_bill when it is paid from
+        the main account. Within a run, the billers of each biller type are
+        requested once, and each customer is verified once per bill item however
+        many rows pay it. Rows are read lazily and up to `concurrency` rows are in
+        flight at once.
+
+        Args:
+            rows (Iterable[dict]): Bills to purchase, each with the keys:
+                - "amount" (str): Amount to pay for the bill.
+                - "kuda_biller_item_identifier" (str): Identifier of the bill item in Kuda.
+                - "customer_identifier" (str): Identifier of the customer, e.g. a
+                  phone or meter number.
+                - "tracking_reference" (str): Tracking reference of the virtual account.
+                - "biller_type" (str, optional): Type of the biller, e.g. "airtime".
+                  When set, rows whose bill item is not one of the billers of
+                  that type fail without being sent.
+                - "phone_number" (str, optional): Phone number of the customer.
+                - "from_main_account" (bool, optional): Pays the bill from the main
+                  account with admin_purchase_bill. Defaults to False.
+                - "client_first_name" (str, optional): First name of the customer,
+                  required when paying from the main account.
+            concurrency (int): Maximum number of rows processed at once.
+
+        Returns:
+            BulkRun: Iterate over it to get `(row, PyKudaResponse)` tuples as each
+            row finishes. A failed verification is returned as the row's response,
+            and an unknown bill item as an error response with status code 0.
+            `BulkRun.summary` holds throughput and failure counts.
+
+        Example:
+            run = kuda.bulk_purchase_bills(rows, concurrency=20)
+            for row, response in run:
+                ...
+            print(run.summary.throughput)
+        """
+        return BulkRun(
+            partial(self._purchase_bill_row, RunMemo(), RunMemo()),
+            rows,
+            concurrency,
+        )
+
+    def _purchase_bill_row(
+        self, billers: RunMemo, verifications: RunMemo, row: dict
+    ) -> PyKudaResponse:
+        """
+        Verifies the customer of a single bulk_purchase_bills row and purchases the bill.
+
+        Args:
+            billers (RunMemo): The billers requested by the run, by biller type.
+            verifications (RunMemo): The verifications made by the run, by bill
+                item and customer.
+            row (dict): A row passed to bulk_purchase_bills.
+
+        Returns:
+            PyKudaResponse: The response of the purchase, or of the request that failed
+            before it.
+        """
+        import requests  # Already loaded by the request path, see utils.
+
+        identifier = row["kuda_biller_item_identifier"]
+        customer = row["customer_identifier"]
+        biller_type = row.get("biller_type")
+
+        try:
+            if biller_type:
+                biller_list = billers.get(
+                    biller_type, partial(self.billers, biller_type)
+                )
+                if biller_list.error:
+                    return biller_list
+                if not any(
+                    biller.get("billerItemIdentifier") == identifier
+                    for biller in biller_list.data
+                ):
+                    return PyKudaResponse(
+                        status_code=0,
+                        data=ValueError(
+                            f"{identifier} is not a bill item of the {biller_type} billers."
+                        ),
+                        error=True,
+                    )
+
+            verification = verifications.get(
+                (identifier, customer),
+                partial(self.verify_bill_customer, identifier, customer),
+            )
+            if verification.error:
+                return verification
+
+            purchase = {
+                "amount": row["amount"],
+                "kuda_biller_item_identifier": identifier,
+                "customer_identifier": customer,
+                "tracking_reference": row["tracking_reference"],
+                "phone_number": row.get("phone_number"),
+            }
+
+            if row.get("from_main_account"):
+                return self.admin_purchase_bill(
+                    client_first_name=row["client_first_name"], **purchase
+                )
+            return self.virtual_account_purchase_bill(**purchase)
+        except (requests.exceptions.RequestException, CircuitOpenError) as exc:
+            # A network error or an open circuit on one row should not abort the whole run.
+            return PyKudaResponse(status_code=0, data=exc, error=True)
+
+    def iter_virtual_accounts(
+        self,
+        page_size: int = VIRTUAL_ACCOUNTS_PAGE_SIZE,
+        prefetch: int = VIRTUAL_ACCOUNTS_PREFETCH,
+    ) -> Iterator[PyKudaResponse]:
+        """
+        Lazily retrieves every virtual account, one page at a time.
+
+        While a page is being consumed, the next `prefetch` pages are retrieved
+        concurrently, so at most `prefetch + 1` pages are held in memory however
+        many accounts there are. Iteration stops after the last page, or after
+        the first page that failed.
+
+        Args:
+            page_size (int, optional): Number of accounts per page. Defaults to 30.
+            prefetch (int, optional): Number of pages retrieved ahead. Defaults to 2.
+
+        Yields:
+            PyKudaResponse: The response of each page, whose data is the list of accounts.
+
+        Example:
+            for page in kuda.iter_virtual_accounts(page_size=100):
+                if page.error:
+                    break
+                for account in page.data:
+                    ...
+
+        Raises:
+            ValueError: If prefetch is negative.
+        """
+        if prefetch < 0:
+            raise ValueError("prefetch must not be negative.")
+
+        # Validated here rather than in the generator, which would only raise
+        # when the first page is requested.
+        return self._iter_virtual_accounts(page_size, prefetch)
+
+    def _iter_virtual_accounts(
+        self, page_size: int, prefetch: int
+    ) -> Iterator[PyKudaResponse]:
+        pages = deque()
+        next_page_number = 1
+
+        with ThreadPoolExecutor(max_workers=prefetch + 1) as executor:
+
+            def fetch_next_page():
+                nonlocal next_page_number
+                pages.append(
+                    executor.submit(
+                        self.retrieve_all_virtual_accounts, page_size, next_page_number
+                    )
+                )
+                next_page_number += 1
+
+            for _ in range(prefetch + 1):
+                fetch_next_page()
+
+            try:
+                while pages:
+                    response = pages.popleft().result()
+
+                    if response.error:
+                        # Kuda answers a page past the last one with an empty list,
+                        # which is parsed as an error.
+                        if not self._is_empty_accounts_page(response):
+                            yield response
+                        return
+
+                    yield response
+
+                    if len(response.data) < page_size:
+                        return
+                    fetch_next_page()
+            finally:
+                for page in pages:
+                    page.cancel()
+
+    def seed_ledger(
+        self,
+        concurrency: int = BULK_CONCURRENCY,
+        page_size: int = VIRTUAL_ACCOUNTS_PAGE_SIZE,
+    ) -> dict:
+        """
+        Fills the ledger with the balance of the main account and of every virtual account.
+
+        Accounts are listed with iter_virtual_accounts and their balances are
+        requested with up to `concurrency` requests at once. Seeding is only needed
+        once: afterwards the ledger is kept up to date by the methods moving money,
+        and persists across restarts when it is stored in a file.
+
+        If a page of the account listing fails, the accounts after it are not
+        seeded: "complete" is False and "error" is the failed page, so seeding
+        can be run again.
+
+        Args:
+            concurrency (int): Maximum number of balance requests at once.
+            page_size (int): Number of accounts per page of the account listing.
+
+        Returns:
+            dict: The number of balances "seeded" and of "failed" balance requests,
+            whether every account was listed ("complete") and the failed listing
+            page, if any ("error").
+
+        Raises:
+            ValueError: If PyKuda has no ledger.
+        """
+        if self.ledger is None:
+            raise ValueError("PyKuda has no ledger, pass one with ledger=Ledger(path).")
+
+        listing_error = None
+
+        def accounts():
+            nonlocal listing_error
+            yield MAIN_ACCOUNT
+            for page in self.iter_virtual_accounts(page_size=page_size):
+                if page.error:
+                    listing_error = page
+                    return
+                yield from page.data.column("tracking_reference")
+
+        seeded = failed = 0
+        # Reading a balance stores it in the ledger.
+        for _, response in run_concurrently(self._read_balance, accounts(), concurrency):
+            if response.error:
+                failed += 1
+            else:
+                seeded += 1
+
+        return {
+            "seeded": seeded,
+            "failed": failed,
+            "complete": listing_error is None,
+            "error": listing_error,
+        }
+
+    def _read_balance(self, account: str) -> PyKudaResponse:
+        """
+        Requests the balance of an account from Kuda, bypassing the ledger and caches,
+        and stores it in the ledger.
+
+        Args:
+            account (str): The tracking reference of a virtual account, or MAIN_ACCOUNT.
+
+        Returns:
+            PyKudaResponse: The balance response.
+        """
+        import requests  # Already loaded by the request path, see utils.
+
+        try:
+            if account == MAIN_ACCOUNT:
+                return self.main_account_balance(use_cache=False)
+            return self.virtual_account_balance(account, use_cache=False)
+        except (requests.exceptions.RequestException, CircuitOpenError) as exc:
+            return PyKudaResponse(status_code=0, data=exc, error=True)
+
+    def check_ledger_drift(
+        self,
+        sample_size: int = LEDGER_DRIFT_SAMPLE_SIZE,
+        concurrency: int = BULK_CONCURRENCY,
+    ) -> dict:
+        """
+        Compares ledger balances with Kuda's, and corrects the ones that drifted.
+
+        A random sample of accounts is checked, along with every stale account.
+        Balances drift when money is moved outside of PyKuda, e.g. by incoming
+        transfers or fees.
+
+        Args:
+            sample_size (int): Number of accounts picked at random.
+            concurrency (int): Maximum number of balance requests at once.
+
+        Returns:
+            dict: The number of accounts "checked", the balances that "drifted" as
+            {account: (ledger balance, Kuda's balance)}, and the number of "failed"
+            balance requests.
+
+        Raises:
+            ValueError: If PyKuda has no ledger.
+        """
+        if self.ledger is None:
+            raise ValueError("PyKuda has no ledger, pass one with ledger=Ledger(path).")
+
+        accounts = set(self.ledger.stale()).union(self.ledger.sample(sample_size))
+        checked = failed = 0
+        drifted = {}
+
+        for account, (local, response) in run_concurrently(
+            self._compare_balance, accounts, concurrency
+        ):
+            if response.error:
+                failed += 1
+                continue
+
+            checked += 1
+            if local is not None and local != response.data:
+                drifted[account] = (local, response.data)
+
+        return {"checked": checked, "drifted": drifted, "failed": failed}
+
+    def _compare_balance(self, account: str) -> tuple:
+        """
+        Returns the ledger balance of an account, and its balance read from Kuda
+        after it. Reading the balance stores it in the ledger.
+        """
+        local = self.ledger.get(account)
+        return local, self._read_balance(account)
+
+    def start_ledger_drift_checks(
+        self,
+        interval: float = LEDGER_DRIFT_CHECK_INTERVAL,
+        sample_size: int = LEDGER_DRIFT_SAMPLE_SIZE,
+    ) -> threading.Event:
+        """
+        Runs check_ledger_drift every `interval` seconds in a background thread.
+
+        Checks started earlier are stopped, so only one thread checks the ledger.
+
+        Args:
+            interval (float): Number of seconds between drift checks.
+            sample_size (int): Number of accounts picked at random by each check.
+
+        Returns:
+            threading.Event: Set it to stop the checks. PyKuda.close also stops them.
+        """
+        if self._drift_checks is not None:
+            self._drift_checks.set()
+        stop = threading.Event()
+        self._drift_checks = stop
+
+        def run():
+            while not stop.wait(interval):
+                try:
+                    self.check_ledger_drift(sample_size)
+                except Exception:
+                    # The next check retries, ledger balances stay served meanwhile.
+                    logger.exception("Ledger drift check failed.")
+
+        threading.Thread(target=run, daemon=True).start()
+        return stop
+
+    def recover_journal(
+        self,
+        concurrency: int = BULK_CONCURRENCY,
+        notifications: Iterable[dict] = (),
+        resend: bool = False,
+    ) -> BulkRun:
+        """
+        Resolves the requests of the journal whose outcome is unknown.
+
+        A request is resolved as succeeded when one of `notifications` carries its
+        requestref as clientRequestRef, i.e. Kuda notified the transaction it made.
+        Its outcome is appended to the journal and it is not sent again.
+
+        Other requests are left in doubt: a missing notification does not prove
+        Kuda did not process the request, it may only be late. Check them with
+        Kuda and record their outcome with Journal.record_outcome, or pass
+        resend=True to send them again with their original requestref. Kuda does
+        not document that it recognises a resent requestref, so resending may
+        move the money twice.
+
+        In both cases, the balances the requests touched are requested again on
+        their next read. Run it after a crash, before sending new requests.
+
+        Args:
+            concurrency (int): Maximum number of requests resolved at once.
+            notifications (Iterable[dict]): Transaction notifications received from
+                Kuda, e.g. TransactionNotification objects or the decoded lines of a
+                WebhookReceiver recording.
+            resend (bool): Resend the requests no notification resolved.
+
+        Returns:
+            BulkRun: Iterate over it to get `(entry, PyKudaResponse)` tuples as each
+            request is resolved, where entry is the journal entry of the request.
+            A request resolved by a notification has a 200 response holding the
+            notification. A request left in doubt has an error response with status
+            code 0. `BulkRun.summary` holds throughput and failure counts.
+
+        Raises:
+            ValueError: If PyKuda has no journal.
+        """
+        if self.journal is None:
+            raise ValueError(
+                "PyKuda has no journal, pass one with journal=Journal(path)."
+            )
+
+        notified = {
+            notification.get("clientRequestRef"): notification
+            for notification in notifications
+            if notification.get("clientRequestRef")
+        }
+        return BulkRun(
+            partial(self._recover_entry, notified, resend),
+            self.journal.in_doubt(),
+            concurrency,
+        )
+
+    def _recover_entry(self, notified: dict, resend: bool, entry: dict) -> PyKudaResponse:
+        """
+        Resolves a single request in doubt.
+
+        Args:
+            notified (dict): Transaction notifications keyed by clientRequestRef.
+            resend (bool): Whether to resend the request if no notification resolves it.
+            entry (dict): The journal entry of the request.
+
+        Returns:
+            PyKudaResponse: The notification of the request, the response of the
+            resent request, or an error response if the request is still in doubt.
+        """
+        import requests  # Already loaded by the request path, see utils.
+
+        notification = notified.get(entry["requestref"])
+        if notification is not None:
+            self.journal.record_outcome(entry["requestref"], SUCCEEDED)
+            for account in (entry["debited"], entry["credited"]):
+                if account is None:
+                    continue
+                # The ledger may not have been moved before the crash.
+                if self.balance_cache is not None:
+                    self.balance_cache.invalidate(account)
+                if self.ledger is not None:
+                    self.ledger.mark_stale(account)
+            return PyKudaResponse(status_code=200, data=notification)
+
+        if not resend:
+            return PyKudaResponse(
+                status_code=0,
+                data=LookupError(
+                    f"The outcome of {entry['requestref']} is unknown, check it with "
+                    "Kuda or resend it."
+                ),
+                error=True,
+            )
+
+        try:
+            return self._send_money(
+                entry["request"],
+                entry["amount"],
+                entry["debited"],
+                entry["credited"],
+                recovering=True,
+            )
+        except (requests.exceptions.RequestException, CircuitOpenError) as exc:
+            # A network error or an open circuit on one entry should not abort the
+            # whole recovery, the entry stays in doubt.
+            return PyKudaResponse(status_code=0, data=exc, error=True)
+
+    def _is_empty_accounts_page(self, response: PyKudaResponse) -> bool:
+        """
+        Checks whether a failed retrieve_all_virtual_accounts response is an empty page.
+
+        Args:
+            response (PyKudaResponse): The failed response of a page.
+
+        Returns:
+            bool: True if Kuda processed the request but returned no accounts.
+        """
+        if response.status_code != 200:
+            return False
+
+        try:
+            response_data = self.codec.decode(response.data.content)
+        except (AttributeError, ValueError):
+            return False
+
+        return bool(
+            response_data
+            and response_data.get("status")
+            and response_data.get("data") is not None
+            and not response_data["data"].get("accounts")
+        )
@@ -0,0 +1,285 @@
+import threading
+import time
+from collections import deque
+from typing import Callable
+
+from pykuda.constants import (
+    CIRCUIT_FAILURE_THRESHOLD,
+    CIRCUIT_HALF_OPEN_PROBES,
+    CIRCUIT_MINIMUM_REQUESTS,
+    CIRCUIT_RESET_TIMEOUT,
+    CIRCUIT_WINDOW,
+)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# Name of the breaker guarding KUDA's TOKEN URL.
+TOKEN_CIRCUIT = "token"
+
+
+class CircuitOpenError(Exception):
+    """
+    Raised instead of sending a request while the circuit of its service type is open.
+
+    Attributes:
+        name (str): The service type of the open circuit, or "token".
+        retry_after (float): Seconds until the circuit lets a probe request through.
+    """
+
+    def __init__(self, name: str, retry_after: float):
+        super().__init__(
+            f"The {name} circuit is open, retry in {retry_after:.1f} seconds."
+        )
+        self.name = name
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """
+    Fails requests fast while Kuda keeps failing them, instead of letting every
+    caller wait for a timeout.
+
+    The breaker counts requests and failures (5xx replies, timeouts and connection
+    errors) over the last `window` seconds. Once at least `minimum_requests` were
+    sent and the share of failures reaches `failure_threshold`, the circuit opens
+    and requests raise CircuitOpenError. After `reset_timeout` seconds it becomes
+    half open and lets `half_open_probes` requests through: the circuit closes if
+    they succeed and opens again if one fails.
+
+    Attributes:
+        name (str): The service type guarded by the breaker, or "token".
+        failure_threshold (float): Share of failed requests that opens the circuit.
+        minimum_requests (int): Requests needed in the window before it can open.
+        window (float): Seconds over which requests and failures are counted.
+        reset_timeout (float): Seconds the circuit stays open before probing.
+        half_open_probes (int): Requests let through while half open.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: float = CIRCUIT_FAILURE_THRESHOLD,
+        minimum_requests: int = CIRCUIT_MINIMUM_REQUESTS,
+        window: float = CIRCUIT_WINDOW,
+        reset_timeout: float = CIRCUIT_RESET_TIMEOUT,
+        half_open_probes: int = CIRCUIT_HALF_OPEN_PROBES,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.minimum_requests = minimum_requests
+        self.window = window
+        self.reset_timeout = reset_timeout
+        self.half_open_probes = half_open_probes
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._opened_at = None
+        self._probes = 0
+        # One [second, requests, failures] bucket per second of the window.
+        self._buckets = deque()
+        self._requests = 0
+        self._failures = 0
+        self.rejected = 0
+
+    @property
+    def state(self) -> str:
+        """The state of the circuit: "closed", "open" or "half_open"."""
+        with self._lock:
+            return self._current_state(self._clock())
+
+    def _current_state(self, now: float) -> str:
+        if self._state == OPEN and now - self._opened_at >= self.reset_timeout:
+            self._state = HALF_OPEN
+            self._probes = 0
+        return self._state
+
+    def before_request(self) -> None:
+        """
+        Lets a request through, or fails it fast.
+
+        Raises:
+            CircuitOpenError: If the circuit is open, or half open with all probes
+                already sent.
+        """
+        with self._lock:
+            now = self._clock()
+            state = self._current_state(now)
+
+            if state == CLOSED:
+                return
+            if state == HALF_OPEN and self._probes < self.half_open_probes:
+                self._probes += 1
+                return
+
+            self.rejected += 1
+            retry_after = (
+                max(0.0, self._opened_at + self.reset_timeout - now)
+                if state == OPEN
+                else 0.0
+            )
+
+        raise CircuitOpenError(self.name, retry_after)
+
+    def record(self, failed: bool) -> None:
+        """
+        Records the outcome of a request let through by before_request.
+
+        Args:
+            failed (bool): Whether Kuda failed the request.
+        """
+        with self._lock:
+            now = self._clock()
+
+            if self._state == HALF_OPEN:
+                if failed:
+                    self._open(now)
+                else:
+                    self._state = CLOSED
+                    self._reset_window()
+                return
+
+            self._count(now, failed)
+            if (
+                self._state == CLOSED
+                and self._requests >= self.minimum_requests
+                and self._failures >= self.failure_threshold * self._requests
+            ):
+                self._open(now)
+
+    def record_response(self, response) -> None:
+        """
+        Records the outcome of a request from its HTTP response, 5xx replies
+        being failures.
+        """
+        self.record(failed=response.status_code >= 500)
+
+    def call(self, func: Callable, *args):
+        """
+        Calls func through the breaker, recording 5xx replies and raised
+        exceptions as failures.
+
+        Args:
+            func (Callable): Sends the request and returns its HTTP response.
+            *args: Arguments of func.
+
+        Returns:
+            The response returned by func.
+
+        Raises:
+            CircuitOpenError: If the circuit does not let the request through.
+        """
+        self.before_request()
+        try:
+            response = func(*args)
+        except Exception:
+            self.record(failed=True)
+            raise
+        self.record_response(response)
+        return response
+
+    async def acall(self, func: Callable, *args):
+        """
+        Same as call, for a coroutine function.
+        """
+        self.before_request()
+        try:
+            response = await func(*args)
+        except Exception:
+            self.record(failed=True)
+            raise
+        self.record_response(response)
+        return response
+
+    def _open(self, now: float) -> None:
+        self._state = OPEN
+        self._opened_at = now
+        self._reset_window()
+
+    def _reset_window(self) -> None:
+        self._buckets.clear()
+        self._requests = 0
+        self._failures = 0
+
+    def _count(self, now: float, failed: bool) -> None:
+        second = int(now)
+        while self._buckets and self._buckets[0][0] <= now - self.window:
+            _, requests, failures = self._buckets.popleft()
+            self._requests -= requests
+            self._failures -= failures
+
+        if not self._buckets or self._buckets[-1][0] != second:
+            self._buckets.append([second, 0, 0])
+        bucket = self._buckets[-1]
+        bucket[1] += 1
+        bucket[2] += failed
+        self._requests += 1
+        self._failures += failed
+
+    def snapshot(self) -> dict:
+        """
+        Returns the state of the circuit, the requests and failures counted in the
+        current window, the number of requests failed fast and, while open, the
+        seconds until it lets a probe request through.
+        """
+        with self._lock:
+            now = self._clock()
+            state = self._current_state(now)
+            return {
+                "state": state,
+                "requests": self._requests,
+                "failures": self._failures,
+                "rejected": self.rejected,
+                "retry_after": (
+                    max(0.0, self._opened_at + self.reset_timeout - now)
+                    if state == OPEN
+                    else 0.0
+                ),
+            }
+
+
+class CircuitBreakers:
+    """
+    Creates and keeps one CircuitBreaker per service type, plus one for the token
+    endpoint, all with the same settings.
+
+    Example:
+        kuda = PyKuda(credentials, circuit_breakers=CircuitBreakers(reset_timeout=10))
+        kuda.circuit_state()  # {"token": {"state": "closed", ...}, ...}
+    """
+
+    def __init__(self, **settings):
+        """
+        Args:
+            **settings: Keyword arguments of every CircuitBreaker, e.g.
+                failure_threshold or reset_timeout.
+        """
+        self.settings = settings
+        self._breakers = {}
+        self._lock = threading.Lock()
+
+    def get(self, name: str) -> CircuitBreaker:
+        """
+        Returns the breaker of a service type, creating it on first use.
+
+        Args:
+            name (str): The service type value, or "token".
+
+        Returns:
+            CircuitBreaker: The breaker guarding name.
+        """
+        breaker = self._breakers.get(name)
+        if breaker is None:
+            with self._lock:
+                breaker = self._breakers.setdefault(
+                    name, CircuitBreaker(name, **self.settings)
+                )
+        return breaker
+
+    def snapshot(self) -> dict:
+        """
+        Returns the snapshot of every breaker used so far, keyed by name.
+        """
+        return {name: breaker.snapshot() for name, breaker in list(self._breakers.items())}
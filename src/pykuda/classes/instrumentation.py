@@ -0,0 +1,165 @@
+from dataclasses import dataclass, field
+
+
+@dataclass
+class RequestEvent:
+    """
+    Describes a single request to Kuda, passed to every registered instrument.
+
+    Attributes:
+        service_type (str): The Kuda service type of the request.
+        request_ref (str): The request reference sent to Kuda.
+        timings (dict): Seconds spent per phase: "token" (generating headers),
+            "send" (the HTTP request) and "parse" (decoding and parsing the reply).
+            Retried requests add up the time of every attempt.
+        retries (int): The number of times the request was retried.
+        status_code (int | None): The status code of the PyKudaResponse.
+        error (bool | None): Whether the PyKudaResponse is an error.
+        request_bytes (int | None): Size of the request body.
+        response_bytes (int | None): Size of the response body.
+        exception (Exception | None): The exception raised by the request, if any.
+        state (dict): Scratch space instruments can use between before_request
+            and after_request, e.g. to keep a span.
+    """
+
+    service_type: str
+    request_ref: str
+    timings: dict = field(default_factory=dict)
+    retries: int = 0
+    status_code: int | None = None
+    error: bool | None = None
+    request_bytes: int | None = None
+    response_bytes: int | None = None
+    exception: Exception | None = None
+    state: dict = field(default_factory=dict)
+
+
+class Instrumentation:
+    """
+    Base class for instruments hooked around every request to Kuda.
+
+    Subclasses override before_request and/or after_request. Register them with
+    PyKuda(instruments=[...]) or add_instrument. When no instrument is registered,
+    requests skip instrumentation entirely.
+    """
+
+    def before_request(self, event: RequestEvent) -> None:
+        """Called before the token is generated for a request."""
+
+    def after_request(self, event: RequestEvent) -> None:
+        """Called once the request has been parsed, or has raised."""
+
+
+class PrometheusInstrumentation(Instrumentation):
+    """
+    Records request phase durations, payload sizes and outcomes as Prometheus
+    metrics. Requires prometheus_client.
+
+    Metrics:
+        <namespace>_request_phase_seconds: Histogram per service_type and phase.
+        <namespace>_payload_bytes: Histogram per service_type and direction.
+        <namespace>_responses_total: Counter per service_type, status_code and error.
+    """
+
+    def __init__(self, registry=None, namespace: str = "pykuda"):
+        try:
+            from prometheus_client import REGISTRY, Counter, Histogram
+        except ImportError as exc:
+            raise ImportError(
+                "PrometheusInstrumentation requires prometheus_client, please install "
+                "it with `pip install prometheus-client`."
+            ) from exc
+
+        registry = registry if registry is not None else REGISTRY
+        self.phase_seconds = Histogram(
+            f"{namespace}_request_phase_seconds",
+            "Seconds spent per phase of a Kuda request.",
+            ["service_type", "phase"],
+            registry=registry,
+        )
+        self.payload_bytes = Histogram(
+            f"{namespace}_payload_bytes",
+            "Size of Kuda request and response bodies.",
+            ["service_type", "direction"],
+            buckets=(256, 1024, 4096, 16384, 65536, 262144, 1048576),
+            registry=registry,
+        )
+        self.responses = Counter(
+            f"{namespace}_responses_total",
+            "Kuda responses per status code.",
+            ["service_type", "status_code", "error"],
+            registry=registry,
+        )
+
+    def after_request(self, event: RequestEvent) -> None:
+        for phase, seconds in event.timings.items():
+            self.phase_seconds.labels(event.service_type, phase).observe(seconds)
+
+        if event.request_bytes is not None:
+            self.payload_bytes.labels(event.service_type, "request").observe(
+                event.request_bytes
+            )
+        if event.response_bytes is not None:
+            self.payload_bytes.labels(event.service_type, "response").observe(
+                event.response_bytes
+            )
+
+        self.responses.labels(
+            event.service_type,
+            str(event.status_code) if event.exception is None else "exception",
+            str(bool(event.error)).lower(),
+        ).inc()
+
+
+class OpenTelemetryInstrumentation(Instrumentation):
+    """
+    Wraps every request to Kuda in an OpenTelemetry span, with the service type,
+    request reference, phase timings, status code and payload sizes as attributes.
+    Requires opentelemetry-api.
+    """
+
+    def __init__(self, tracer=None):
+        try:
+            from opentelemetry import trace
+        except ImportError as exc:
+            raise ImportError(
+                "OpenTelemetryInstrumentation requires opentelemetry-api, please "
+                "install it with `pip install opentelemetry-api`."
+            ) from exc
+
+        self._status = trace.Status
+        self._status_code = trace.StatusCode
+        self.tracer = tracer if tracer is not None else trace.get_tracer("pykuda")
+
+    def before_request(self, event: RequestEvent) -> None:
+        event.state["span"] = self.tracer.start_span(
+            f"kuda {event.service_type}",
+            attributes={
+                "kuda.service_type": event.service_type,
+                "kuda.request_ref": event.request_ref,
+            },
+        )
+
+    def after_request(self, event: RequestEvent) -> None:
+        span = event.state.pop("span", None)
+        if span is None:
+            return
+
+        for phase, seconds in event.timings.items():
+            span.set_attribute(f"kuda.{phase}_ms", seconds * 1000)
+        if event.retries:
+            span.set_attribute("kuda.retries", event.retries)
+        if event.status_code is not None:
+            span.set_attribute("http.status_code", event.status_code)
+        if event.request_bytes is not None:
+            span.set_attribute("http.request_content_length", event.request_bytes)
+        if event.response_bytes is not None:
+            span.set_attribute("http.response_content_length", event.response_bytes)
+
+        if event.exception is not None:
+            span.record_exception(event.exception)
+            span.set_status(self._status(self._status_code.ERROR))
+        elif event.error:
+            span.set_status(self._status(self._status_code.ERROR))
+
+        span.end()
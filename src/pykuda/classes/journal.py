@@ -0,0 +1,273 @@
+import json
+import os
+import threading
+import time
+
+# States of a journal entry. Requests are SENT until their outcome is known;
+# SENT and UNKNOWN entries are in doubt, see Journal.in_doubt.
+SENT = "sent"
+SUCCEEDED = "succeeded"
+DECLINED = "declined"
+UNKNOWN = "unknown"
+
+
+class Journal:
+    """
+    An append-only, write-ahead journal of the requests moving money.
+
+    Before a request moving money is sent, its requestref and payload are
+    written and synced to disk; its outcome is appended once Kuda answered.
+    After a crash, or after a timeout or server error, requests without a known
+    outcome are "in doubt": Kuda may or may not have processed them. They are
+    resolved with PyKuda.recover_journal, from the transaction notifications
+    Kuda sent for them, or by hand with record_outcome once checked with Kuda.
+
+    Writes use group commit: callers appending while the file is being synced
+    wait for the next sync, which writes all of their entries at once, so
+    concurrent requests share one fsync. Outcomes do not wait for a sync, they
+    are written with the next one; an outcome lost in a crash leaves its entry
+    in doubt, to be resolved like any other.
+
+    Each line is a JSON object, and the last line of a requestref wins.
+
+    Attributes:
+        path (str): Path of the journal file.
+        appends (int): Number of entries appended.
+        syncs (int): Number of times the file was synced to disk.
+    """
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path (str): Path of the journal file, created if missing.
+        """
+        self.path = path
+        self.appends = 0
+        self.syncs = 0
+        # Payloads hold account numbers, so only the owner may read the journal.
+        self._fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o600)
+        self._condition = threading.Condition()
+        self._pending = []
+        self._appended = 0
+        self._synced = 0
+        self._syncing = False
+        self._ends_with_newline = self._file_ends_with_newline()
+
+    def _file_ends_with_newline(self) -> bool:
+        with open(self.path, "rb") as file:
+            file.seek(0, os.SEEK_END)
+            if file.tell() == 0:
+                return True
+            file.seek(-1, os.SEEK_END)
+            return file.read(1) == b"\n"
+
+    def record_request(
+        self,
+        data: dict,
+        amount: str,
+        debited: str | None = None,
+        credited: str | None = None,
+    ) -> None:
+        """
+        Writes a request about to be sent, and waits until it is synced to disk.
+
+        Args:
+            data (dict): Request data for the API call, including its requestref.
+            amount (str): The amount moved.
+            debited (str | None): The account debited, see ServiceType._move_money.
+            credited (str | None): The account credited, see ServiceType._move_money.
+
+        Raises:
+            ValueError: If the journal is closed.
+        """
+        self._append(
+            {
+                "requestref": data["requestref"],
+                "state": SENT,
+                "request": data,
+                "amount": amount,
+                "debited": debited,
+                "credited": credited,
+                "at": time.time(),
+            },
+            wait=True,
+        )
+
+    def record_outcome(
+        self, requestref: str, state: str, status_code: int | None = None
+    ) -> None:
+        """
+        Appends the outcome of a request, written with the next sync.
+
+        Args:
+            requestref (str): The requestref of the request.
+            state (str): SUCCEEDED, DECLINED or UNKNOWN.
+            status_code (int | None): The status code of the response, if any.
+
+        Raises:
+            ValueError: If the journal is closed.
+        """
+        self._append(
+            {
+                "requestref": requestref,
+                "state": state,
+                "status_code": status_code,
+                "at": time.time(),
+            },
+            wait=False,
+        )
+
+    def _append(self, entry: dict, wait: bool) -> None:
+        line = json.dumps(entry, separators=(",", ":"), default=str) + "\n"
+        with self._condition:
+            if self._fd is None:
+                raise ValueError("journal is closed")
+            self._pending.append(line)
+            self._appended += 1
+            self.appends += 1
+            if wait:
+                self._wait_for_sync(self._appended)
+
+    def _wait_for_sync(self, position: int) -> None:
+        """
+        Waits until the entries up to `position` are synced, syncing them if no
+        other caller is. Must be called with the condition held.
+        """
+        while self._synced < position:
+            if self._syncing:
+                self._condition.wait()
+                continue
+
+            # This caller syncs every pending entry, its own and the ones of
+            # callers that arrived during the previous sync.
+            self._syncing = True
+            lines, self._pending = self._pending, []
+            target = self._appended
+            self._condition.release()
+            written = False
+            try:
+                self._write(lines)
+                written = True
+            finally:
+                self._condition.acquire()
+                if written:
+                    self._synced = target
+                else:
+                    # Kept for the next sync, the error is raised to this caller.
+                    self._pending[:0] = lines
+                self._syncing = False
+                self._condition.notify_all()
+
+    def _write(self, lines: list[str]) -> None:
+        content = "".join(lines).encode()
+        if not self._ends_with_newline:
+            # Ends a line torn by a crash, so it does not swallow the next entry.
+            content = b"\n" + content
+            self._ends_with_newline = True
+        os.write(self._fd, content)
+        os.fsync(self._fd)
+        self.syncs += 1
+
+    def sync(self) -> None:
+        """
+        Writes and syncs every pending entry, e.g. the outcomes not synced yet.
+        """
+        with self._condition:
+            self._wait_for_sync(self._appended)
+
+    def entries(self) -> dict:
+        """
+        Reads the last state of every request in the journal.
+
+        Returns:
+            dict: The entries keyed by requestref. Outcome entries are merged into
+            the entry of their request, so each one holds the request data.
+        """
+        self.sync()
+        entries = {}
+        with open(self.path, encoding="utf-8") as file:
+            for line in file:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # A line torn by a crash while it was being written.
+                    continue
+                previous = entries.get(entry["requestref"])
+                entries[entry["requestref"]] = (
+                    {**previous, **entry} if previous is not None else entry
+                )
+        return entries
+
+    def in_doubt(self) -> list[dict]:
+        """
+        Returns the requests whose outcome is unknown: sent before a crash, or
+        answered with a server or network error.
+
+        Returns:
+            list[dict]: The entries, in the order the requests were sent.
+        """
+        return [
+            entry
+            for entry in self.entries().values()
+            if entry["state"] in (SENT, UNKNOWN) and "request" in entry
+        ]
+
+    def compact(self) -> int:
+        """
+        Rewrites the journal keeping only the requests in doubt.
+
+        Must not run while requests are being journaled.
+
+        Returns:
+            int: The number of entries kept.
+        """
+        entries = self.in_doubt()
+        temporary_path = f"{self.path}.{os.getpid()}.tmp"
+        fd = os.open(temporary_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        try:
+            os.write(
+                fd,
+                "".join(
+                    json.dumps(entry, separators=(",", ":"), default=str) + "\n"
+                    for entry in entries
+                ).encode(),
+            )
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+        with self._condition:
+            os.replace(temporary_path, self.path)
+            os.close(self._fd)
+            self._fd = os.open(self.path, os.O_WRONLY | os.O_APPEND)
+            self._ends_with_newline = True
+        return len(entries)
+
+    def stats(self) -> dict:
+        """
+        Returns the journal counters.
+
+        Returns:
+            dict: The number of entries appended, of syncs, and of entries per sync.
+        """
+        return {
+            "appends": self.appends,
+            "syncs": self.syncs,
+            "entries_per_sync": self.appends / self.syncs if self.syncs else 0.0,
+        }
+
+    def close(self) -> None:
+        """
+        Syncs the pending entries and closes the journal file.
+        """
+        self.sync()
+        with self._condition:
+            if self._fd is not None:
+                os.close(self._fd)
+                self._fd = None
+
+    def __enter__(self) -> "Journal":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
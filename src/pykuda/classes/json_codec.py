@@ -0,0 +1,127 @@
+import json
+from typing import Any
+
+
+class JsonCodec:
+    """
+    Encodes request bodies and decodes response bodies with the standard library's json.
+
+    Subclasses use faster libraries, see default_codec.
+
+    Attributes:
+        name (str): Name of the codec, e.g. in benchmark results.
+    """
+
+    name = "json"
+
+    def encode(self, data: Any) -> bytes:
+        """
+        Encodes request data.
+
+        Args:
+            data (Any): The request data.
+
+        Returns:
+            bytes: The JSON body of the request.
+        """
+        return json.dumps(data, separators=(",", ":")).encode()
+
+    def decode(self, content: bytes, type: type | None = None) -> Any:
+        """
+        Decodes a response body.
+
+        Args:
+            content (bytes): The JSON body of the response.
+            type (type | None): A type to decode the body into, e.g. a msgspec.Struct.
+                Only supported by MsgspecCodec.
+
+        Returns:
+            Any: The decoded body.
+
+        Raises:
+            TypeError: If a type is passed to a codec that does not support typed decoding.
+            ValueError: If the body is not valid JSON.
+        """
+        if type is not None:
+            raise TypeError(
+                f"The {self.name} codec does not support typed decoding, use MsgspecCodec."
+            )
+        return json.loads(content)
+
+
+class OrjsonCodec(JsonCodec):
+    """
+    Encodes and decodes JSON with orjson. Requires orjson.
+    """
+
+    name = "orjson"
+
+    def __init__(self):
+        try:
+            import orjson
+        except ImportError as exc:
+            raise ImportError(
+                "OrjsonCodec requires orjson, please install it with `pip install orjson`."
+            ) from exc
+
+        self._dumps = orjson.dumps
+        self._loads = orjson.loads
+
+    def encode(self, data: Any) -> bytes:
+        return self._dumps(data)
+
+    def decode(self, content: bytes, type: type | None = None) -> Any:
+        if type is not None:
+            return super().decode(content, type)
+        return self._loads(content)
+
+
+class MsgspecCodec(JsonCodec):
+    """
+    Encodes and decodes JSON with msgspec. Requires msgspec.
+
+    Bodies can be decoded straight into typed msgspec Structs, which skips building
+    nested dicts and validates the reply at the same time.
+    """
+
+    name = "msgspec"
+
+    def __init__(self):
+        try:
+            import msgspec
+        except ImportError as exc:
+            raise ImportError(
+                "MsgspecCodec requires msgspec, please install it with `pip install msgspec`."
+            ) from exc
+
+        self._json = msgspec.json
+        self._encoder = msgspec.json.Encoder()
+        self._decoder = msgspec.json.Decoder()
+        self._typed_decoders = {}
+
+    def encode(self, data: Any) -> bytes:
+        return self._encoder.encode(data)
+
+    def decode(self, content: bytes, type: type | None = None) -> Any:
+        if type is None:
+            return self._decoder.decode(content)
+
+        decoder = self._typed_decoders.get(type)
+        if decoder is None:
+            decoder = self._typed_decoders[type] = self._json.Decoder(type)
+        return decoder.decode(content)
+
+
+def default_codec() -> JsonCodec:
+    """
+    Returns the fastest codec available: msgspec, then orjson, then the standard library.
+
+    Returns:
+        JsonCodec: The codec.
+    """
+    for codec_class in (MsgspecCodec, OrjsonCodec):
+        try:
+            return codec_class()
+        except ImportError:
+            pass
+    return JsonCodec()
@@ -0,0 +1,230 @@
+import copy
+import random
+import sqlite3
+import threading
+import time
+from typing import Hashable
+
+from pykuda.classes.results import Balance
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS balances (
+    account TEXT PRIMARY KEY,
+    ledger INTEGER NOT NULL,
+    available INTEGER NOT NULL,
+    withdrawable INTEGER NOT NULL,
+    stale INTEGER NOT NULL DEFAULT 0,
+    synced_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+)
+"""
+
+
+class Ledger:
+    """
+    A local mirror of account balances, kept in SQLite so it survives restarts.
+
+    Balances are read from Kuda once, when the ledger is seeded, and then moved
+    by the amount of every successful fund, withdraw, transfer and bill purchase
+    made through PyKuda, so reading a balance does not need a request. Balances
+    are also held in memory, so reads are dictionary lookups.
+
+    When the outcome of a request moving money is unknown, e.g. it timed out,
+    the balances it may have moved are marked stale and are not served until
+    they are read from Kuda again. Money moved outside of PyKuda, such as
+    incoming transfers, is only picked up by drift checks, see
+    PyKuda.check_ledger_drift.
+
+    Accounts are keyed by tracking reference, and the main account by
+    constants.MAIN_ACCOUNT.
+
+    Attributes:
+        path (str): Path of the SQLite database, or ":memory:".
+        hits (int): Number of balances served from the ledger.
+        misses (int): Number of lookups of unknown or stale balances.
+    """
+
+    def __init__(self, path: str = ":memory:"):
+        """
+        Args:
+            path (str): Path of the SQLite database, created if missing. ":memory:"
+                keeps the ledger in memory only.
+        """
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        # With a write-ahead log, commits are not synced to disk one by one, which
+        # keeps updates cheap. A crashed process loses no update, a power loss only
+        # the last ones, which drift checks correct.
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.execute(_SCHEMA)
+        self._connection.commit()
+        # account: [balance, stale, version]; the version changes on every update,
+        # so a balance read from Kuda is not stored over a later movement.
+        rows = self._connection.execute(
+            "SELECT account, ledger, available, withdrawable, stale FROM balances"
+        )
+        self._balances = {
+            account: [Balance(ledger, available, withdrawable), bool(stale), 0]
+            for account, ledger, available, withdrawable, stale in rows
+        }
+
+    def get(self, account: Hashable) -> Balance | None:
+        """
+        Returns the balance of an account.
+
+        Args:
+            account (Hashable): The tracking reference of a virtual account, or
+                constants.MAIN_ACCOUNT.
+
+        Returns:
+            Balance | None: The balance, or None if it is unknown or stale.
+        """
+        entry = self._balances.get(account)
+        if entry is None or entry[1]:
+            self.misses += 1
+            return None
+        self.hits += 1
+        # A copy, so the caller can modify it without affecting the ledger.
+        return copy.copy(entry[0])
+
+    def version(self, account: Hashable) -> int:
+        """
+        Returns the version of an account's balance, passed to set by callers reading
+        the balance from Kuda.
+        """
+        entry = self._balances.get(account)
+        return entry[2] if entry is not None else 0
+
+    def set(
+        self, account: Hashable, balance: Balance, version: int | None = None
+    ) -> bool:
+        """
+        Stores the balance of an account read from Kuda.
+
+        Args:
+            account (Hashable): The tracking reference of a virtual account, or
+                constants.MAIN_ACCOUNT.
+            balance (Balance): The balance returned by Kuda.
+            version (int | None): The version of the balance when it was requested.
+                The balance is not stored if it has been updated since.
+
+        Returns:
+            bool: Whether the balance was stored.
+        """
+        with self._lock:
+            entry = self._balances.get(account)
+            current = entry[2] if entry is not None else 0
+            if version is not None and version != current:
+                return False
+            self._balances[account] = [copy.copy(balance), False, current + 1]
+            now = time.time()
+            self._connection.execute(
+                "INSERT OR REPLACE INTO balances VALUES (?, ?, ?, ?, 0, ?, ?)",
+                self._row(account, balance, now),
+            )
+            self._connection.commit()
+            return True
+
+    @staticmethod
+    def _row(account: Hashable, balance: Balance, now: float) -> tuple:
+        return (
+            account,
+            balance.ledger,
+            balance.available,
+            balance.withdrawable,
+            now,
+            now,
+        )
+
+    def apply(self, account: Hashable, amount: int) -> None:
+        """
+        Moves the balance of an account by an amount, after money was moved through PyKuda.
+
+        Unknown and stale balances are left as they are.
+
+        Args:
+            account (Hashable): The tracking reference of a virtual account, or
+                constants.MAIN_ACCOUNT.
+            amount (int): The amount credited, negative when debited.
+        """
+        with self._lock:
+            entry = self._balances.get(account)
+            if entry is None or entry[1]:
+                return
+            balance = entry[0]
+            entry[0] = Balance(
+                balance.ledger + amount,
+                balance.available + amount,
+                balance.withdrawable + amount,
+            )
+            entry[2] += 1
+            self._connection.execute(
+                "UPDATE balances SET ledger = ledger + ?, available = available + ?, "
+                "withdrawable = withdrawable + ?, updated_at = ? WHERE account = ?",
+                (amount, amount, amount, time.time(), account),
+            )
+            self._connection.commit()
+
+    def mark_stale(self, account: Hashable) -> None:
+        """
+        Stops serving the balance of an account until it is read from Kuda again.
+
+        Args:
+            account (Hashable): The tracking reference of a virtual account, or
+                constants.MAIN_ACCOUNT.
+        """
+        with self._lock:
+            entry = self._balances.get(account)
+            if entry is None:
+                return
+            entry[1] = True
+            entry[2] += 1
+            self._connection.execute(
+                "UPDATE balances SET stale = 1, updated_at = ? WHERE account = ?",
+                (time.time(), account),
+            )
+            self._connection.commit()
+
+    def stale(self) -> list:
+        """
+        Returns the accounts whose balance is stale.
+        """
+        return [account for account, entry in list(self._balances.items()) if entry[1]]
+
+    def sample(self, size: int) -> list:
+        """
+        Returns up to `size` accounts picked at random, e.g. for a drift check.
+        """
+        accounts = list(self._balances)
+        return random.sample(accounts, min(size, len(accounts)))
+
+    def stats(self) -> dict:
+        """
+        Returns the ledger counters.
+
+        Returns:
+            dict: The number of hits, misses, accounts and stale accounts.
+        """
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "accounts": len(self._balances),
+            "stale": len(self.stale()),
+        }
+
+    def __len__(self) -> int:
+        return len(self._balances)
+
+    def __contains__(self, account: Hashable) -> bool:
+        return account in self._balances
+
+    def close(self) -> None:
+        """
+        Closes the SQLite database.
+        """
+        with self._lock:
+            self._connection.close()
@@ -0,0 +1,181 @@
+import hashlib
+import json
+import os
+import secrets
+import threading
+
+PENDING = "pending"
+CREATED = "created"
+FAILED = "failed"
+
+
+class ProvisioningCheckpoint:
+    """
+    An append-only file recording the progress of create_virtual_accounts, so an
+    interrupted run can be resumed without creating accounts twice.
+
+    Every record is given a trackingReference, written to the file before the
+    account is created. The outcome is appended once Kuda answered. Each line is
+    a JSON object, and the last line of a record wins when the file is loaded.
+
+    Records are identified by their "tracking_reference" key when they have one,
+    or by a digest of their content otherwise, so a resumed run must be given the
+    same records.
+    """
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path (str): Path of the checkpoint file, created if missing.
+        """
+        self.path = path
+        self._entries = {}
+        self._lock = threading.Lock()
+        torn = self._load()
+        self._file = open(path, "a", encoding="utf-8")
+        if torn:
+            # Ends the torn line, so it does not swallow the next entry.
+            self._file.write("\n")
+
+    def _load(self) -> bool:
+        """Loads the entries of the file, and returns whether its last line is torn."""
+        line = "\n"
+        try:
+            with open(self.path, encoding="utf-8") as file:
+                for line in file:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        # A line torn by a crash while it was being written.
+                        continue
+                    self._entries[entry["key"]] = entry
+        except FileNotFoundError:
+            pass
+        return not line.endswith("\n")
+
+    @staticmethod
+    def key(record: dict) -> str:
+        """
+        Returns the key identifying a record across runs.
+
+        Args:
+            record (dict): A record passed to create_virtual_accounts.
+
+        Returns:
+            str: The record's tracking_reference, or a digest of its content.
+        """
+        if record.get("tracking_reference"):
+            return record["tracking_reference"]
+        content = json.dumps(record, sort_keys=True, default=str)
+        return hashlib.sha256(content.encode()).hexdigest()
+
+    def entry(self, record: dict) -> dict | None:
+        """
+        Returns the last checkpointed state of a record, if any.
+
+        Args:
+            record (dict): A record passed to create_virtual_accounts.
+
+        Returns:
+            dict | None: The state, with the keys "key", "tracking_reference" and
+            "status", and "account_number" or "status_code" once known.
+        """
+        return self._entries.get(self.key(record))
+
+    def is_created(self, record: dict) -> bool:
+        """
+        Checks whether the account of a record was created by an earlier run.
+        """
+        entry = self.entry(record)
+        return entry is not None and entry["status"] == CREATED
+
+    def start(self, record: dict) -> tuple[str, bool]:
+        """
+        Records that the account of a record is about to be created.
+
+        Args:
+            record (dict): A record passed to create_virtual_accounts.
+
+        Returns:
+            tuple[str, bool]: The trackingReference to create the account with,
+            and whether an earlier run already tried to, in which case the account
+            may exist.
+        """
+        key = self.key(record)
+        # Checked and claimed in one step, so concurrent starts of the same record
+        # share one trackingReference.
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                return entry["tracking_reference"], True
+
+            tracking_reference = record.get("tracking_reference") or secrets.token_hex(8)
+            self._write(
+                {"key": key, "tracking_reference": tracking_reference, "status": PENDING}
+            )
+            return tracking_reference, False
+
+    def finish(
+        self,
+        record: dict,
+        tracking_reference: str,
+        created: bool,
+        account_number: str | None = None,
+        status_code: int | None = None,
+    ) -> None:
+        """
+        Records the outcome of creating the account of a record.
+
+        Args:
+            record (dict): A record passed to create_virtual_accounts.
+            tracking_reference (str): The trackingReference returned by start.
+            created (bool): Whether the account exists.
+            account_number (str | None): The NUBAN of the created account.
+            status_code (int | None): The status code of a failed response.
+        """
+        entry = {
+            "key": self.key(record),
+            "tracking_reference": tracking_reference,
+            "status": CREATED if created else FAILED,
+        }
+        if created:
+            entry["account_number"] = account_number
+        else:
+            entry["status_code"] = status_code
+        self._append(entry)
+
+    def _append(self, entry: dict) -> None:
+        with self._lock:
+            self._write(entry)
+
+    def _write(self, entry: dict) -> None:
+        """Stores and writes an entry. Must be called with the lock held."""
+        self._entries[entry["key"]] = entry
+        self._file.write(json.dumps(entry) + "\n")
+        # Flushed line by line, so a crashed process loses no progress.
+        self._file.flush()
+
+    def stats(self) -> dict:
+        """
+        Returns the number of records per status.
+        """
+        counts = {PENDING: 0, CREATED: 0, FAILED: 0}
+        for entry in list(self._entries.values()):
+            counts[entry["status"]] += 1
+        return counts
+
+    def close(self) -> None:
+        """
+        Closes the checkpoint file.
+        """
+        with self._lock:
+            if not self._file.closed:
+                self._file.flush()
+                os.fsync(self._file.fileno())
+                self._file.close()
+
+    def __enter__(self) -> "ProvisioningCheckpoint":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
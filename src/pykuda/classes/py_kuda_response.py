@@ -1,16 +1,206 @@
-from dataclasses import dataclass
+import json
+from http import HTTPStatus
+
+
+class ErrorResponse:
+    """
+    A compact copy of the HTTP response to a request Kuda did not process.
+
+    Only the status code, body and headers are kept, so the HTTP response and its
+    connection buffers can be released as soon as the request is done.
+
+    Attributes:
+        status_code (int): The HTTP status code returned by Kuda's API.
+        content (bytes): The body of the response.
+        headers: The headers of the response.
+        codec (JsonCodec | None): Decodes the body in json(). None uses the
+            standard library.
+    """
+
+    __slots__ = ("status_code", "content", "headers", "codec")
+
+    def __init__(
+        self, status_code: int, content: bytes = b"", headers=None, codec=None
+    ):
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers if headers is not None else {}
+        self.codec = codec
+
+    @classmethod
+    def from_response(cls, response, codec=None) -> "ErrorResponse":
+        """
+        Copies the status code, body and headers of a requests or httpx response.
+
+        Args:
+            response: The HTTP response.
+            codec (JsonCodec | None): Decodes the body in json().
+
+        Returns:
+            ErrorResponse: The compact copy.
+        """
+        return cls(response.status_code, response.content, response.headers, codec)
+
+    @property
+    def text(self) -> str:
+        """The body of the response, decoded as UTF-8."""
+        return self.content.decode("utf-8", errors="replace")
+
+    @property
+    def reason(self) -> str:
+        """The reason phrase of the status code, e.g. 'Unauthorized'."""
+        try:
+            return HTTPStatus(self.status_code).phrase
+        except ValueError:
+            return ""
+
+    def json(self):
+        """
+        Decodes the body of the response, with the client's codec if set.
+
+        Raises:
+            ValueError: If the body is not valid JSON.
+        """
+        if self.codec is not None:
+            return self.codec.decode(self.content)
+        return json.loads(self.content)
+
+    def __repr__(self) -> str:
+        return f"<ErrorResponse [{self.status_code}]>"
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, ErrorResponse):
+            return NotImplemented
+        return (self.status_code, self.content) == (other.status_code, other.content)
+
+    __hash__ = None
+
 
-@dataclass
 class PyKudaResponse:
     """
     A class to simplify and standardize the response from Kuda API.
     Helps simplify Kuda's response by encapsulating the response details in a structured format.
-    
+
+    Responses to requests keep Kuda's raw reply and only decode and parse it the
+    first time one of their attributes is read, so results buffered by bulk jobs
+    stay small. When Kuda did not process a request, data is an ErrorResponse
+    holding only the status code, body and headers of the HTTP response.
+
     Attributes:
         status_code (int): The HTTP status code returned by Kuda's API.
         data (dict): The response data from Kuda's API, usually in dictionary form.
         error (bool): A flag indicating whether the response indicates an error (default is False).
+        retries (int): The number of times the request was retried (default is 0).
     """
-    status_code: int
-    data: dict
-    error: bool = False
+
+    __slots__ = ("_status_code", "_data", "_error", "retries", "_reply")
+
+    def __init__(
+        self, status_code: int, data, error: bool = False, retries: int = 0
+    ):
+        self._status_code = status_code
+        self._data = data
+        self._error = error
+        self.retries = retries
+        self._reply = None
+
+    @classmethod
+    def from_reply(
+        cls, spec, request_data: dict, response, codec, retries: int = 0
+    ) -> "PyKudaResponse":
+        """
+        Creates a response parsed lazily from Kuda's reply to a request.
+
+        Args:
+            spec (RequestSpec): Parses the reply of the request's service type.
+            request_data (dict): Request data for the API call.
+            response: The HTTP response of the request.
+            codec (JsonCodec): Decodes the body of the reply.
+            retries (int): The number of times the request was retried.
+
+        Returns:
+            PyKudaResponse: The response, parsed on first access.
+        """
+        # Kuda only processes requests answered with a 200, others need no parsing.
+        if response.status_code != 200:
+            return cls(
+                response.status_code,
+                ErrorResponse.from_response(response, codec),
+                error=True,
+                retries=retries,
+            )
+
+        instance = cls.__new__(cls)
+        instance.retries = retries
+        instance._reply = (spec, request_data, codec, response.content, response.headers)
+        return instance
+
+    def _resolve(self) -> None:
+        """Decodes and parses the pending reply, if any."""
+        reply = self._reply
+        if reply is None:
+            return
+
+        spec, request_data, codec, content, headers = reply
+        try:
+            response_data = codec.decode(content)
+        except ValueError:
+            response_data = None
+
+        if response_data and spec.is_success(response_data):
+            self._status_code = spec.status_code
+            self._data = spec.extract(response_data, request_data)
+            self._error = False
+        else:
+            self._status_code = 200
+            self._data = ErrorResponse(200, content, headers, codec)
+            self._error = True
+        self._reply = None
+
+    @property
+    def status_code(self) -> int:
+        self._resolve()
+        return self._status_code
+
+    @status_code.setter
+    def status_code(self, value: int) -> None:
+        self._resolve()
+        self._status_code = value
+
+    @property
+    def data(self):
+        self._resolve()
+        return self._data
+
+    @data.setter
+    def data(self, value) -> None:
+        self._resolve()
+        self._data = value
+
+    @property
+    def error(self) -> bool:
+        self._resolve()
+        return self._error
+
+    @error.setter
+    def error(self, value: bool) -> None:
+        self._resolve()
+        self._error = value
+
+    def __repr__(self) -> str:
+        return (
+            f"PyKudaResponse(status_code={self.status_code!r}, data={self.data!r}, "
+            f"error={self.error!r}, retries={self.retries!r})"
+        )
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, PyKudaResponse):
+            return NotImplemented
+        return (self.status_code, self.data, self.error, self.retries) == (
+            other.status_code,
+            other.data,
+            other.error,
+            other.retries,
+        )
+
+    __hash__ = None
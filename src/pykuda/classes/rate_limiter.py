@@ -0,0 +1,172 @@
+import os
+import threading
+import time
+from typing import Callable
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover
+    fcntl = None
+
+
+class TokenBucket:
+    """
+    Paces requests to Kuda with a token bucket shared by the threads of a process.
+
+    The bucket holds up to `burst` tokens and is refilled at `rate` tokens per
+    second. Every request takes a token; when the bucket is empty the request is
+    not rejected but waits until its token has been refilled, so requests are
+    spread evenly instead of tripping Kuda's rate limits.
+
+    Attributes:
+        rate (float): Number of requests allowed per second.
+        burst (float): Number of requests that can be sent at once after a quiet
+            period. Defaults to one second worth of requests.
+    """
+
+    # Whether reserve blocks on IO, so AsyncPyKuda calls it in a worker thread.
+    blocking = False
+
+    def __init__(
+        self,
+        rate: float,
+        burst: float | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if rate <= 0:
+            raise ValueError("rate must be greater than 0.")
+
+        self.rate = rate
+        self.burst = burst if burst is not None else max(1.0, rate)
+        self._clock = clock
+        self._tokens = self.burst
+        self._updated = clock()
+        self._lock = threading.Lock()
+        self.acquired = 0
+        self.paced = 0
+        self.waited = 0.0
+
+    def _take(self, tokens: float, updated: float, now: float, count: float) -> tuple:
+        """
+        Refills the bucket up to now and takes `count` tokens from it.
+
+        Args:
+            tokens (float): Tokens in the bucket at `updated`.
+            updated (float): Time the bucket was last refilled.
+            now (float): Current time.
+            count (float): Tokens to take.
+
+        Returns:
+            tuple: The tokens left, which are negative while requests are queued,
+            and the seconds to wait before the taken tokens are available.
+        """
+        tokens = min(self.burst, tokens + max(0.0, now - updated) * self.rate) - count
+        return tokens, (-tokens / self.rate if tokens < 0 else 0.0)
+
+    def reserve(self, count: float = 1) -> float:
+        """
+        Takes tokens from the bucket without waiting for them.
+
+        Args:
+            count (float): Number of tokens to take.
+
+        Returns:
+            float: Seconds to wait before sending the request.
+        """
+        with self._lock:
+            now = self._clock()
+            self._tokens, wait = self._take(self._tokens, self._updated, now, count)
+            self._updated = now
+            self._record(wait)
+            return wait
+
+    def acquire(self, count: float = 1) -> float:
+        """
+        Takes tokens from the bucket, sleeping until they are available.
+
+        Args:
+            count (float): Number of tokens to take.
+
+        Returns:
+            float: Seconds waited.
+        """
+        wait = self.reserve(count)
+        if wait:
+            time.sleep(wait)
+        return wait
+
+    def _record(self, wait: float) -> None:
+        self.acquired += 1
+        if wait:
+            self.paced += 1
+            self.waited += wait
+
+    def stats(self) -> dict:
+        """
+        Returns the number of requests that went through this bucket in this
+        process, how many of them had to wait and the total seconds waited.
+        """
+        return {"acquired": self.acquired, "paced": self.paced, "waited": self.waited}
+
+
+class FileTokenBucket(TokenBucket):
+    """
+    A TokenBucket whose state is kept in a file locked with flock, so that the
+    worker processes of a host using the same path split a single quota.
+
+    Works on POSIX systems only. The state file is created if it does not exist.
+
+    Attributes:
+        path (str): Path of the state file.
+        rate (float): Number of requests allowed per second, for all processes.
+        burst (float): Number of requests that can be sent at once after a quiet
+            period.
+    """
+
+    blocking = True
+
+    def __init__(
+        self,
+        path: str,
+        rate: float,
+        burst: float | None = None,
+        clock: Callable[[], float] = time.time,
+    ):
+        if fcntl is None:
+            raise ImportError("FileTokenBucket requires fcntl, which is POSIX only.")
+
+        super().__init__(rate, burst, clock)
+        self.path = path
+
+    def reserve(self, count: float = 1) -> float:
+        """
+        Takes tokens from the shared bucket without waiting for them.
+
+        Args:
+            count (float): Number of tokens to take.
+
+        Returns:
+            float: Seconds to wait before sending the request.
+        """
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            now = self._clock()
+            state = os.read(fd, 64).split()
+            tokens, updated = (
+                (float(state[0]), float(state[1]))
+                if len(state) == 2
+                else (self.burst, now)
+            )
+
+            tokens, wait = self._take(tokens, updated, now, count)
+
+            os.lseek(fd, 0, os.SEEK_SET)
+            os.ftruncate(fd, 0)
+            os.write(fd, f"{tokens!r} {now!r}".encode())
+        finally:
+            os.close(fd)
+
+        with self._lock:
+            self._record(wait)
+        return wait
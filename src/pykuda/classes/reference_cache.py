@@ -0,0 +1,284 @@
+import copy
+import json
+import logging
+import os
+import re
+import threading
+import time
+from typing import Any, Awaitable, Callable
+
+from pykuda.classes.py_kuda_response import PyKudaResponse
+from pykuda.constants import REFERENCE_DATA_STALE_TTL, REFERENCE_DATA_TTL
+
+logger = logging.getLogger("pykuda")
+
+
+class MemoryBackend:
+    """Keeps reference data entries in a dictionary for the life of the process."""
+
+    # Whether get and set block on IO, so ReferenceCache.aget calls them in a
+    # worker thread. Backends without this attribute are assumed to block.
+    blocking = False
+
+    def __init__(self):
+        self._entries = {}
+
+    def get(self, key: str) -> tuple[float, Any] | None:
+        """
+        Returns the `(stored_at, value)` entry stored for a key, or None.
+        """
+        return self._entries.get(key)
+
+    def set(self, key: str, stored_at: float, value: Any) -> None:
+        """
+        Stores a value for a key along with the time it was stored at.
+        """
+        self._entries[key] = (stored_at, value)
+
+
+class FileBackend:
+    """
+    Keeps reference data entries as JSON files in a directory, so they survive
+    restarts and can be shared by processes on the same host.
+
+    Entries are also kept in memory and only re-read when their file changes.
+    """
+
+    blocking = True
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._entries = {}
+        os.makedirs(directory, exist_ok=True)
+
+    def get(self, key: str) -> tuple[float, Any] | None:
+        """
+        Returns the `(stored_at, value)` entry stored for a key, or None.
+        """
+        path = self._path(key)
+        try:
+            modified_at = os.stat(path).st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+        cached = self._entries.get(key)
+        if cached and cached[0] == modified_at:
+            return cached[1]
+
+        try:
+            with open(path, encoding="utf-8") as file:
+                content = json.load(file)
+        except (OSError, ValueError):
+            return None
+
+        entry = (content["stored_at"], content["value"])
+        self._entries[key] = (modified_at, entry)
+        return entry
+
+    def set(self, key: str, stored_at: float, value: Any) -> None:
+        """
+        Stores a value for a key along with the time it was stored at.
+        """
+        path = self._path(key)
+        temporary_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+
+        with open(temporary_path, "w", encoding="utf-8") as file:
+            json.dump({"stored_at": stored_at, "value": value}, file)
+        # Replacing the file is atomic, so readers never see a partial entry.
+        os.replace(temporary_path, path)
+
+        self._entries[key] = (os.stat(path).st_mtime_ns, (stored_at, value))
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, re.sub(r"[^\w.-]", "_", key) + ".json")
+
+
+class ReferenceCache:
+    """
+    A TTL cache for reference data that rarely changes, such as the list of banks
+    and billers.
+
+    Entries younger than `ttl` are served from the cache. Entries older than `ttl`
+    but younger than `ttl + stale_ttl` are still served, while a background thread
+    fetches a fresh copy (stale-while-revalidate). Older entries are fetched
+    before returning. Failed responses are never cached. Every lookup returns its
+    own copy of the data, so callers can modify it without affecting the cache.
+
+    Attributes:
+        backend: Where entries are stored, a MemoryBackend by default.
+        ttl (float): Number of seconds an entry is fresh for.
+        stale_ttl (float): Number of seconds a stale entry is still served for
+            while it is refreshed.
+        hits (int): Number of lookups served with fresh data.
+        stale_hits (int): Number of lookups served with stale data.
+        misses (int): Number of lookups that waited on a request.
+    """
+
+    def __init__(
+        self,
+        backend: MemoryBackend | FileBackend | None = None,
+        ttl: float = REFERENCE_DATA_TTL,
+        stale_ttl: float = REFERENCE_DATA_STALE_TTL,
+    ):
+        self.backend = backend if backend is not None else MemoryBackend()
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._refreshing = set()
+        self._tasks = set()
+
+    def get(self, key: str, fetch: Callable[[], PyKudaResponse]) -> PyKudaResponse:
+        """
+        Returns the cached response for a key, calling `fetch` when it is missing or expired.
+
+        Args:
+            key (str): The cache key, e.g. "banks_list".
+            fetch (Callable): A callable making the request for the reference data.
+
+        Returns:
+            PyKudaResponse: The cached data, or the response of `fetch`.
+        """
+        cached = self._lookup(key)
+        if cached is not None:
+            response, stale = cached
+            if stale:
+                self._refresh_in_background(key, fetch)
+            return response
+
+        self.misses += 1
+        return self._fetch(key, fetch)
+
+    async def aget(
+        self, key: str, fetch: Callable[[], Awaitable[PyKudaResponse]]
+    ) -> PyKudaResponse:
+        """
+        Asynchronous version of get, used by AsyncPyKuda. Stale entries are
+        refreshed in a background task instead of a thread, and a backend that
+        blocks on IO, such as a FileBackend, is read and written in a worker thread.
+
+        Args:
+            key (str): The cache key, e.g. "banks_list".
+            fetch (Callable): A coroutine function making the request for the
+                reference data.
+
+        Returns:
+            PyKudaResponse: The cached data, or the response of `fetch`.
+        """
+        cached = await self._in_thread_if_blocking(self._lookup, key)
+        if cached is not None:
+            response, stale = cached
+            if stale:
+                self._arefresh_in_background(key, fetch)
+            return response
+
+        self.misses += 1
+        return await self._afetch(key, fetch)
+
+    def _lookup(self, key: str) -> tuple[PyKudaResponse, bool] | None:
+        """
+        Returns the cached response for a key and whether it is stale, or None if
+        it is missing or too old to be served.
+        """
+        entry = self.backend.get(key)
+        if entry is None:
+            return None
+
+        stored_at, value = entry
+        age = time.time() - stored_at
+
+        if age < self.ttl:
+            self.hits += 1
+            return PyKudaResponse(status_code=200, data=copy.deepcopy(value)), False
+
+        if age < self.ttl + self.stale_ttl:
+            self.stale_hits += 1
+            return PyKudaResponse(status_code=200, data=copy.deepcopy(value)), True
+
+        return None
+
+    def stats(self) -> dict:
+        """
+        Returns the cache counters.
+
+        Returns:
+            dict: The number of hits, stale hits and misses.
+        """
+        return {"hits": self.hits, "stale_hits": self.stale_hits, "misses": self.misses}
+
+    def _fetch(self, key: str, fetch: Callable[[], PyKudaResponse]) -> PyKudaResponse:
+        response = fetch()
+        if not response.error:
+            self.backend.set(key, time.time(), copy.deepcopy(response.data))
+        return response
+
+    async def _afetch(
+        self, key: str, fetch: Callable[[], Awaitable[PyKudaResponse]]
+    ) -> PyKudaResponse:
+        response = await fetch()
+        if not response.error:
+            await self._in_thread_if_blocking(
+                self.backend.set, key, time.time(), copy.deepcopy(response.data)
+            )
+        return response
+
+    async def _in_thread_if_blocking(self, func: Callable, *args):
+        if not getattr(self.backend, "blocking", True):
+            return func(*args)
+
+        import asyncio
+
+        return await asyncio.to_thread(func, *args)
+
+    def _start_refresh(self, key: str) -> bool:
+        with self._lock:
+            # Only one refresh per key at a time.
+            if key in self._refreshing:
+                return False
+            self._refreshing.add(key)
+            return True
+
+    def _finish_refresh(self, key: str) -> None:
+        with self._lock:
+            self._refreshing.discard(key)
+
+    def _refresh_in_background(
+        self, key: str, fetch: Callable[[], PyKudaResponse]
+    ) -> None:
+        if not self._start_refresh(key):
+            return
+
+        def refresh():
+            try:
+                self._fetch(key, fetch)
+            except Exception:
+                # The stale entry keeps being served and the next lookup retries.
+                logger.exception("Refreshing the cached %s failed.", key)
+            finally:
+                self._finish_refresh(key)
+
+        threading.Thread(target=refresh, daemon=True).start()
+
+    def _arefresh_in_background(
+        self, key: str, fetch: Callable[[], Awaitable[PyKudaResponse]]
+    ) -> None:
+        if not self._start_refresh(key):
+            return
+
+        async def refresh():
+            try:
+                await self._afetch(key, fetch)
+            except Exception:
+                # The stale entry keeps being served and the next lookup retries.
+                logger.exception("Refreshing the cached %s failed.", key)
+            finally:
+                self._finish_refresh(key)
+                self._tasks.discard(task)
+
+        import asyncio
+
+        task = asyncio.get_running_loop().create_task(refresh())
+        # The event loop only keeps weak references to its tasks.
+        self._tasks.add(task)
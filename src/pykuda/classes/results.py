@@ -0,0 +1,414 @@
+class Result(dict):
+    """
+    Base class of the typed results PyKuda returns as PyKudaResponse.data.
+
+    Results are the dictionaries returned by earlier versions, so they can be
+    serialized, updated and compared like before (balance["available"]), with
+    their fields also readable as attributes (balance.available).
+
+    Subclasses list their fields in _fields as (attribute, key) pairs, where key
+    is the dictionary key of the attribute. A missing key reads as None.
+    """
+
+    __slots__ = ()
+    _fields: tuple = ()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._keys = tuple(key for _, key in cls._fields)
+        for attribute, key in cls._fields:
+            setattr(cls, attribute, _field(key))
+
+    @classmethod
+    def _from_dict(cls, payload: dict) -> "Result":
+        """
+        Builds the result from a dictionary keyed like it, keeping every key.
+        """
+        result = cls.__new__(cls)
+        dict.update(result, payload)
+        return result
+
+    def to_dict(self) -> dict:
+        """
+        Returns the result as a plain dictionary.
+        """
+        return dict(self)
+
+    def __repr__(self) -> str:
+        fields = ", ".join(
+            f"{attribute}={getattr(self, attribute)!r}" for attribute, _ in self._fields
+        )
+        return f"{type(self).__name__}({fields})"
+
+
+def _field(key: str) -> property:
+    """Returns a property reading and writing a key of a Result."""
+
+    def get(result: Result):
+        return result.get(key)
+
+    def set(result: Result, value) -> None:
+        result[key] = value
+
+    return property(get, set)
+
+
+class Balance(Result):
+    """
+    The balance of the main account or of a virtual account, in kobo.
+
+    Attributes:
+        ledger (int): The ledger balance.
+        available (int): The available balance.
+        withdrawable (int): The withdrawable balance.
+    """
+
+    __slots__ = ()
+    _fields = (
+        ("ledger", "ledger"),
+        ("available", "available"),
+        ("withdrawable", "withdrawable"),
+    )
+
+    def __init__(self, ledger: int, available: int, withdrawable: int):
+        self.ledger = ledger
+        self.available = available
+        self.withdrawable = withdrawable
+
+    @classmethod
+    def from_payload(cls, payload: dict) -> "Balance":
+        """
+        Builds the balance from the data of Kuda's reply.
+
+        Args:
+            payload (dict): The data of Kuda's reply.
+
+        Returns:
+            Balance: The balance.
+        """
+        return cls(
+            payload["ledgerBalance"],
+            payload["availableBalance"],
+            payload["withdrawableBalance"],
+        )
+
+
+class BeneficiaryInfo(Result):
+    """
+    The recipient of a transfer, as confirmed by a name enquiry.
+
+    Attributes:
+        beneficiary_account_number (str): Account number of the recipient.
+        beneficiary_name (str): Name of the recipient.
+        beneficiary_code (str): Bank code of the recipient's bank.
+        session_id (str): Name enquiry session ID, passed to the transfer.
+        sender_account (str): Account number of the sender.
+        transfer_charge: Charge of the transfer.
+        name_enquiry_id: ID of the name enquiry.
+        tracking_reference (str): Tracking reference of the sending virtual account,
+            or an empty string for the main account.
+    """
+
+    __slots__ = ()
+    _fields = tuple(
+        (attribute, attribute)
+        for attribute in (
+            "beneficiary_account_number",
+            "beneficiary_name",
+            "beneficiary_code",
+            "session_id",
+            "sender_account",
+            "transfer_charge",
+            "name_enquiry_id",
+            "tracking_reference",
+        )
+    )
+
+    def __init__(
+        self,
+        beneficiary_account_number: str,
+        beneficiary_name: str,
+        beneficiary_code: str | None = None,
+        session_id: str | None = None,
+        sender_account: str | None = None,
+        transfer_charge=None,
+        name_enquiry_id=None,
+        tracking_reference: str = "",
+    ):
+        self.beneficiary_account_number = beneficiary_account_number
+        self.beneficiary_name = beneficiary_name
+        self.beneficiary_code = beneficiary_code
+        self.session_id = session_id
+        self.sender_account = sender_account
+        self.transfer_charge = transfer_charge
+        self.name_enquiry_id = name_enquiry_id
+        self.tracking_reference = tracking_reference
+
+    @classmethod
+    def from_payload(cls, payload: dict, tracking_reference: str) -> "BeneficiaryInfo":
+        """
+        Builds the recipient from the data of Kuda's reply.
+
+        Args:
+            payload (dict): The data of Kuda's reply.
+            tracking_reference (str): The SenderTrackingReference of the request.
+
+        Returns:
+            BeneficiaryInfo: The recipient.
+        """
+        return cls(
+            payload.get("beneficiaryAccountNumber"),
+            payload.get("beneficiaryName"),
+            payload.get("beneficiaryBankCode"),
+            payload.get("sessionID"),
+            payload.get("senderAccountNumber"),
+            payload.get("transferCharge"),
+            payload.get("nameEnquiryID"),
+            tracking_reference,
+        )
+
+
+class TransferReceipt(Result):
+    """
+    The references of a transfer accepted by Kuda.
+
+    Attributes:
+        transaction_reference (str): Kuda's reference of the transaction.
+        request_reference (str): The requestref of the transfer request.
+    """
+
+    __slots__ = ()
+    _fields = (
+        ("transaction_reference", "transaction_reference"),
+        ("request_reference", "request_reference"),
+    )
+
+    def __init__(self, transaction_reference: str, request_reference: str | None = None):
+        self.transaction_reference = transaction_reference
+        self.request_reference = request_reference
+
+    @classmethod
+    def from_payload(cls, payload: dict) -> "TransferReceipt":
+        """
+        Builds the receipt from Kuda's reply.
+
+        Args:
+            payload (dict): Kuda's decoded reply.
+
+        Returns:
+            TransferReceipt: The receipt.
+        """
+        return cls(payload.get("transactionReference"), payload.get("requestReference"))
+
+
+class TransactionNotification(Result):
+    """
+    A transaction notification sent by Kuda to a webhook, see pykuda.webhook.
+    Keys of the mapping are the ones used by Kuda, e.g.
+    notification["transactionReference"] for notification.transaction_reference.
+
+    Attributes:
+        transaction_reference (str): Kuda's reference of the transaction.
+        transaction_type (str): "Credit" or "Debit".
+        amount: Amount of the transaction.
+        account_number (str): Account number of the Kuda account.
+        account_name (str): Name of the Kuda account.
+        sender_name (str | None): Name of the sender.
+        recipient_name (str | None): Name of the recipient.
+        paying_bank (str | None): Bank of the sender.
+        narration (str | None): Description of the transaction.
+        session_id (str | None): NIBSS session ID of the transfer.
+        instrument_number (str | None): Instrument number of the transaction.
+        client_request_reference (str | None): The requestref of the request that
+            made the transaction, when it was made through the API.
+        transaction_date (str | None): Date of the transaction.
+    """
+
+    __slots__ = ()
+    # Kuda spells narration as narrations in notifications.
+    _fields = (
+        ("transaction_reference", "transactionReference"),
+        ("transaction_type", "transactionType"),
+        ("amount", "amount"),
+        ("account_number", "accountNumber"),
+        ("account_name", "accountName"),
+        ("sender_name", "senderName"),
+        ("recipient_name", "recipientName"),
+        ("paying_bank", "payingBank"),
+        ("narration", "narrations"),
+        ("session_id", "sessionId"),
+        ("instrument_number", "instrumentNumber"),
+        ("client_request_reference", "clientRequestRef"),
+        ("transaction_date", "transactionDate"),
+    )
+
+    def __init__(
+        self,
+        transaction_reference: str,
+        transaction_type: str | None = None,
+        amount=None,
+        account_number: str | None = None,
+        account_name: str | None = None,
+        sender_name: str | None = None,
+        recipient_name: str | None = None,
+        paying_bank: str | None = None,
+        narration: str | None = None,
+        session_id: str | None = None,
+        instrument_number: str | None = None,
+        client_request_reference: str | None = None,
+        transaction_date: str | None = None,
+    ):
+        self.transaction_reference = transaction_reference
+        self.transaction_type = transaction_type
+        self.amount = amount
+        self.account_number = account_number
+        self.account_name = account_name
+        self.sender_name = sender_name
+        self.recipient_name = recipient_name
+        self.paying_bank = paying_bank
+        self.narration = narration
+        self.session_id = session_id
+        self.instrument_number = instrument_number
+        self.client_request_reference = client_request_reference
+        self.transaction_date = transaction_date
+
+    @classmethod
+    def from_payload(cls, payload: dict) -> "TransactionNotification":
+        """
+        Builds the notification from the body Kuda posted.
+
+        Args:
+            payload (dict): The decoded body of the notification.
+
+        Returns:
+            TransactionNotification: The notification.
+
+        Raises:
+            ValueError: If the payload has no transactionReference.
+        """
+        if not isinstance(payload, dict) or not payload.get("transactionReference"):
+            raise ValueError("The notification has no transactionReference.")
+        return cls._from_dict(payload)
+
+
+class VirtualAccount(Result):
+    """
+    A virtual account. Keys of the mapping are the ones used by Kuda, e.g.
+    account["accountNumber"] for account.account_number.
+
+    Attributes:
+        account_number (str): The NUBAN of the virtual account.
+        email (str): Email of the account holder.
+        phone_number (str): Phone number of the account holder.
+        last_name (str): Last name of the account holder.
+        first_name (str): First name of the account holder.
+        middle_name (str | None): Middle name of the account holder.
+        business_name (str | None): Business name of the account.
+        account_name (str): Name of the account.
+        tracking_reference (str): Tracking reference of the account.
+        creation_date (str): ISO 8601 creation date of the account.
+        is_deleted (bool): Whether the account is deleted.
+    """
+
+    __slots__ = ()
+    # Kuda spells businessName as bussinessName in virtual accounts.
+    _fields = (
+        ("account_number", "accountNumber"),
+        ("email", "email"),
+        ("phone_number", "phoneNumber"),
+        ("last_name", "lastName"),
+        ("first_name", "firstName"),
+        ("middle_name", "middleName"),
+        ("business_name", "bussinessName"),
+        ("account_name", "accountName"),
+        ("tracking_reference", "trackingReference"),
+        ("creation_date", "creationDate"),
+        ("is_deleted", "isDeleted"),
+    )
+
+    def __init__(
+        self,
+        account_number: str,
+        email: str | None = None,
+        phone_number: str | None = None,
+        last_name: str | None = None,
+        first_name: str | None = None,
+        middle_name: str | None = None,
+        business_name: str | None = None,
+        account_name: str | None = None,
+        tracking_reference: str | None = None,
+        creation_date: str | None = None,
+        is_deleted: bool = False,
+    ):
+        self.account_number = account_number
+        self.email = email
+        self.phone_number = phone_number
+        self.last_name = last_name
+        self.first_name = first_name
+        self.middle_name = middle_name
+        self.business_name = business_name
+        self.account_name = account_name
+        self.tracking_reference = tracking_reference
+        self.creation_date = creation_date
+        self.is_deleted = is_deleted
+
+    @classmethod
+    def from_payload(cls, payload: dict) -> "VirtualAccount":
+        """
+        Builds the account from its data in Kuda's reply, keeping the keys that
+        are not fields too.
+
+        Args:
+            payload (dict): The account data.
+
+        Returns:
+            VirtualAccount: The account.
+        """
+        return cls._from_dict(payload)
+
+
+class VirtualAccountList(list):
+    """
+    A list of virtual accounts, as VirtualAccount dictionaries keyed like Kuda's
+    reply, e.g. accounts.column("account_number") lists the account number of
+    every account.
+    """
+
+    __slots__ = ()
+
+    @classmethod
+    def from_payload(cls, accounts: list[dict]) -> "VirtualAccountList":
+        """
+        Builds the list from the accounts of Kuda's reply.
+
+        Args:
+            accounts (list[dict]): The accounts of Kuda's reply.
+
+        Returns:
+            VirtualAccountList: The accounts.
+        """
+        from_dict = VirtualAccount._from_dict
+        return cls(from_dict(account) for account in accounts)
+
+    def column(self, attribute: str) -> list:
+        """
+        Returns the values of a VirtualAccount attribute for every account. The
+        values are read from the accounts on every call, so they reflect changes.
+
+        Args:
+            attribute (str): The attribute, e.g. "account_number".
+
+        Returns:
+            list: The values, in the order of the accounts.
+        """
+        key = dict(VirtualAccount._fields)[attribute]
+        return [account.get(key) for account in self]
+
+    def to_list(self) -> list[dict]:
+        """
+        Returns the accounts as plain dictionaries keyed like Kuda's reply.
+        """
+        return [dict(account) for account in self]
+
+    def __repr__(self) -> str:
+        return f"VirtualAccountList({len(self)} accounts)"
@@ -0,0 +1,125 @@
+import random
+import threading
+from dataclasses import dataclass, replace
+
+from pykuda.constants import (
+    RETRY_BACKOFF,
+    RETRY_BUDGET_RATIO,
+    RETRY_BUDGET_RESERVE,
+    RETRY_MAX_ATTEMPTS,
+    RETRY_MAX_BACKOFF,
+    RETRY_STATUSES,
+    RETRY_UNPROCESSED_STATUSES,
+)
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """
+    Describes when and how a failed request to Kuda is retried.
+
+    Retries resend the exact same request data, so the requestref and any
+    trackingReference of the original attempt are reused. Whether Kuda
+    recognises a resent request as the same one is not documented, so requests
+    moving money use MONEY_RETRY, which only retries requests that certainly
+    were not processed.
+
+    Attributes:
+        max_attempts (int): Maximum number of attempts, including the first one.
+            1 disables retries.
+        backoff (float): Base delay in seconds, doubled after every attempt.
+        max_backoff (float): Maximum delay in seconds between two attempts.
+        statuses (tuple): HTTP status codes that are retried.
+        retry_timeouts (bool): Whether timeouts and connection errors are retried,
+            including the ones after the request may have reached Kuda.
+        retry_unsent (bool): Whether errors raised before the request was sent are
+            retried, e.g. a refused connection or a failed token request.
+    """
+
+    max_attempts: int = RETRY_MAX_ATTEMPTS
+    backoff: float = RETRY_BACKOFF
+    max_backoff: float = RETRY_MAX_BACKOFF
+    statuses: tuple = RETRY_STATUSES
+    retry_timeouts: bool = True
+    retry_unsent: bool = True
+
+    def delay(self, attempt: int) -> float:
+        """
+        Returns the delay before the next attempt, with full jitter.
+
+        Args:
+            attempt (int): Number of attempts made so far.
+
+        Returns:
+            float: Seconds to wait, picked at random up to the exponential backoff.
+        """
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2 ** (attempt - 1)))
+
+    def unprocessed_only(self) -> "RetryPolicy":
+        """
+        Returns a copy of the policy only retrying requests that certainly were not
+        processed: unsent requests and RETRY_UNPROCESSED_STATUSES. Used for the
+        service types moving money.
+
+        Returns:
+            RetryPolicy: The restricted policy.
+        """
+        return replace(
+            self,
+            statuses=tuple(
+                status for status in self.statuses if status in RETRY_UNPROCESSED_STATUSES
+            ),
+            retry_timeouts=False,
+        )
+
+
+NO_RETRY = RetryPolicy(max_attempts=1)
+# Default policy of the service types moving money: only requests rejected by the
+# rate limiter or never sent are retried, so money is never moved twice.
+MONEY_RETRY = RetryPolicy().unprocessed_only()
+
+
+class RetryBudget:
+    """
+    Caps retries to a fraction of requests, so retries cannot multiply the load
+    on Kuda during an outage.
+
+    Every request deposits `ratio` into the budget and every retry withdraws 1.
+    The budget starts at, and never exceeds, `reserve`.
+
+    Attributes:
+        ratio (float): Retries allowed per request, e.g. 0.2 for one retry per
+            five requests.
+        reserve (float): Maximum number of retries that can be saved up.
+    """
+
+    def __init__(
+        self, ratio: float = RETRY_BUDGET_RATIO, reserve: float = RETRY_BUDGET_RESERVE
+    ):
+        self.ratio = ratio
+        self.reserve = reserve
+        self._balance = reserve
+        self._lock = threading.Lock()
+
+    def record_request(self) -> None:
+        """Deposits a request into the budget."""
+        with self._lock:
+            self._balance = min(self.reserve, self._balance + self.ratio)
+
+    def try_retry(self) -> bool:
+        """
+        Withdraws a retry from the budget.
+
+        Returns:
+            bool: True if the retry is allowed.
+        """
+        with self._lock:
+            if self._balance < 1:
+                return False
+            self._balance -= 1
+            return True
+
+    @property
+    def balance(self) -> float:
+        """Number of retries currently available."""
+        return self._balance
@@ -1,8 +1,14 @@
 import secrets
-from typing import Optional
+from typing import Callable, Optional
 
+from pykuda.classes.journal import DECLINED, SUCCEEDED, UNKNOWN
 from pykuda.classes.py_kuda_response import PyKudaResponse
-from pykuda.constants import ServiceTypeConstants
+from pykuda.classes.results import BeneficiaryInfo
+from pykuda.constants import (
+    MAIN_ACCOUNT,
+    ServiceTypeConstants,
+    VIRTUAL_ACCOUNTS_PAGE_SIZE,
+)
 from pykuda.service_type_utils import ServiceTypeUtils
 
 
@@ -10,8 +16,45 @@ class ServiceType(ServiceTypeUtils):
     """
     This class handles all Kuda API service functionalities, providing methods for each
     type of transaction.
+
+    Attributes:
+        reference_cache (ReferenceCache | None): Cache for the list of banks and
+            billers. When None, they are requested every time.
+        display_name_cache (TTLCache | None): Cache for the name enquiries made
+            with confirm_transfer_recipient(for_display=True). When None, every
+            name enquiry is requested.
+        balance_cache (BalanceCache | None): Cache for balance snapshots, invalidated
+            by the methods moving money. When None, every balance is requested.
+        ledger (Ledger | None): Local mirror of balances, updated by the methods
+            moving money. When None, balances are not mirrored.
+        journal (Journal | None): Write-ahead journal of the requests moving money.
+            When None, they are not journaled.
     """
 
+    reference_cache = None
+    display_name_cache = None
+    balance_cache = None
+    ledger = None
+    journal = None
+    _bank_index = None
+
+    def _cached_reference_data(
+        self, key: str, fetch: Callable[[], PyKudaResponse]
+    ) -> PyKudaResponse:
+        """
+        Returns reference data from the reference cache, or fetches it if there is none.
+
+        Args:
+            key (str): The cache key of the reference data.
+            fetch (Callable): A callable making the request for the reference data.
+
+        Returns:
+            PyKudaResponse: The cached or fetched reference data.
+        """
+        if self.reference_cache is None:
+            return fetch()
+        return self.reference_cache.get(key, fetch)
+
     def banks_list(self) -> PyKudaResponse:
         """
         Retrieves a list of supported banks.
@@ -19,8 +62,229 @@ class ServiceType(ServiceTypeUtils):
         Returns:
             PyKudaResponse:  A custom response object containing the list of banks.
         """
-        data = self._generate_common_data(ServiceTypeConstants.BANK_LIST.value)
-        return self._banks_list_request(data)
+
+        def fetch():
+            data = self._generate_common_data(ServiceTypeConstants.BANK_LIST.value)
+            return self._request(data)
+
+        return self._cached_reference_data("banks_list", fetch)
+
+    def _cached_balance(
+        self, key: str, fetch: Callable[[], PyKudaResponse], use_cache: bool
+    ) -> PyKudaResponse:
+        """
+        Returns a balance from the ledger or the balance cache, or fetches it if
+        there is none. Fetched balances are stored in the ledger.
+
+        Args:
+            key (str): The tracking reference of a virtual account, or MAIN_ACCOUNT.
+            fetch (Callable): A callable making the balance request.
+            use_cache (bool): Set to False to bypass the ledger and the cache.
+
+        Returns:
+            PyKudaResponse: The local or fetched balance.
+        """
+        if self.ledger is not None:
+            if use_cache:
+                balance = self.ledger.get(key)
+                if balance is not None:
+                    return PyKudaResponse(status_code=200, data=balance)
+
+            fetch = self._recorded_in_ledger(key, fetch)
+
+        if self.balance_cache is None or not use_cache:
+            return fetch()
+        return self.balance_cache.get(key, fetch)
+
+    def _recorded_in_ledger(
+        self, key: str, fetch: Callable[[], PyKudaResponse]
+    ) -> Callable[[], PyKudaResponse]:
+        """
+        Wraps a balance request so the balance it returns is stored in the ledger,
+        unless the ledger balance was updated while it was in flight.
+        """
+        version = self.ledger.version(key)
+
+        def fetch_and_record():
+            response = fetch()
+            if not response.error:
+                self.ledger.set(key, response.data, version)
+            return response
+
+        return fetch_and_record
+
+    def _move_money(
+        self,
+        data: dict,
+        amount: str,
+        debited: str | None = None,
+        credited: str | None = None,
+    ) -> PyKudaResponse:
+        """
+        Sends a request moving money, journaling it and updating the balances of
+        the accounts it was moved from and to.
+
+        With a journal, the request is synced to disk before it is sent.
+
+        Args:
+            data (dict): Request data for the API call.
+            amount (str): The amount moved.
+            debited (str | None): Tracking reference of the virtual account debited,
+                MAIN_ACCOUNT, or None when money comes from outside of PyKuda.
+            credited (str | None): Tracking reference of the virtual account credited,
+                MAIN_ACCOUNT, or None when money leaves to another account.
+
+        Returns:
+            PyKudaResponse: The response of the request.
+        """
+        if (
+            self.balance_cache is None
+            and self.ledger is None
+            and self.journal is None
+        ):
+            return self._request(data)
+
+        if self.journal is not None:
+            self.journal.record_request(data, amount, debited, credited)
+        return self._send_money(data, amount, debited, credited)
+
+    def _send_money(
+        self,
+        data: dict,
+        amount: str,
+        debited: str | None = None,
+        credited: str | None = None,
+        recovering: bool = False,
+    ) -> PyKudaResponse:
+        """
+        Sends a request moving money, and records its outcome.
+
+        Cached balances are invalidated even if the request failed, since a timed
+        out request may still have been processed. Ledger balances are moved by
+        the amount when Kuda processed the request, and marked stale when the
+        outcome is unknown. A request that never reached Kuda, e.g. because its
+        circuit was open or no token could be generated, is journaled as DECLINED
+        and leaves the ledger untouched.
+
+        Args:
+            data (dict): Request data for the API call.
+            amount (str): The amount moved.
+            debited (str | None): The account debited, see _move_money.
+            credited (str | None): The account credited, see _move_money.
+            recovering (bool): Whether the request is resent from the journal. Kuda
+                may have processed it before the ledger was last updated, so its
+                balances are marked stale rather than moved.
+
+        Returns:
+            PyKudaResponse: The response of the request.
+        """
+        response = None
+        delivery = {}
+        try:
+            response = self._request(data, delivery)
+            return response
+        finally:
+            outcome = self._outcome(response, delivery.get("sent", False))
+            if self.journal is not None:
+                self.journal.record_outcome(
+                    data["requestref"],
+                    outcome,
+                    response.status_code if response is not None else None,
+                )
+
+            movements = [
+                (account, sign)
+                for account, sign in ((debited, -1), (credited, 1))
+                if account is not None
+            ]
+            for account, _ in movements:
+                if self.balance_cache is not None:
+                    self.balance_cache.invalidate(account)
+            if self.ledger is not None:
+                if recovering and outcome == SUCCEEDED:
+                    outcome = UNKNOWN
+                self._record_movement(outcome, amount, movements)
+
+    @staticmethod
+    def _outcome(response: PyKudaResponse | None, sent: bool = True) -> str:
+        """
+        Tells whether Kuda processed a request moving money.
+
+        Args:
+            response (PyKudaResponse | None): The response of the request, or None
+                if it raised.
+            sent (bool): Whether the request may have reached Kuda.
+
+        Returns:
+            str: SUCCEEDED if Kuda processed it, DECLINED if it never reached Kuda
+            or Kuda answered it with a 200 or a 4xx without processing it, UNKNOWN
+            otherwise (network errors, 5xx).
+        """
+        if not sent:
+            return DECLINED
+        if response is None:
+            return UNKNOWN
+        if not response.error:
+            return SUCCEEDED
+        if 0 < response.status_code < 500:
+            return DECLINED
+        return UNKNOWN
+
+    def _record_movement(self, outcome: str, amount: str, movements: list) -> None:
+        """
+        Applies a request moving money to the ledger.
+
+        Args:
+            outcome (str): The outcome of the request, see _outcome.
+            amount (str): The amount moved.
+            movements (list): (account, sign) tuples, where sign is -1 for the
+                debited account and 1 for the credited one.
+        """
+        if outcome == DECLINED:
+            return
+
+        try:
+            amount = int(amount)
+        except (TypeError, ValueError):
+            amount = None
+
+        for account, sign in movements:
+            if outcome == SUCCEEDED and amount is not None:
+                self.ledger.apply(account, sign * amount)
+            else:
+                self.ledger.mark_stale(account)
+
+    def bank_name(self, bank_code: str) -> str | None:
+        """
+        Looks up the name of a bank from its code.
+
+        The lookup uses an index built from banks_list, so with a reference cache
+        it does not touch the network once the list of banks is cached.
+
+        Args:
+            bank_code (str): Code of the bank.
+
+        Returns:
+            str | None: Name of the bank, or None if the code is unknown or the
+            list of banks could not be retrieved.
+        """
+        return self._bank_name_from(self.banks_list(), bank_code)
+
+    def _bank_name_from(self, response: PyKudaResponse, bank_code: str) -> str | None:
+        """
+        Looks up the name of a bank in a banks_list response, see bank_name.
+        """
+        if response.error:
+            return None
+
+        # Rebuild the index only when the list of banks has changed.
+        if self._bank_index is None or self._bank_index[0] is not response.data:
+            self._bank_index = (
+                response.data,
+                {bank.get("bankCode"): bank.get("bankName") for bank in response.data},
+            )
+
+        return self._bank_index[1].get(bank_code)
 
     def create_virtual_account(
         self,
@@ -35,6 +299,7 @@ class ServiceType(ServiceTypeUtils):
         id_type: Optional[int] = None,
         bvn: Optional[str] = None,
         nin: Optional[str] = None,
+        tracking_reference: Optional[str] = None,
     ) -> PyKudaResponse:
         """
         Creates a new virtual account.
@@ -56,6 +321,8 @@ class ServiceType(ServiceTypeUtils):
             bvn (str, optional): Bank Verification Number (BVN). Defaults to None.
             nin (str, optional): National Identification Number (NIN). Defaults to None.
             face_image_url (str, optional): URL of the face image. Defaults to None.
+            tracking_reference (str, optional): Tracking reference of the new account.
+                Defaults to a random one.
 
         Returns:
             PyKudaResponse: A custom response object containing details
@@ -72,7 +339,7 @@ class ServiceType(ServiceTypeUtils):
                 "firstName": first_name,
                 "middleName": middle_name,
                 "businessName": business_name,
-                "trackingReference": secrets.token_hex(8),
+                "trackingReference": tracking_reference or secrets.token_hex(8),
                 "VerificationType": verification_type,
                 "IdType": id_type,
                 "NIN": nin,
@@ -81,7 +348,7 @@ class ServiceType(ServiceTypeUtils):
             }
         )
 
-        return self._create_virtual_account_request(data)
+        return self._request(data)
 
     def upgrade_virtual_account(
         self,
@@ -127,35 +394,57 @@ class ServiceType(ServiceTypeUtils):
             }
         )
 
-        return self._create_virtual_account_request(data)
+        return self._request(data)
 
-    def virtual_account_balance(self, tracking_reference: str) -> PyKudaResponse:
+    def virtual_account_balance(
+        self, tracking_reference: str, use_cache: bool = True
+    ) -> PyKudaResponse:
         """
         Retrieves the balance of a virtual account.
 
+        If a balance cache is set, a recent snapshot may be returned, and concurrent
+        calls for the same account share one request.
+
         Args:
             tracking_reference (str): Tracking reference of the virtual account.
+            use_cache (bool, optional): Set to False to bypass the balance cache
+            for this call. Defaults to True.
 
         Returns:
             PyKudaResponse: Response object containing the virtual account balance.
         """
-        data = self._generate_common_data(
-            ServiceTypeConstants.RETRIEVE_VIRTUAL_ACCOUNT_BALANCE.value
-        )
-        data["Data"].update({"trackingReference": tracking_reference})
-        return self._virtual_account_balance_request(data)
 
-    def main_account_balance(self) -> PyKudaResponse:
+        def fetch():
+            data = self._generate_common_data(
+                ServiceTypeConstants.RETRIEVE_VIRTUAL_ACCOUNT_BALANCE.value
+            )
+            data["Data"].update({"trackingReference": tracking_reference})
+            return self._request(data)
+
+        return self._cached_balance(tracking_reference, fetch, use_cache)
+
+    def main_account_balance(self, use_cache: bool = True) -> PyKudaResponse:
         """
         Retrieves the balance of the main account.
 
+        If a balance cache is set, a recent snapshot may be returned, and concurrent
+        calls share one request.
+
+        Args:
+            use_cache (bool, optional): Set to False to bypass the balance cache
+            for this call. Defaults to True.
+
         Returns:
             PyKudaResponse: Response object containing the main account balance.
         """
-        data = self._generate_common_data(
-            ServiceTypeConstants.ADMIN_RETRIEVE_MAIN_ACCOUNT_BALANCE.value
-        )
-        return self._main_account_balance_request(data)
+
+        def fetch():
+            data = self._generate_common_data(
+                ServiceTypeConstants.ADMIN_RETRIEVE_MAIN_ACCOUNT_BALANCE.value
+            )
+            return self._request(data)
+
+        return self._cached_balance(MAIN_ACCOUNT, fetch, use_cache)
 
     def fund_virtual_account(
         self, tracking_reference: str, amount: str, narration: str
@@ -175,7 +464,9 @@ class ServiceType(ServiceTypeUtils):
             ServiceTypeConstants.FUND_VIRTUAL_ACCOUNT.value, tracking_reference
         )
         data["Data"].update({"amount": amount, "narration": narration})
-        return self._fund_virtual_account_request(data)
+        return self._move_money(
+            data, amount, debited=MAIN_ACCOUNT, credited=tracking_reference
+        )
 
     def withdraw_from_virtual_account(
         self, tracking_reference: str, amount: str, narration: str
@@ -195,22 +486,34 @@ class ServiceType(ServiceTypeUtils):
             ServiceTypeConstants.WITHDRAW_VIRTUAL_ACCOUNT.value, tracking_reference
         )
         data["Data"].update({"amount": int(amount), "narration": narration})
-        return self._withdraw_from_virtual_account_request(data)
+        return self._move_money(
+            data, amount, debited=tracking_reference, credited=MAIN_ACCOUNT
+        )
 
     def confirm_transfer_recipient(
         self,
         beneficiary_account_number: str,
         beneficiary_bank_code: str,
         tracking_reference: str | None = None,
+        for_display: bool = False,
     ) -> PyKudaResponse:
         """
         Confirm recipient details for fund transfer.
 
+        A name enquiry session ID is only valid for one transfer, so every call
+        makes a fresh name enquiry unless for_display is set. Lookups made to
+        show a beneficiary's name are served from the display name cache, if
+        set, which keeps the name and account fields of successful results per
+        bank code, account number and sender tracking reference, but no session ID.
+
         Args:
             beneficiary_account_number (str): Account number of the recipient.
             beneficiary_bank_code (str): Bank code of the recipient's bank.
             tracking_reference (str, optional): Tracking reference for virtual
             account transfer. Defaults to None.
+            for_display (bool, optional): Set to True when the result is only
+            shown, not used for a transfer, to serve it from the display name
+            cache. Defaults to False.
 
         Returns:
             PyKudaResponse: Response object containing the result of the request.
@@ -226,7 +529,35 @@ class ServiceType(ServiceTypeUtils):
                 "isRequestFromVirtualAccount": bool(tracking_reference),
             }
         )
-        return self._confirm_transfer_recipient_request(data)
+
+        if self.display_name_cache is None or not for_display:
+            return self._request(data)
+
+        key = (
+            data["Data"]["beneficiaryBankCode"],
+            data["Data"]["beneficiaryAccountNumber"],
+            data["Data"]["SenderTrackingReference"],
+        )
+        beneficiary = self.display_name_cache.get(key)
+        if beneficiary is not None:
+            # A copy, so the caller can modify it without affecting the cache.
+            return PyKudaResponse(status_code=200, data=BeneficiaryInfo(**beneficiary))
+
+        response = self._request(data)
+        if not response.error:
+            recipient = response.data
+            # Kuda's session ID and charge are only valid for one transfer.
+            self.display_name_cache.set(
+                key,
+                BeneficiaryInfo(
+                    beneficiary_account_number=recipient.beneficiary_account_number,
+                    beneficiary_name=recipient.beneficiary_name,
+                    beneficiary_code=recipient.beneficiary_code,
+                    sender_account=recipient.sender_account,
+                    tracking_reference=recipient.tracking_reference,
+                ),
+            )
+        return response
 
     def send_funds_from_main_account(
         self,
@@ -272,7 +603,7 @@ class ServiceType(ServiceTypeUtils):
                 "clientFeeCharge": 0,
             }
         )
-        return self._send_funds_from_main_account_request(data)
+        return self._move_money(data, amount, debited=MAIN_ACCOUNT)
 
     def send_funds_from_virtual_account(
         self,
@@ -316,7 +647,7 @@ class ServiceType(ServiceTypeUtils):
                 "clientFeeCharge": 0,
             }
         )
-        return self._send_funds_from_virtual_account_request(data)
+        return self._move_money(data, amount, debited=tracking_reference)
 
     def billers(
         self,
@@ -331,11 +662,15 @@ class ServiceType(ServiceTypeUtils):
         Returns:
             PyKudaResponse: Response object containing the result of the request.
         """
-        data = self._generate_common_data(
-            ServiceTypeConstants.GET_BILLERS_BY_TYPE.value
-        )
-        data["Data"].update({"BillTypeName": biller_type})
-        return self._billers_request(data)
+
+        def fetch():
+            data = self._generate_common_data(
+                ServiceTypeConstants.GET_BILLERS_BY_TYPE.value
+            )
+            data["Data"].update({"BillTypeName": biller_type})
+            return self._request(data)
+
+        return self._cached_reference_data(f"billers:{biller_type}", fetch)
 
     def verify_bill_customer(
         self,
@@ -361,7 +696,7 @@ class ServiceType(ServiceTypeUtils):
                 "CustomerIdentification": customer_identifier,
             }
         )
-        return self._verify_bill_customer_request(data)
+        return self._request(data)
 
     def virtual_account_purchase_bill(
         self,
@@ -395,7 +730,7 @@ class ServiceType(ServiceTypeUtils):
                 "CustomerIdentifier": customer_identifier,
             }
         )
-        return self._virtual_account_purchase_bill_request(data)
+        return self._move_money(data, amount, debited=tracking_reference)
 
     def admin_purchase_bill(
         self,
@@ -432,7 +767,7 @@ class ServiceType(ServiceTypeUtils):
                 "CustomerFirstName": client_first_name,
             }
         )
-        return self._admin_purchase_bill_request(data)
+        return self._move_money(data, amount, debited=MAIN_ACCOUNT)
 
     def disable_virtual_account(self, tracking_reference: str) -> PyKudaResponse:
         """
@@ -448,7 +783,7 @@ class ServiceType(ServiceTypeUtils):
         data = self._generate_common_data(
             ServiceTypeConstants.ADMIN_DISABLE_VIRTUAL_ACCOUNT.value, tracking_reference
         )
-        return self._disable_virtual_account_request(data)
+        return self._request(data)
 
     def enable_virtual_account(self, tracking_reference: str) -> PyKudaResponse:
         """
@@ -463,7 +798,7 @@ class ServiceType(ServiceTypeUtils):
         data = self._generate_common_data(
             ServiceTypeConstants.ADMIN_ENABLE_VIRTUAL_ACCOUNT.value, tracking_reference
         )
-        return self._enable_virtual_account_request(data)
+        return self._request(data)
 
     # Virtual account update. According to Kuda, you can only update first name, last name,
     # and email. You can't update the phone number.
@@ -485,11 +820,17 @@ class ServiceType(ServiceTypeUtils):
             ServiceTypeConstants.ADMIN_RETRIEVE_SINGLE_VIRTUAL_ACCOUNT.value,
             tracking_reference,
         )
-        return self._retrieve_single_virtual_account_request(data)
+        return self._request(data)
 
-    def retrieve_all_virtual_accounts(self) -> PyKudaResponse:
+    def retrieve_all_virtual_accounts(
+        self, page_size: int = VIRTUAL_ACCOUNTS_PAGE_SIZE, page_number: int = 1
+    ) -> PyKudaResponse:
         """
-        Retrieves all virtual accounts
+        Retrieves a page of virtual accounts
+
+        Args:
+            page_size (int, optional): Number of accounts per page. Defaults to 30.
+            page_number (int, optional): Page to retrieve, starting at 1. Defaults to 1.
 
         Returns:
             PyKudaResponse: Response object containing the result of the request.
@@ -497,9 +838,11 @@ class ServiceType(ServiceTypeUtils):
         data = self._generate_common_data(
             ServiceTypeConstants.ADMIN_VIRTUAL_ACCOUNTS.value
         )
-        data["data"] = {"PageSize": "30", "PageNumber": "1"}
+        data["Data"].update(
+            {"PageSize": str(page_size), "PageNumber": str(page_number)}
+        )
 
-        return self._retrieve_all_virtual_accounts_request(data)
+        return self._request(data)
 
     # To prevent errors, kuda recommends not to update email and names in the same request
     # So both methods are seperated
@@ -529,7 +872,7 @@ class ServiceType(ServiceTypeUtils):
                 "firstName": last_name,
             }
         )
-        return self._update_virtual_account_info_request(data)
+        return self._request(data)
 
     def update_virtual_account_email(
         self,
@@ -554,4 +897,4 @@ class ServiceType(ServiceTypeUtils):
                 "email": email,
             }
         )
-        return self._update_virtual_account_info_request(data)
+        return self._request(data)
@@ -0,0 +1,222 @@
+import logging
+import threading
+import time
+from typing import Any, Awaitable, Callable
+
+from pykuda.constants import TOKEN_REFRESH_MARGIN, TOKEN_TTL
+
+logger = logging.getLogger("pykuda")
+
+
+class TokenCache:
+    """
+    A thread-safe cache for the bearer token generated from Kuda's TOKEN URL.
+
+    A cached token is served until its TTL runs out. Once a token enters the
+    refresh window (the last `refresh_margin` seconds of its TTL), a single
+    caller refreshes it while other callers keep using the still valid token.
+    If that refresh fails, the current token keeps being served and the next
+    caller in the refresh window tries again. Once the token has expired,
+    callers block until a fresh token is fetched.
+
+    The token and the counters are guarded by a lock that is never held while
+    a token is fetched, so AsyncPyKuda can read them and call invalidate from
+    a coroutine without blocking the event loop.
+
+    Attributes:
+        ttl (float): Number of seconds a token is considered valid for.
+        refresh_margin (float): Number of seconds before expiry at which the
+            token is refreshed ahead of time.
+        hits (int): Number of lookups served from the cache.
+        misses (int): Number of lookups that had to fetch a token.
+        refreshes (int): Number of successful token fetches.
+    """
+
+    def __init__(
+        self,
+        ttl: float = TOKEN_TTL,
+        refresh_margin: float = TOKEN_REFRESH_MARGIN,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.ttl = ttl
+        self.refresh_margin = min(refresh_margin, ttl)
+        self.hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self._clock = clock
+        self._token = None
+        self._expires_at = 0.0
+        # Guards the token and the counters, only held for a few instructions.
+        self._lock = threading.Lock()
+        # Held by the thread fetching a token.
+        self._refresh_lock = threading.Lock()
+        self._async_lock = None
+
+    def get(self, fetch: Callable[[], Any]) -> str | Any:
+        """
+        Returns a valid token, calling `fetch` to generate one when needed.
+
+        Args:
+            fetch (Callable): A callable returning the response of the token
+                request. The response text is cached when its status code is 200.
+
+        Returns:
+            The token string, or the failed token response if a token could not
+            be generated.
+        """
+        token, state = self._lookup()
+
+        if state == "fresh":
+            return token
+
+        if state == "refresh":
+            # Another caller is already refreshing, the current token is still valid.
+            if not self._refresh_lock.acquire(blocking=False):
+                self._count("hits")
+                return token
+        else:
+            self._refresh_lock.acquire()
+
+        try:
+            # The token may have been refreshed while waiting for the lock.
+            token, state = self._lookup(count=False)
+            if state == "fresh":
+                self._count("hits")
+                return token
+
+            self._count("misses")
+            try:
+                response = fetch()
+            except Exception:
+                if state != "refresh":
+                    raise
+                logger.warning("Refreshing the token failed.", exc_info=True)
+                return token
+            return self._store_or_keep(response, token, state)
+        finally:
+            self._refresh_lock.release()
+
+    async def aget(self, fetch: Callable[[], Awaitable[Any]]) -> str | Any:
+        """
+        Asynchronous version of get, used by AsyncPyKuda.
+
+        Args:
+            fetch (Callable): A coroutine function returning the response of the
+                token request.
+
+        Returns:
+            The token string, or the failed token response if a token could not
+            be generated.
+        """
+        token, state = self._lookup()
+
+        if state == "fresh":
+            return token
+
+        if self._async_lock is None:
+            import asyncio
+
+            self._async_lock = asyncio.Lock()
+
+        # Another task is already refreshing, the current token is still valid.
+        if state == "refresh" and self._async_lock.locked():
+            self._count("hits")
+            return token
+
+        async with self._async_lock:
+            token, state = self._lookup(count=False)
+            if state == "fresh":
+                self._count("hits")
+                return token
+
+            self._count("misses")
+            try:
+                response = await fetch()
+            except Exception:
+                if state != "refresh":
+                    raise
+                logger.warning("Refreshing the token failed.", exc_info=True)
+                return token
+            return self._store_or_keep(response, token, state)
+
+    def store(self, response: Any) -> str | Any:
+        """
+        Caches the token contained in a token response.
+
+        Args:
+            response: The response of the token request.
+
+        Returns:
+            The token string if the response was successful, otherwise the response.
+        """
+        if response.status_code != 200:
+            return response
+
+        token = response.text
+        with self._lock:
+            self._token = token
+            self._expires_at = self._clock() + self.ttl
+            self.refreshes += 1
+        return token
+
+    def _store_or_keep(self, response: Any, token: str | None, state: str) -> str | Any:
+        """
+        Caches the token of a token response, or keeps serving the current token
+        if the response failed while it was still valid.
+        """
+        new_token = self.store(response)
+        if state == "refresh" and not isinstance(new_token, str):
+            logger.warning(
+                "Refreshing the token failed with status code %s.", response.status_code
+            )
+            return token
+        return new_token
+
+    def invalidate(self, token: str | None = None) -> None:
+        """
+        Drops the cached token, e.g. after Kuda rejected it with a 401.
+
+        Args:
+            token (str | None): The token that was rejected. The cached token is
+                only dropped if it is still that one, so a token refreshed by
+                another caller meanwhile is kept. None drops any token.
+        """
+        with self._lock:
+            if token is None or token == self._token:
+                self._token = None
+                self._expires_at = 0.0
+
+    def stats(self) -> dict:
+        """
+        Returns the cache counters.
+
+        Returns:
+            dict: The number of hits, misses and refreshes.
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "refreshes": self.refreshes,
+            }
+
+    def _count(self, counter: str) -> None:
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def _lookup(self, count: bool = True) -> tuple[str | None, str]:
+        """
+        Returns the cached token and its state: "fresh", "refresh" or "expired".
+        """
+        with self._lock:
+            token = self._token
+            remaining = self._expires_at - self._clock()
+
+            if token is None or remaining <= 0:
+                return None, "expired"
+            if remaining <= self.refresh_margin:
+                return token, "refresh"
+
+            if count:
+                self.hits += 1
+            return token, "fresh"
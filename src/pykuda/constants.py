@@ -35,7 +35,79 @@ class ServiceTypeConstants(Enum):
     ADMIN_UPGRADE_VIRTUAL_ACCOUNT = "ADMIN_UPGRADE_VIRTUAL_ACCOUNT"
 
 
+# Service types moving money. A request of these types is never resent unless it
+# certainly was not processed, see retry_policy.MONEY_RETRY.
+MONEY_SERVICE_TYPES = frozenset(
+    {
+        ServiceTypeConstants.FUND_VIRTUAL_ACCOUNT.value,
+        ServiceTypeConstants.WITHDRAW_VIRTUAL_ACCOUNT.value,
+        ServiceTypeConstants.SINGLE_FUND_TRANSFER.value,
+        ServiceTypeConstants.VIRTUAL_ACCOUNT_FUND_TRANSFER.value,
+        ServiceTypeConstants.PURCHASE_BILL.value,
+        ServiceTypeConstants.ADMIN_PURCHASE_BILL.value,
+    }
+)
+
 HTTP_REQUEST_TIMEOUT = 60
+# Number of seconds a generated token is reused for, and how long before expiry it is refreshed.
+TOKEN_TTL = 600
+TOKEN_REFRESH_MARGIN = 30
+# Connection pool sizing for the HTTP session shared by all requests.
+POOL_CONNECTIONS = 10
+POOL_MAXSIZE = 10
+# Default number of items processed at once by bulk operations.
+BULK_CONCURRENCY = 10
+# Default page size when listing virtual accounts.
+VIRTUAL_ACCOUNTS_PAGE_SIZE = 30
+# Default number of pages fetched ahead while iterating over virtual accounts.
+VIRTUAL_ACCOUNTS_PREFETCH = 2
+# Number of seconds the list of banks and billers is cached for, and how long
+# a stale copy is still served while it is refreshed.
+REFERENCE_DATA_TTL = 3600
+REFERENCE_DATA_STALE_TTL = 86400
+# Default retry policy: attempts, exponential backoff bounds (seconds) and
+# retried status codes, and the share of requests that may be retried.
+RETRY_MAX_ATTEMPTS = 3
+RETRY_BACKOFF = 0.5
+RETRY_MAX_BACKOFF = 8
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+# Status codes proving a request was not processed, the only ones retried for
+# service types moving money.
+RETRY_UNPROCESSED_STATUSES = (429,)
+RETRY_BUDGET_RATIO = 0.2
+RETRY_BUDGET_RESERVE = 10
+# Default circuit breaker: share of failed requests that opens a circuit, requests
+# needed before it can open, counting window and open duration (seconds), and
+# number of probe requests let through while half open.
+CIRCUIT_FAILURE_THRESHOLD = 0.5
+CIRCUIT_MINIMUM_REQUESTS = 20
+CIRCUIT_WINDOW = 60
+CIRCUIT_RESET_TIMEOUT = 30
+CIRCUIT_HALF_OPEN_PROBES = 1
+# Default number of tenants kept by PyKudaPool, and how long (seconds) an unused
+# tenant's client is kept for.
+TENANT_POOL_SIZE = 256
+TENANT_IDLE_TIMEOUT = 3600
+# Default maximum number of entries kept by bounded caches.
+TTL_CACHE_MAXSIZE = 10000
+# Default number of seconds a beneficiary name looked up for display is cached for, when enabled.
+DISPLAY_NAME_TTL = 300
+# Default number of seconds a balance snapshot is served for, when enabled.
+BALANCE_TTL = 5
+# Key of the main account's balance in balance caches and ledgers, where virtual
+# accounts are keyed by tracking reference.
+MAIN_ACCOUNT = ""
+# Default number of accounts compared with Kuda by a ledger drift check, and number
+# of seconds between periodic drift checks.
+LEDGER_DRIFT_SAMPLE_SIZE = 20
+LEDGER_DRIFT_CHECK_INTERVAL = 300
+# Default number of webhook worker threads, of notifications queued for them
+# before new ones are turned away, and of transaction references remembered
+# (and for how many seconds) to drop redelivered notifications.
+WEBHOOK_WORKERS = 4
+WEBHOOK_QUEUE_SIZE = 1000
+WEBHOOK_DEDUPE_SIZE = 100000
+WEBHOOK_DEDUPE_TTL = 86400
 KUDA_CREDENTIALS_KEYS = [
     "KUDA_KEY",
     "TOKEN_URL",
@@ -0,0 +1,657 @@
+"""
+A local stand-in for Kuda's API, for load testing and benchmarking PyKuda offline.
+
+FakeKudaServer is a threaded http.server that implements every ServiceTypeConstants
+service type with realistic payloads, keeps virtual accounts and balances in memory,
+and can inject latency, server errors and token expiry.
+
+Example:
+    with FakeKudaServer(latency=0.05, error_rate=0.01, token_ttl=60) as server:
+        kuda = PyKuda(server.credentials)
+        kuda.banks_list()
+        print(server.stats())
+
+It can also be started from the command line:
+    python -m pykuda.fake_server --port 8000 --latency 0.05
+"""
+
+import argparse
+import json
+import random
+import secrets
+import threading
+import time
+from collections import OrderedDict, deque
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from pykuda.constants import MONEY_SERVICE_TYPES, ServiceTypeConstants
+
+TOKEN_PATH = "/v2.1/Account/GetToken"
+REQUEST_PATH = "/v2.1/"
+
+BANKS = [
+    {"bankCode": "999129", "bankName": "Kuda."},
+    {"bankCode": "000014", "bankName": "Access Bank"},
+    {"bankCode": "000016", "bankName": "First Bank of Nigeria"},
+    {"bankCode": "000013", "bankName": "Guaranty Trust Bank"},
+    {"bankCode": "000004", "bankName": "United Bank for Africa"},
+    {"bankCode": "000015", "bankName": "Zenith Bank"},
+]
+
+BILLERS = {
+    "airtime": [
+        {"billerName": "MTN", "billerItemIdentifier": "KD-VTU-MTNNG"},
+        {"billerName": "Airtel", "billerItemIdentifier": "KD-VTU-AIRTELNG"},
+        {"billerName": "Glo", "billerItemIdentifier": "KD-VTU-GLONG"},
+    ],
+    "electricity": [
+        {"billerName": "Ikeja Electric", "billerItemIdentifier": "KD-ELEC-IKEDC"},
+        {"billerName": "Eko Electric", "billerItemIdentifier": "KD-ELEC-EKEDC"},
+    ],
+    "cableTv": [
+        {"billerName": "DStv", "billerItemIdentifier": "KD-TV-DSTV"},
+        {"billerName": "GOtv", "billerItemIdentifier": "KD-TV-GOTV"},
+    ],
+}
+
+# Number of requestrefs and notifications of money-moving requests the server keeps.
+HISTORY_SIZE = 100_000
+
+
+class FakeKudaServer:
+    """
+    A threaded HTTP server that behaves like Kuda's TOKEN URL and REQUEST URL.
+
+    Attributes:
+        latency (float | tuple[float, float]): Seconds added to every response,
+            or a (min, max) range to pick from.
+        error_rate (float): Fraction of requests answered with a 500 error.
+        token_ttl (float | None): Seconds a token is valid for. Requests with an
+            expired token are answered with a 401. None never expires tokens.
+        main_balance (int): Balance of the main account.
+        dedupe_requestrefs (bool): Whether a money-moving request with a requestref
+            the server already processed is answered with its first reply instead of
+            moving the money again. Kuda does not document doing so, so it is off by
+            default and a resent request moves the money twice. The "repeated_requestrefs"
+            counter counts such requests either way.
+        history_size (int): Number of requestrefs and notifications of money-moving
+            requests kept in memory.
+        notifications (deque): The transaction notifications Kuda would have posted
+            to a webhook, the last history_size of them.
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: float | tuple[float, float] = 0.0,
+        error_rate: float = 0.0,
+        token_ttl: float | None = None,
+        main_balance: int = 10_000_000,
+        seed: int | None = None,
+        dedupe_requestrefs: bool = False,
+        history_size: int = HISTORY_SIZE,
+    ):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.token_ttl = token_ttl
+        self.main_balance = main_balance
+        self.dedupe_requestrefs = dedupe_requestrefs
+        self.history_size = history_size
+        self.accounts = {}
+        self._random = random.Random(seed)
+        self._tokens = {}
+        self._counters = {
+            "connections": 0,
+            "token_requests": 0,
+            "requests": 0,
+            "unauthorized": 0,
+            "injected_errors": 0,
+            "repeated_requestrefs": 0,
+        }
+        self._service_types = {}
+        # First reply per requestref, oldest first, so the oldest can be dropped.
+        self._replies = OrderedDict()
+        self.notifications = deque(maxlen=history_size)
+        self._lock = threading.Lock()
+        self._thread = None
+        self._handlers = {
+            ServiceTypeConstants.BANK_LIST.value: self._banks_list,
+            ServiceTypeConstants.ADMIN_CREATE_VIRTUAL_ACCOUNT.value: self._create_virtual_account,
+            ServiceTypeConstants.ADMIN_UPGRADE_VIRTUAL_ACCOUNT.value: self._upgrade_virtual_account,
+            ServiceTypeConstants.RETRIEVE_VIRTUAL_ACCOUNT_BALANCE.value: self._virtual_account_balance,
+            ServiceTypeConstants.ADMIN_RETRIEVE_MAIN_ACCOUNT_BALANCE.value: self._main_account_balance,
+            ServiceTypeConstants.FUND_VIRTUAL_ACCOUNT.value: self._fund_virtual_account,
+            ServiceTypeConstants.WITHDRAW_VIRTUAL_ACCOUNT.value: self._withdraw_from_virtual_account,
+            ServiceTypeConstants.NAME_ENQUIRY.value: self._name_enquiry,
+            ServiceTypeConstants.SINGLE_FUND_TRANSFER.value: self._single_fund_transfer,
+            ServiceTypeConstants.VIRTUAL_ACCOUNT_FUND_TRANSFER.value: self._virtual_account_fund_transfer,
+            ServiceTypeConstants.GET_BILLERS_BY_TYPE.value: self._billers,
+            ServiceTypeConstants.VERIFY_BILL_CUSTOMER.value: self._verify_bill_customer,
+            ServiceTypeConstants.PURCHASE_BILL.value: self._purchase_bill,
+            ServiceTypeConstants.ADMIN_PURCHASE_BILL.value: self._admin_purchase_bill,
+            ServiceTypeConstants.ADMIN_DISABLE_VIRTUAL_ACCOUNT.value: self._disable_virtual_account,
+            ServiceTypeConstants.ADMIN_ENABLE_VIRTUAL_ACCOUNT.value: self._enable_virtual_account,
+            ServiceTypeConstants.ADMIN_UPDATE_VIRTUAL_ACCOUNT.value: self._update_virtual_account,
+            ServiceTypeConstants.ADMIN_RETRIEVE_SINGLE_VIRTUAL_ACCOUNT.value: self._retrieve_single_virtual_account,
+            ServiceTypeConstants.ADMIN_VIRTUAL_ACCOUNTS.value: self._retrieve_all_virtual_accounts,
+        }
+        self.httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self.httpd.daemon_threads = True
+
+    @property
+    def url(self) -> str:
+        """Base URL of the server."""
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def credentials(self) -> dict:
+        """Credentials to initialise PyKuda with, pointing at this server."""
+        return {
+            "KUDA_KEY": "fake-kuda-key",
+            "TOKEN_URL": self.url + TOKEN_PATH,
+            "REQUEST_URL": self.url + REQUEST_PATH,
+            "EMAIL": "fake@pykuda.test",
+            "MAIN_ACCOUNT_NUMBER": "2000000000",
+        }
+
+    def start(self) -> "FakeKudaServer":
+        """Serves requests on a background thread."""
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stops serving requests and closes the listening socket."""
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self) -> "FakeKudaServer":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def expire_tokens(self) -> None:
+        """Expires every issued token, so the next request is answered with a 401."""
+        with self._lock:
+            self._tokens.clear()
+
+    def stats(self) -> dict:
+        """
+        Returns the server counters.
+
+        Returns:
+            dict: Number of connections opened, token requests, API requests,
+            401s, injected errors, repeated requestrefs and requests per service type.
+        """
+        with self._lock:
+            return {**self._counters, "service_types": dict(self._service_types)}
+
+    def save_notifications(self, path: str) -> int:
+        """
+        Writes the transaction notifications Kuda would have posted to a webhook for
+        the money moved so far, one JSON body per line, for WebhookReceiver.replay.
+
+        Args:
+            path (str): Path of the file to write.
+
+        Returns:
+            int: The number of notifications written.
+        """
+        with self._lock:
+            notifications = list(self.notifications)
+        with open(path, "w", encoding="utf-8") as file:
+            for notification in notifications:
+                file.write(json.dumps(notification) + "\n")
+        return len(notifications)
+
+    def reset_stats(self) -> None:
+        """Resets the server counters."""
+        with self._lock:
+            for counter in self._counters:
+                self._counters[counter] = 0
+            self._service_types.clear()
+
+    # Request handling
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            # HTTP/1.1 keeps connections alive, so connection reuse can be measured.
+            protocol_version = "HTTP/1.1"
+            # Headers and body are written separately, Nagle would delay the body.
+            disable_nagle_algorithm = True
+
+            def setup(self):
+                super().setup()
+                server._count("connections")
+
+            def do_POST(self):
+                length = int(self.headers.get("content-length") or 0)
+                body = self.rfile.read(length)
+                status, content_type, payload = server.handle(
+                    self.path, self.headers, body
+                )
+                self.send_response(status)
+                self.send_header("content-type", content_type)
+                self.send_header("content-length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def handle(self, path: str, headers, body: bytes) -> tuple[int, str, bytes]:
+        """
+        Answers a single request. Used by the HTTP handler, and by in-process
+        transports that skip the network entirely.
+
+        Args:
+            path (str): Path of the request URL.
+            headers: Mapping of request headers.
+            body (bytes): Request body.
+
+        Returns:
+            A tuple of the status code, content type and response body.
+        """
+        self._sleep()
+
+        if path == TOKEN_PATH:
+            return self._token(body)
+
+        if path.rstrip("/") != REQUEST_PATH.rstrip("/"):
+            return self._json(404, {"status": False, "message": "Not Found"})
+
+        self._count("requests")
+
+        if not self._token_is_valid(headers.get("Authorization", "")):
+            self._count("unauthorized")
+            return self._json(401, {"status": False, "message": "Unauthorized"})
+
+        if self.error_rate and self._random.random() < self.error_rate:
+            self._count("injected_errors")
+            return self._json(
+                500, {"status": False, "message": "Internal Server Error"}
+            )
+
+        try:
+            data = json.loads(body)
+        except ValueError:
+            return self._json(400, {"status": False, "message": "Invalid JSON"})
+
+        service_type = data.get("serviceType")
+        with self._lock:
+            self._service_types[service_type] = (
+                self._service_types.get(service_type, 0) + 1
+            )
+
+        handler = self._handlers.get(service_type)
+        if handler is None:
+            return self._json(
+                200,
+                {"status": False, "message": "Invalid service type.", "data": None},
+            )
+
+        requestref = data.get("requestref")
+        with self._lock:
+            if service_type in MONEY_SERVICE_TYPES and requestref in self._replies:
+                self._counters["repeated_requestrefs"] += 1
+                if self.dedupe_requestrefs:
+                    return self._json(200, self._replies[requestref])
+            payload = handler(data.get("Data") or data.get("data") or {}, data)
+            payload.setdefault("requestReference", requestref)
+            if service_type in MONEY_SERVICE_TYPES:
+                self._replies.setdefault(requestref, payload)
+                if len(self._replies) > self.history_size:
+                    self._replies.popitem(last=False)
+                if payload.get("status"):
+                    self._notify(service_type, data.get("Data") or {}, payload, requestref)
+        return self._json(200, payload)
+
+    def _token(self, body: bytes) -> tuple[int, str, bytes]:
+        self._count("token_requests")
+        try:
+            data = json.loads(body)
+        except ValueError:
+            data = {}
+
+        credentials = self.credentials
+        if (
+            data.get("email") != credentials["EMAIL"]
+            or data.get("apiKey") != credentials["KUDA_KEY"]
+        ):
+            return 401, "text/plain", b"Invalid Credentials"
+
+        token = secrets.token_urlsafe(24)
+        with self._lock:
+            self._tokens[token] = (
+                time.monotonic() + self.token_ttl if self.token_ttl else None
+            )
+        return 200, "text/plain", token.encode()
+
+    def _token_is_valid(self, authorization: str) -> bool:
+        token = authorization.partition(" ")[2]
+        with self._lock:
+            if token not in self._tokens:
+                return False
+            expires_at = self._tokens[token]
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._tokens[token]
+                return False
+            return True
+
+    def _sleep(self) -> None:
+        latency = self.latency
+        if isinstance(latency, tuple):
+            latency = self._random.uniform(*latency)
+        if latency:
+            time.sleep(latency)
+
+    def _count(self, counter: str) -> None:
+        with self._lock:
+            self._counters[counter] += 1
+
+    @staticmethod
+    def _json(status: int, payload: dict) -> tuple[int, str, bytes]:
+        return status, "application/json", json.dumps(payload).encode()
+
+    # Service types
+
+    @staticmethod
+    def _success(data=None, **extra) -> dict:
+        return {
+            "status": True,
+            "message": "Completed Successfully",
+            "statusCode": "k00",
+            "data": data,
+            **extra,
+        }
+
+    @staticmethod
+    def _invalid_account() -> dict:
+        return {
+            "status": False,
+            "message": "Invalid Virtual Account.",
+            "statusCode": "k-OAPI-07",
+            "data": None,
+        }
+
+    @staticmethod
+    def _reference() -> str:
+        return secrets.token_hex(10)
+
+    def _notify(
+        self, service_type: str, data: dict, payload: dict, requestref: str
+    ) -> None:
+        """Records the notification of a processed request moving money."""
+        account = self._account(data)
+        if account is not None:
+            account_number, account_name = account["accountNumber"], account["accountName"]
+        else:
+            account_number, account_name = self.credentials["MAIN_ACCOUNT_NUMBER"], "Main"
+
+        reply_data = payload.get("data") or {}
+        self.notifications.append(
+            {
+                "transactionReference": payload.get("transactionReference")
+                or reply_data.get("reference"),
+                "transactionType": (
+                    "Credit"
+                    if service_type == ServiceTypeConstants.FUND_VIRTUAL_ACCOUNT.value
+                    else "Debit"
+                ),
+                "amount": str(data.get("amount") or data.get("Amount")),
+                "accountNumber": account_number,
+                "accountName": account_name,
+                "senderName": data.get("senderName"),
+                "recipientName": data.get("beneficiaryName"),
+                "payingBank": "Kuda.",
+                "narrations": data.get("narration"),
+                "sessionId": secrets.token_hex(15),
+                "instrumentNumber": None,
+                "clientRequestRef": requestref,
+                "transactionDate": datetime.now(timezone.utc).isoformat(),
+            }
+        )
+
+    def _account(self, data: dict) -> dict | None:
+        return self.accounts.get(data.get("trackingReference"))
+
+    def _balance(self, balance: int) -> dict:
+        return self._success(
+            {
+                "ledgerBalance": balance,
+                "availableBalance": balance,
+                "withdrawableBalance": balance,
+            }
+        )
+
+    def _banks_list(self, data: dict, request: dict) -> dict:
+        return self._success({"banks": BANKS})
+
+    def _create_virtual_account(self, data: dict, request: dict) -> dict:
+        account_number = str(2_500_000_000 + len(self.accounts))
+        first_name, last_name = data.get("firstName"), data.get("lastName")
+        self.accounts[data.get("trackingReference")] = {
+            "accountNumber": account_number,
+            "email": data.get("email"),
+            "phoneNumber": data.get("phoneNumber"),
+            "lastName": last_name,
+            "firstName": first_name,
+            "middleName": data.get("middleName"),
+            "bussinessName": data.get("businessName"),
+            "accountName": f"{last_name} {first_name}",
+            "trackingReference": data.get("trackingReference"),
+            "creationDate": datetime.now(timezone.utc).isoformat(),
+            "isDeleted": False,
+            "balance": 0,
+        }
+        return self._success({"accountNumber": account_number})
+
+    def _upgrade_virtual_account(self, data: dict, request: dict) -> dict:
+        if self._account(data) is None:
+            return self._invalid_account()
+        return {
+            "status": True,
+            "message": "Virtual account upgrade request logged.",
+            "statusCode": "k00",
+            "data": None,
+        }
+
+    def _virtual_account_balance(self, data: dict, request: dict) -> dict:
+        account = self._account(data)
+        if account is None:
+            return self._invalid_account()
+        return self._balance(account["balance"])
+
+    def _main_account_balance(self, data: dict, request: dict) -> dict:
+        return self._balance(self.main_balance)
+
+    def _move_funds(self, data: dict, from_main: bool) -> dict:
+        account = self._account(data)
+        if account is None:
+            return self._invalid_account()
+
+        amount = int(data.get("amount") or 0)
+        error = self._transfer(
+            amount, self.main_balance if from_main else account["balance"]
+        )
+        if error:
+            return error
+
+        if from_main:
+            self.main_balance -= amount
+            account["balance"] += amount
+        else:
+            account["balance"] -= amount
+            self.main_balance += amount
+        return self._success(transactionReference=self._reference())
+
+    def _fund_virtual_account(self, data: dict, request: dict) -> dict:
+        return self._move_funds(data, from_main=True)
+
+    def _withdraw_from_virtual_account(self, data: dict, request: dict) -> dict:
+        return self._move_funds(data, from_main=False)
+
+    def _name_enquiry(self, data: dict, request: dict) -> dict:
+        account_number = data.get("beneficiaryAccountNumber") or ""
+        if len(account_number) != 10 or not account_number.isdigit():
+            return {
+                "status": False,
+                "message": "Invalid account number.",
+                "statusCode": "k-OAPI-02",
+                "data": None,
+            }
+
+        return self._success(
+            {
+                "beneficiaryAccountNumber": account_number,
+                "beneficiaryName": f"Beneficiary {account_number[-4:]}",
+                "beneficiaryBankCode": data.get("beneficiaryBankCode"),
+                "sessionID": secrets.token_hex(15),
+                "senderAccountNumber": self.credentials["MAIN_ACCOUNT_NUMBER"],
+                "transferCharge": 10,
+                "nameEnquiryID": secrets.randbelow(10**9),
+            }
+        )
+
+    def _transfer(self, amount: int, balance: int) -> dict | None:
+        if amount <= 0 or amount > balance:
+            return {
+                "status": False,
+                "message": "Insufficient funds.",
+                "statusCode": "k-OAPI-04",
+                "data": None,
+            }
+        return None
+
+    def _single_fund_transfer(self, data: dict, request: dict) -> dict:
+        amount = int(data.get("amount") or 0)
+        error = self._transfer(amount, self.main_balance)
+        if error:
+            return error
+        self.main_balance -= amount
+        return self._success(transactionReference=self._reference())
+
+    def _virtual_account_fund_transfer(self, data: dict, request: dict) -> dict:
+        account = self._account(data)
+        if account is None:
+            return self._invalid_account()
+
+        amount = int(data.get("amount") or 0)
+        error = self._transfer(amount, account["balance"])
+        if error:
+            return error
+        account["balance"] -= amount
+        return self._success(transactionReference=self._reference())
+
+    def _billers(self, data: dict, request: dict) -> dict:
+        return self._success({"billers": BILLERS.get(data.get("BillTypeName"), [])})
+
+    def _verify_bill_customer(self, data: dict, request: dict) -> dict:
+        return self._success(
+            {"customerName": f"Customer {str(data.get('CustomerIdentification'))[-4:]}"}
+        )
+
+    def _purchase_bill(self, data: dict, request: dict) -> dict:
+        account = self._account(data)
+        if account is None:
+            return self._invalid_account()
+
+        amount = int(data.get("Amount") or 0)
+        error = self._transfer(amount, account["balance"])
+        if error:
+            return error
+        account["balance"] -= amount
+        return self._success({"reference": self._reference()})
+
+    def _admin_purchase_bill(self, data: dict, request: dict) -> dict:
+        amount = int(data.get("Amount") or 0)
+        error = self._transfer(amount, self.main_balance)
+        if error:
+            return error
+        self.main_balance -= amount
+        return self._success({"reference": self._reference()})
+
+    def _set_account_deleted(self, data: dict, deleted: bool) -> dict:
+        account = self._account(data)
+        if account is None:
+            return self._invalid_account()
+        account["isDeleted"] = deleted
+        return self._success({"accountNumber": account["accountNumber"]})
+
+    def _disable_virtual_account(self, data: dict, request: dict) -> dict:
+        return self._set_account_deleted(data, True)
+
+    def _enable_virtual_account(self, data: dict, request: dict) -> dict:
+        return self._set_account_deleted(data, False)
+
+    def _update_virtual_account(self, data: dict, request: dict) -> dict:
+        account = self._account(data)
+        if account is None:
+            return self._invalid_account()
+        for field in ("firstName", "lastName", "email"):
+            if data.get(field):
+                account[field] = data[field]
+        return self._success({"accountNumber": account["accountNumber"]})
+
+    def _public_account(self, account: dict) -> dict:
+        return {key: value for key, value in account.items() if key != "balance"}
+
+    def _retrieve_single_virtual_account(self, data: dict, request: dict) -> dict:
+        account = self._account(data)
+        if account is None:
+            return self._invalid_account()
+        return self._success(self._public_account(account))
+
+    def _retrieve_all_virtual_accounts(self, data: dict, request: dict) -> dict:
+        page_size = int(data.get("PageSize") or 30)
+        page_number = int(data.get("PageNumber") or 1)
+        accounts = list(self.accounts.values())
+        page = accounts[(page_number - 1) * page_size : page_number * page_size]
+        return self._success(
+            {
+                "accounts": [self._public_account(account) for account in page],
+                "totalCount": len(accounts),
+            }
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Runs a local stand-in for Kuda's API.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--token-ttl", type=float, default=None)
+    parser.add_argument("--dedupe-requestrefs", action="store_true")
+    args = parser.parse_args()
+
+    server = FakeKudaServer(
+        host=args.host,
+        port=args.port,
+        latency=args.latency,
+        error_rate=args.error_rate,
+        token_ttl=args.token_ttl,
+        dedupe_requestrefs=args.dedupe_requestrefs,
+    )
+    print(f"TOKEN_URL={server.credentials['TOKEN_URL']}")
+    print(f"REQUEST_URL={server.credentials['REQUEST_URL']}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
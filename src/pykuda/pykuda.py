@@ -1,14 +1,61 @@
-from pykuda.classes.service_type import ServiceType
-from pykuda.utils import check_envs_are_set
+import threading
+from typing import TYPE_CHECKING
 
+from pykuda.classes.balance_cache import BalanceCache
+from pykuda.classes.bulk_service_type import BulkServiceType
+from pykuda.classes.circuit_breaker import CircuitBreakers
+from pykuda.classes.journal import Journal
+from pykuda.classes.json_codec import JsonCodec
+from pykuda.classes.ledger import Ledger
+from pykuda.classes.rate_limiter import TokenBucket
+from pykuda.classes.reference_cache import ReferenceCache
+from pykuda.classes.retry_policy import RetryBudget, RetryPolicy
+from pykuda.classes.token_cache import TokenCache
+from pykuda.classes.ttl_cache import TTLCache
+from pykuda.constants import (
+    POOL_CONNECTIONS,
+    POOL_MAXSIZE,
+    REFERENCE_DATA_TTL,
+    TOKEN_REFRESH_MARGIN,
+    TOKEN_TTL,
+    TTL_CACHE_MAXSIZE,
+)
+from pykuda.utils import check_envs_are_set, create_session
 
-class PyKuda(ServiceType):
+if TYPE_CHECKING:
+    import requests
+
+
+class PyKuda(BulkServiceType):
     """
     PyKuda Class handles the authentication and initialization
     of credentials for the Kuda API service.
     """
 
-    def __init__(self, credentials: dict | None = None):
+    def __init__(
+        self,
+        credentials: dict | None = None,
+        token_ttl: float | None = TOKEN_TTL,
+        token_refresh_margin: float = TOKEN_REFRESH_MARGIN,
+        session: "requests.Session | None" = None,
+        pool_connections: int = POOL_CONNECTIONS,
+        pool_maxsize: int = POOL_MAXSIZE,
+        reference_data_ttl: float | None = REFERENCE_DATA_TTL,
+        reference_cache: ReferenceCache | None = None,
+        display_name_ttl: float | None = None,
+        display_name_cache_size: int = TTL_CACHE_MAXSIZE,
+        balance_ttl: float | None = None,
+        ledger: Ledger | None = None,
+        journal: Journal | None = None,
+        instruments: list | None = None,
+        retry_policy: RetryPolicy | None = None,
+        retry_policies: dict | None = None,
+        retry_budget: RetryBudget | None = None,
+        rate_limit: TokenBucket | None = None,
+        rate_limits: dict | None = None,
+        circuit_breakers: CircuitBreakers | None = None,
+        json_codec: JsonCodec | None = None,
+    ):
         """
         Initializes the PyKuda instance with the provided credentials.
 
@@ -20,11 +67,80 @@ class PyKuda(ServiceType):
            to the self.credentials attribute.
         3. If the credentials are not properly set, a ValueError is raised with
            an appropriate error message.
+        4. Sets up the token cache so the bearer token is reused across requests.
+        5. Sets up the pooled HTTP session, unless one is passed in. The session,
+           like the HTTP stack, is only created when the first request is sent.
+        6. Sets up the cache for the list of banks and billers.
+        7. Sets up the name enquiry and balance caches, the ledger and the journal,
+           if enabled.
+        8. Registers the instrumentation hooks, if any.
+        9. Sets up the retry policies and the retry budget.
+        10. Sets up the token buckets pacing requests, if any.
+        11. Sets up the circuit breakers, if enabled.
+        12. Sets the JSON codec of request and response bodies, if one is passed in.
 
         Args:
             credentials (dict | None): A dictionary of credentials, or None if
                                        the credentials are to be fetched from
                                        the environment variables.
+            token_ttl (float | None): Number of seconds a generated token is reused
+                                      for. None generates a new token for every request.
+            token_refresh_margin (float): Number of seconds before expiry at which
+                                          the token is refreshed ahead of time.
+            session (requests.Session | None): A session to send requests with. If
+                                               None, PyKuda creates and owns one.
+            pool_connections (int): Number of host connection pools to cache.
+            pool_maxsize (int): Maximum number of connections kept alive per host.
+            reference_data_ttl (float | None): Number of seconds the list of banks and
+                                               billers is cached in memory for. None
+                                               disables the cache.
+            reference_cache (ReferenceCache | None): A reference cache to use instead,
+                                                     e.g. one with a FileBackend.
+            display_name_ttl (float | None): Number of seconds the results of
+                                             confirm_transfer_recipient(for_display=True)
+                                             are cached for. None (the default) disables
+                                             the cache; constants.DISPLAY_NAME_TTL is a
+                                             sensible value.
+            display_name_cache_size (int): Maximum number of cached display lookups.
+            balance_ttl (float | None): Number of seconds balance snapshots are served
+                                        for, with concurrent balance requests for the
+                                        same account coalesced. None (the default)
+                                        disables the cache; constants.BALANCE_TTL is
+                                        a sensible value.
+            ledger (Ledger | None): Local mirror of balances, read before requesting
+                                    a balance and updated by the methods moving
+                                    money. Fill it once with seed_ledger. None (the
+                                    default) disables it.
+            journal (Journal | None): Write-ahead journal of the requests moving money,
+                                      resolved after a crash with recover_journal. None
+                                      (the default) disables it.
+            instruments (list | None): Instrumentation hooks called around every
+                                       request, e.g. PrometheusInstrumentation.
+            retry_policy (RetryPolicy | None): Retry policy of every service type without
+                                               its own. None uses RetryPolicy(); pass
+                                               NO_RETRY to disable retries. Service
+                                               types moving money only retry requests
+                                               that were not processed, see
+                                               RetryPolicy.unprocessed_only.
+            retry_policies (dict | None): Retry policies per ServiceTypeConstants, e.g.
+                                          {ServiceTypeConstants.SINGLE_FUND_TRANSFER: NO_RETRY}.
+            retry_budget (RetryBudget | None): Caps retries to a share of requests.
+                                               None creates a RetryBudget().
+            rate_limit (TokenBucket | None): Paces requests of every service type without
+                                             its own bucket. None (the default) does not
+                                             pace them.
+            rate_limits (dict | None): Token buckets per ServiceTypeConstants, e.g.
+                                       {ServiceTypeConstants.NAME_ENQUIRY: TokenBucket(5)}.
+                                       Use a FileTokenBucket to share a quota between
+                                       the processes of a host.
+            circuit_breakers (CircuitBreakers | None): Fails requests fast with
+                                                       CircuitOpenError while Kuda keeps
+                                                       failing a service type or the token
+                                                       endpoint. None (the default)
+                                                       disables circuit breaking.
+            json_codec (JsonCodec | None): Encodes and decodes request and response bodies.
+                                           None uses the fastest installed codec: msgspec,
+                                           orjson or the standard library's json.
 
         Raises:
             ValueError: If the environmental variables or credentials are not properly set.
@@ -39,3 +155,67 @@ class PyKuda(ServiceType):
 
         # Store the valid credentials.
         self.credentials = response
+
+        self.token_cache = (
+            TokenCache(ttl=token_ttl, refresh_margin=token_refresh_margin)
+            if token_ttl
+            else None
+        )
+
+        # Sessions passed in by the caller are not closed by PyKuda.
+        self._owns_session = session is None
+        self._session = session
+        self._pool_size = (pool_connections, pool_maxsize)
+        self._session_lock = threading.Lock()
+
+        if reference_cache is None and reference_data_ttl:
+            reference_cache = ReferenceCache(ttl=reference_data_ttl)
+        self.reference_cache = reference_cache
+
+        self.display_name_cache = (
+            TTLCache(ttl=display_name_ttl, maxsize=display_name_cache_size)
+            if display_name_ttl
+            else None
+        )
+
+        self.balance_cache = BalanceCache(ttl=balance_ttl) if balance_ttl else None
+        self.ledger = ledger
+        self.journal = journal
+
+        self.instruments = tuple(instruments or ())
+
+        self._configure_retries(retry_policy, retry_policies, retry_budget)
+        self._configure_rate_limits(rate_limit, rate_limits)
+        self.circuit_breakers = circuit_breakers
+        self.codec = json_codec
+
+    @property
+    def session(self) -> "requests.Session":
+        """The session requests are sent with, created on first use if none was passed in."""
+        if self._session is None:
+            with self._session_lock:
+                if self._session is None:
+                    self._session = create_session(*self._pool_size)
+        return self._session
+
+    @session.setter
+    def session(self, session: "requests.Session") -> None:
+        self._session = session
+
+    def close(self) -> None:
+        """
+        Closes the HTTP session and its pooled connections, if PyKuda created it,
+        stops the ledger drift checks and syncs the outcomes pending in the journal.
+        """
+        if self._drift_checks is not None:
+            self._drift_checks.set()
+        if self.journal is not None:
+            self.journal.sync()
+        if self._owns_session and self._session is not None:
+            self._session.close()
+
+    def __enter__(self) -> "PyKuda":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
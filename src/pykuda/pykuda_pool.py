@@ -0,0 +1,351 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Iterator
+from urllib.parse import urlsplit
+
+from pykuda.classes.reference_cache import ReferenceCache
+from pykuda.constants import (
+    KUDA_CREDENTIALS_KEYS,
+    POOL_CONNECTIONS,
+    POOL_MAXSIZE,
+    REFERENCE_DATA_TTL,
+    TENANT_IDLE_TIMEOUT,
+    TENANT_POOL_SIZE,
+)
+from pykuda.pykuda import PyKuda
+from pykuda.utils import create_session
+
+if TYPE_CHECKING:
+    import requests
+
+# Options PyKudaPool sets itself for every tenant.
+_POOL_OPTIONS = ("session", "reference_cache")
+# Stores holding one tenant's data. Each tenant needs its own, so these options
+# take a factory called with the tenant's fingerprint.
+_PER_TENANT_OPTIONS = ("ledger", "journal")
+
+
+class _Tenant:
+    """A client kept by PyKudaPool, with the stores built for it and its leases."""
+
+    __slots__ = ("last_used", "client", "stores", "leases", "evicted")
+
+    def __init__(self, last_used: float, client: PyKuda, stores: list):
+        self.last_used = last_used
+        self.client = client
+        self.stores = stores
+        self.leases = 0
+        self.evicted = False
+
+
+def credentials_fingerprint(credentials: dict) -> str:
+    """
+    Returns a digest identifying a set of credentials, so they can be told apart
+    without being kept as a key in plain text.
+
+    Args:
+        credentials (dict): The credentials of a tenant.
+
+    Returns:
+        str: The SHA-256 hex digest of the credentials.
+    """
+    digest = hashlib.sha256()
+    for key in KUDA_CREDENTIALS_KEYS:
+        digest.update(str(credentials.get(key, "")).encode())
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class PyKudaPool:
+    """
+    Keeps one PyKuda client per set of credentials, for services acting on behalf
+    of many Kuda accounts.
+
+    Clients are created on first use and reused after that, so each tenant's token
+    cache and setup cost survive between requests. Tenants whose REQUEST_URL is on
+    the same host share one pooled session, and every tenant shares the cache of
+    banks and billers. Tenants not used for `idle_timeout` seconds are evicted, as
+    is the least recently used one when more than `max_tenants` are kept.
+    Evicted clients are closed, so get a client from the pool for every request
+    rather than holding on to it. A client used through lease is only closed once
+    the lease ends, so use lease when clients can be evicted while in use, e.g.
+    from several threads, and when clients have a ledger or journal.
+
+    Example:
+        pool = PyKudaPool()
+        with pool.lease(merchant.kuda_credentials) as kuda:
+            response = kuda.main_account_balance()
+    """
+
+    def __init__(
+        self,
+        max_tenants: int = TENANT_POOL_SIZE,
+        idle_timeout: float | None = TENANT_IDLE_TIMEOUT,
+        pool_connections: int = POOL_CONNECTIONS,
+        pool_maxsize: int = POOL_MAXSIZE,
+        reference_cache: ReferenceCache | None = None,
+        **client_options,
+    ):
+        """
+        Args:
+            max_tenants (int): Maximum number of clients kept.
+            idle_timeout (float | None): Number of seconds an unused client is kept
+                                         for. None keeps clients until they are the
+                                         least recently used one of a full pool.
+            pool_connections (int): Number of host connection pools to cache, per
+                                    shared session.
+            pool_maxsize (int): Maximum number of connections kept alive per host.
+            reference_cache (ReferenceCache | None): Cache of banks and billers shared
+                                                     by every tenant. None creates an
+                                                     in-memory one.
+            **client_options: Keyword arguments passed to every PyKuda, e.g.
+                              token_ttl or display_name_ttl. Objects passed here,
+                              such as a TokenBucket, are shared by every tenant.
+                              ledger and journal take a factory instead, called
+                              with the tenant's fingerprint to build its own, e.g.
+                              ledger=lambda tenant: Ledger(f"{tenant}.db").
+
+        Raises:
+            ValueError: If max_tenants is less than 1, if client_options sets session
+                or reference_cache, or if it passes a ledger or journal rather than
+                a factory.
+        """
+        if max_tenants < 1:
+            raise ValueError("max_tenants must be at least 1.")
+        for option in _POOL_OPTIONS:
+            if option in client_options:
+                raise ValueError(f"{option} is set by PyKudaPool for every tenant.")
+        for option in _PER_TENANT_OPTIONS:
+            value = client_options.get(option)
+            if value is not None and not callable(value):
+                raise ValueError(
+                    f"A {option} would be shared by every tenant, pass a factory "
+                    f"building one per tenant instead, e.g. {option}=lambda tenant: ..."
+                )
+
+        self.max_tenants = max_tenants
+        self.idle_timeout = idle_timeout
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.reference_cache = (
+            reference_cache
+            if reference_cache is not None
+            else ReferenceCache(ttl=REFERENCE_DATA_TTL)
+        )
+        self.client_options = client_options
+        self._clients = OrderedDict()
+        self._sessions = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, credentials: dict) -> PyKuda:
+        """
+        Returns the client of a set of credentials, creating it on first use.
+
+        The client is closed as soon as it is evicted, even if it is still in use;
+        use lease to keep it open until you are done with it.
+
+        Args:
+            credentials (dict): The credentials of the tenant, as passed to PyKuda.
+
+        Returns:
+            PyKuda: The tenant's client.
+
+        Raises:
+            ValueError: If the credentials are not properly set.
+        """
+        return self._checkout(credentials, lease=False).client
+
+    @contextmanager
+    def lease(self, credentials: dict) -> Iterator[PyKuda]:
+        """
+        Same as get, for a with block. The client, its ledger and its journal are
+        not closed before the block ends, even if the client is evicted meanwhile.
+
+        Args:
+            credentials (dict): The credentials of the tenant, as passed to PyKuda.
+
+        Yields:
+            PyKuda: The tenant's client.
+
+        Raises:
+            ValueError: If the credentials are not properly set.
+        """
+        tenant = self._checkout(credentials, lease=True)
+        try:
+            yield tenant.client
+        finally:
+            with self._lock:
+                tenant.leases -= 1
+                close = tenant.evicted and not tenant.leases
+            if close:
+                self._close_tenant(tenant)
+
+    def _checkout(self, credentials: dict, lease: bool) -> _Tenant:
+        """
+        Returns the tenant of a set of credentials, creating its client on first
+        use, and closes the clients evicted to make room for it.
+        """
+        fingerprint = credentials_fingerprint(credentials)
+        now = time.monotonic()
+        evicted = []
+
+        try:
+            with self._lock:
+                evicted.extend(self._evict_idle(now))
+
+                tenant = self._clients.get(fingerprint)
+                if tenant is not None:
+                    self._clients.move_to_end(fingerprint)
+                    tenant.last_used = now
+                    tenant.leases += lease
+                    self.hits += 1
+                    return tenant
+
+                tenant = _Tenant(now, *self._create_client(credentials, fingerprint))
+                tenant.leases += lease
+                self._clients[fingerprint] = tenant
+                self.misses += 1
+
+                while len(self._clients) > self.max_tenants:
+                    evicted.append(self._drop(self._clients.popitem(last=False)[1]))
+
+                return tenant
+        finally:
+            # Closed outside of the lock, syncing a journal can take a while.
+            for tenant in evicted:
+                if tenant is not None:
+                    self._close_tenant(tenant)
+
+    def _create_client(self, credentials: dict, fingerprint: str) -> tuple:
+        """
+        Builds the client of a tenant and its ledger and journal, closing the
+        stores already built if any step fails.
+
+        Returns:
+            tuple: The client and the list of its stores.
+        """
+        options = dict(self.client_options)
+        stores = []
+        try:
+            for option in _PER_TENANT_OPTIONS:
+                if options.get(option) is not None:
+                    options[option] = options[option](fingerprint)
+                    stores.append(options[option])
+
+            client = PyKuda(
+                credentials,
+                session=self._session(credentials.get("REQUEST_URL")),
+                reference_cache=self.reference_cache,
+                **options,
+            )
+        except Exception:
+            for store in stores:
+                store.close()
+            raise
+        return client, stores
+
+    def evict(self, credentials: dict) -> None:
+        """
+        Drops the client of a set of credentials, e.g. after they were rotated.
+        A leased client is closed when its last lease ends.
+
+        Args:
+            credentials (dict): The credentials of the tenant.
+        """
+        with self._lock:
+            tenant = self._clients.pop(credentials_fingerprint(credentials), None)
+            if tenant is not None:
+                tenant = self._drop(tenant)
+        if tenant is not None:
+            self._close_tenant(tenant)
+
+    def _drop(self, tenant: _Tenant) -> _Tenant | None:
+        """
+        Marks a tenant removed from the pool as evicted. Returns it if it can be
+        closed now, or None if it is leased and closed when its last lease ends.
+        """
+        tenant.evicted = True
+        self.evictions += 1
+        return None if tenant.leases else tenant
+
+    def _evict_idle(self, now: float) -> list:
+        """
+        Drops the clients unused for idle_timeout seconds and returns the ones
+        that can be closed now.
+        """
+        evicted = []
+        if self.idle_timeout is None:
+            return evicted
+
+        # Clients are ordered from least to most recently used.
+        while self._clients:
+            fingerprint, tenant = next(iter(self._clients.items()))
+            if now - tenant.last_used < self.idle_timeout:
+                break
+            del self._clients[fingerprint]
+            tenant = self._drop(tenant)
+            if tenant is not None:
+                evicted.append(tenant)
+        return evicted
+
+    @staticmethod
+    def _close_tenant(tenant: _Tenant) -> None:
+        """Closes an evicted client, and the ledger and journal built for it."""
+        tenant.client.close()
+        for store in tenant.stores:
+            store.close()
+
+    def _session(self, request_url: str | None) -> "requests.Session":
+        """Returns the session shared by the tenants of a REQUEST_URL host."""
+        host = urlsplit(request_url or "").netloc
+        session = self._sessions.get(host)
+        if session is None:
+            session = self._sessions[host] = create_session(
+                self.pool_connections, self.pool_maxsize
+            )
+        return session
+
+    def stats(self) -> dict:
+        """
+        Returns the number of clients kept, of lookups that found or created a
+        client, of evicted clients and of shared sessions.
+        """
+        return {
+            "tenants": len(self._clients),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "sessions": len(self._sessions),
+        }
+
+    def __len__(self) -> int:
+        return len(self._clients)
+
+    def close(self) -> None:
+        """
+        Closes every client and the shared sessions. Leased clients are closed
+        when their last lease ends.
+        """
+        with self._lock:
+            tenants = list(self._clients.values())
+            for tenant in tenants:
+                tenant.evicted = True
+            self._clients.clear()
+            for session in self._sessions.values():
+                session.close()
+            self._sessions.clear()
+        for tenant in tenants:
+            if not tenant.leases:
+                self._close_tenant(tenant)
+
+    def __enter__(self) -> "PyKudaPool":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
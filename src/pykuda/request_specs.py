@@ -0,0 +1,177 @@
+from dataclasses import dataclass
+from typing import Any, Callable
+
+from pykuda.classes.results import (
+    Balance,
+    BeneficiaryInfo,
+    TransferReceipt,
+    VirtualAccount,
+    VirtualAccountList,
+)
+from pykuda.constants import ServiceTypeConstants
+
+
+@dataclass(frozen=True)
+class RequestSpec:
+    """
+    Describes how Kuda's reply to a service type is turned into a PyKudaResponse.
+
+    Attributes:
+        is_success (Callable): Takes Kuda's decoded reply and returns whether the
+            request was processed successfully.
+        extract (Callable): Takes Kuda's decoded reply and the request data, and
+            returns the data of a successful PyKudaResponse.
+        status_code (int): The status code of a successful PyKudaResponse.
+    """
+
+    is_success: Callable[[dict], bool]
+    extract: Callable[[dict, dict], Any]
+    status_code: int = 200
+
+
+# Success predicates
+
+
+def _is_processed(response_data: dict) -> bool:
+    return bool(response_data.get("status"))
+
+
+def _has_data(*keys: str) -> Callable[[dict], bool]:
+    """Returns a predicate checking that every key of the reply's data is set."""
+
+    def is_success(response_data: dict) -> bool:
+        data = response_data.get("data")
+        return bool(
+            response_data.get("status") and data and all(data.get(key) for key in keys)
+        )
+
+    return is_success
+
+
+def _has_transaction_reference(response_data: dict) -> bool:
+    return bool(
+        response_data.get("status") and response_data.get("transactionReference")
+    )
+
+
+def _is_upgrade_logged(response_data: dict) -> bool:
+    return bool(
+        response_data.get("status")
+        and (
+            response_data.get("message") == "Virtual account upgrade request logged."
+            or response_data.get("statusCode") == "k00"
+        )
+    )
+
+
+# Extractors
+
+
+def _data_key(key: str) -> Callable[[dict, dict], Any]:
+    """Returns an extractor for a single key of the reply's data."""
+
+    def extract(response_data: dict, data: dict) -> Any:
+        return response_data["data"][key]
+
+    return extract
+
+
+def _created_virtual_account(response_data: dict, data: dict) -> dict:
+    return {
+        "account_number": response_data["data"]["accountNumber"],
+        "tracking_reference": data["Data"]["trackingReference"],
+    }
+
+
+def _balance(response_data: dict, data: dict) -> Balance:
+    return Balance.from_payload(response_data["data"])
+
+
+def _reference(response_data: dict, data: dict) -> dict:
+    return {"reference": response_data.get("transactionReference")}
+
+
+def _beneficiary(response_data: dict, data: dict) -> BeneficiaryInfo:
+    return BeneficiaryInfo.from_payload(
+        response_data["data"], data["Data"]["SenderTrackingReference"]
+    )
+
+
+def _transfer(response_data: dict, data: dict) -> TransferReceipt:
+    return TransferReceipt.from_payload(response_data)
+
+
+def _customer_name(response_data: dict, data: dict) -> dict:
+    return {"customer_name": response_data["data"]["customerName"]}
+
+
+def _bill_reference(response_data: dict, data: dict) -> dict:
+    return {"reference": response_data["data"]["reference"]}
+
+
+def _account_number(response_data: dict, data: dict) -> dict:
+    return {"account_number": (response_data.get("data") or {}).get("accountNumber")}
+
+
+def _whole_reply(response_data: dict, data: dict) -> dict:
+    return response_data
+
+
+def _virtual_account(response_data: dict, data: dict) -> VirtualAccount:
+    return VirtualAccount.from_payload(response_data["data"])
+
+
+def _virtual_accounts(response_data: dict, data: dict) -> VirtualAccountList:
+    return VirtualAccountList.from_payload(response_data["data"]["accounts"])
+
+
+_BALANCE = RequestSpec(_is_processed, _balance)
+_VIRTUAL_ACCOUNT_STATE = RequestSpec(_is_processed, _account_number)
+_BILL_PURCHASE = RequestSpec(_has_data("reference"), _bill_reference)
+
+# One spec per service type, looked up by the serviceType of the request data.
+REQUEST_SPECS: dict[str, RequestSpec] = {
+    ServiceTypeConstants.BANK_LIST.value: RequestSpec(
+        _has_data("banks"), _data_key("banks")
+    ),
+    ServiceTypeConstants.ADMIN_CREATE_VIRTUAL_ACCOUNT.value: RequestSpec(
+        _has_data("accountNumber"), _created_virtual_account, status_code=201
+    ),
+    ServiceTypeConstants.ADMIN_UPGRADE_VIRTUAL_ACCOUNT.value: RequestSpec(
+        _is_upgrade_logged, _whole_reply
+    ),
+    ServiceTypeConstants.RETRIEVE_VIRTUAL_ACCOUNT_BALANCE.value: _BALANCE,
+    ServiceTypeConstants.ADMIN_RETRIEVE_MAIN_ACCOUNT_BALANCE.value: _BALANCE,
+    ServiceTypeConstants.FUND_VIRTUAL_ACCOUNT.value: RequestSpec(
+        _has_transaction_reference, _reference
+    ),
+    ServiceTypeConstants.WITHDRAW_VIRTUAL_ACCOUNT.value: RequestSpec(
+        _has_transaction_reference, _reference
+    ),
+    ServiceTypeConstants.NAME_ENQUIRY.value: RequestSpec(
+        _has_data("beneficiaryAccountNumber", "beneficiaryName"), _beneficiary
+    ),
+    ServiceTypeConstants.SINGLE_FUND_TRANSFER.value: RequestSpec(
+        _has_transaction_reference, _transfer
+    ),
+    ServiceTypeConstants.VIRTUAL_ACCOUNT_FUND_TRANSFER.value: RequestSpec(
+        _has_transaction_reference, _transfer
+    ),
+    ServiceTypeConstants.GET_BILLERS_BY_TYPE.value: RequestSpec(
+        _has_data("billers"), _data_key("billers")
+    ),
+    ServiceTypeConstants.VERIFY_BILL_CUSTOMER.value: RequestSpec(
+        _has_data("customerName"), _customer_name
+    ),
+    ServiceTypeConstants.PURCHASE_BILL.value: _BILL_PURCHASE,
+    ServiceTypeConstants.ADMIN_PURCHASE_BILL.value: _BILL_PURCHASE,
+    ServiceTypeConstants.ADMIN_DISABLE_VIRTUAL_ACCOUNT.value: _VIRTUAL_ACCOUNT_STATE,
+    ServiceTypeConstants.ADMIN_ENABLE_VIRTUAL_ACCOUNT.value: _VIRTUAL_ACCOUNT_STATE,
+    ServiceTypeConstants.ADMIN_UPDATE_VIRTUAL_ACCOUNT.value: _VIRTUAL_ACCOUNT_STATE,
+    ServiceTypeConstants.ADMIN_RETRIEVE_SINGLE_VIRTUAL_ACCOUNT.value: RequestSpec(
+        _has_data(), _virtual_account
+    ),
+    ServiceTypeConstants.ADMIN_VIRTUAL_ACCOUNTS.value: RequestSpec(
+        _has_data("accounts"), _virtual_accounts
+    ),
+}
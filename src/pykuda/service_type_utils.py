@@ -1,8 +1,9 @@
-import requests
+import time
 
-from pykuda.classes.py_kuda_response import PyKudaResponse
+from pykuda.classes.instrumentation import RequestEvent
+from pykuda.classes.py_kuda_response import ErrorResponse, PyKudaResponse
+from pykuda.request_specs import REQUEST_SPECS
 from pykuda.utils import Utils
-from pykuda.constants import HTTP_REQUEST_TIMEOUT
 
 
 class ServiceTypeUtils(Utils):
@@ -10,823 +11,230 @@ class ServiceTypeUtils(Utils):
     A utility class responsible for generating headers and making API calls to the respective endpoints for KUDA services.
     Manages account-related HTTP requests and bill payments.
 
+    Every request goes through a single dispatch engine: `_request` sends the data
+    and `_parse_response` turns Kuda's reply into a PyKudaResponse using the
+    RequestSpec registered for the request's service type in REQUEST_SPECS.
+    AsyncPyKuda only replaces the HTTP layer, so both clients share the parsing.
+
     Methods:
         check_envs_are_set(): Checks if important environmental variables are set.
         get_token(): Generates a token from KUDA's TOKEN URL.
         generate_headers(): Generates headers for requests.
-        bank_list_request(data: dict) -> PyKudaResponse: Retrieves a list of Nigerian banks.
-        create_virtual_account_request(data: dict) -> PyKudaResponse: Creates a virtual account.
+        request(data: dict) -> PyKudaResponse: Sends a request and parses the reply.
+        parse_response(data: dict, response, retries: int) -> PyKudaResponse:
+            Wraps Kuda's reply to a request, parsed on first access.
     """
 
-    # Account HTTP requests
-
-    def _banks_list_request(self, data: dict) -> PyKudaResponse:
+    def _request(self, data: dict, delivery: dict | None = None) -> PyKudaResponse:
         """
-        Retrieves a list of Nigerian banks.
+        Sends a request to KUDA's REQUEST URL and parses the response.
 
         Args:
-            data (dict): Request data for the API call.
+            data (dict): Request data for the API call, including its serviceType.
+            delivery (dict | None): If set, its "sent" key is set to True once the
+                request may have reached Kuda, see _mark_sent.
 
         Returns:
-            A PyKudaResponse object with the list of banks or an error message.
+            A PyKudaResponse object with the parsed data or an error message.
         """
-        headers = self._generate_headers()
+        if self.instruments:
+            return self._instrumented_request(data, delivery)
 
-        if isinstance(headers, requests.models.Response):
-            return PyKudaResponse(
-                status_code=headers.status_code, data=headers, error=True
-            )
-        else:
-            response = requests.post(
-                self.credentials["REQUEST_URL"],
-                json=data,
-                headers=headers,
-                timeout=HTTP_REQUEST_TIMEOUT,
-            )
+        return self._reply(data, *self._send(data, delivery=delivery))
 
-            response_data = response.json()
-
-            if (
-                response.status_code == 200
-                and response_data
-                and response_data.get("status")
-                and response_data.get("data")
-                and response_data.get("data").get("banks")
-            ):
-                return PyKudaResponse(
-                    status_code=200,
-                    data=response_data["data"]["banks"],
-                )
-            else:
-                return PyKudaResponse(
-                    status_code=response.status_code, data=response, error=True
-                )
-
-    def _create_virtual_account_request(self, data: dict) -> PyKudaResponse:
+    def _send(
+        self, data: dict, timings: dict | None = None, delivery: dict | None = None
+    ) -> tuple:
         """
-        Function responsible for creating a virtual account.
+        Generates headers and posts the request, retrying transient failures
+        according to the retry policy of the request's service type. Every attempt
+        is paced by the token bucket of the service type and guarded by its
+        circuit breaker, if any.
 
-        Args:
-            data (dict): Request data for the API call.
-
-        Returns:
-            PyKudaResponse: Response object with the virtual account details or an error message.
-        """
-        headers = self._generate_headers()
-
-        if isinstance(headers, requests.models.Response):
-            return PyKudaResponse(
-                status_code=headers.status_code, data=headers, error=True
-            )
-        else:
-            response = requests.post(
-                self.credentials["REQUEST_URL"],
-                json=data,
-                headers=headers,
-                timeout=HTTP_REQUEST_TIMEOUT,
-            )
-
-            response_data = response.json()
-
-            if (
-                response.status_code == 200
-                and response_data
-                and response_data.get("status")
-                and response_data.get("data")
-                and response_data.get("data").get("accountNumber")
-            ):
-                return PyKudaResponse(
-                    status_code=201,
-                    data={
-                        "account_number": response_data["data"]["accountNumber"],
-                        "tracking_reference": data["Data"]["trackingReference"],
-                    },
-                )
-
-            else:
-                return PyKudaResponse(
-                    status_code=response.status_code, data=response, error=True
-                )
-
-    def _upgrade_virtual_account_request(self, data: dict) -> PyKudaResponse:
-        """
-        Function responsible for upgrading a virtual account.
+        Retries resend the same data, so the requestref and trackingReference of
+        the first attempt are reused. AsyncPyKuda._send runs the same steps, and
+        both take their decisions through the helpers below.
 
         Args:
-            data (dict): Request data for the API call.
+            data (dict): Request data for the API call, including its serviceType.
+            timings (dict | None): If set, seconds spent generating headers ("token")
+                and sending the request ("send") are added to it.
+            delivery (dict | None): See _request.
 
         Returns:
-            PyKudaResponse: Response object with the virtual account details or an error message.
-        """
-        headers = self._generate_headers()
-
-        if isinstance(headers, requests.models.Response):
-            return PyKudaResponse(
-                status_code=headers.status_code, data=headers, error=True
-            )
-        else:
-            response = requests.post(
-                self.credentials["REQUEST_URL"],
-                json=data,
-                headers=headers,
-                timeout=HTTP_REQUEST_TIMEOUT,
-            )
+            tuple: The last response, whether it is the reply to the request (False
+            if generating the token failed) and the number of retries.
 
-            response_data = response.json()
-
-            if (
-                response.status_code == 200
-                and response_data
-                and response_data.get("status")
-                and (
-                    response_data.get("message")
-                    == "Virtual account upgrade request logged."
-                    or response_data.get("statusCode") == "k00"
-                )
-            ):
-                return PyKudaResponse(
-                    status_code=200,
-                    data=response_data,
-                )
-
-            else:
-                return PyKudaResponse(
-                    status_code=response.status_code, data=response, error=True
-                )
-
-    def _virtual_account_balance_request(self, data: dict) -> PyKudaResponse:
+        Raises:
+            CircuitOpenError: If the circuit of the service type or the token is open.
         """
-        Retrieves the balance of a virtual account.
+        policy, bucket, breaker = self._start_send(data["serviceType"])
 
-        Args:
-            data (dict): Request data for the API call.
+        attempt = 1
+        while True:
+            if bucket is not None:
+                bucket.acquire()
+            posted = False
+            try:
+                start = time.perf_counter()
+                headers = self._generate_headers()
+                self._add_timing(timings, "token", start)
 
-        Returns:
-            A PyKudaResponse object with the account balance details or an error message.
-        """
-        headers = self._generate_headers()
+                if isinstance(headers, dict):
+                    start = time.perf_counter()
+                    posted = True
+                    response = (
+                        self._post_request(data, headers, delivery)
+                        if breaker is None
+                        else breaker.call(self._post_request, data, headers, delivery)
+                    )
+                    self._add_timing(timings, "send", start)
+                    sent = True
+                else:
+                    response, sent = headers, False
 
-        if isinstance(headers, requests.models.Response):
-            return PyKudaResponse(
-                status_code=headers.status_code, data=headers, error=True
-            )
-        else:
-            response = requests.post(
-                self.credentials["REQUEST_URL"],
-                json=data,
-                headers=headers,
-                timeout=HTTP_REQUEST_TIMEOUT,
-            )
+                if not self._retries_response(policy, attempt, response):
+                    return response, sent, attempt - 1
+            except self._retryable_exceptions as exc:
+                if not self._retries_exception(policy, attempt, exc, posted):
+                    raise
 
-            response_data = response.json()
-
-            if response.status_code == 200 and response_data.get("status"):
-                return PyKudaResponse(
-                    status_code=200,
-                    data={
-                        "ledger": response_data["data"]["ledgerBalance"],
-                        "available": response_data["data"]["availableBalance"],
-                        "withdrawable": response_data["data"]["withdrawableBalance"],
-                    },
-                )
-            else:
-                return PyKudaResponse(
-                    status_code=response.status_code, data=response, error=True
-                )
-
-    def _main_account_balance_request(self, data: dict) -> PyKudaResponse:
-        """
-        Retrieves the total balance of the main account.
+            time.sleep(policy.delay(attempt))
+            attempt += 1
 
-        Args:
-            data (dict): Request data for the API call.
-
-        Returns:
-            A PyKudaResponse object with the main account balance details or an error message.
-        """
-        headers = self._generate_headers()
-
-        if isinstance(headers, requests.models.Response):
-            return PyKudaResponse(
-                status_code=headers.status_code, data=headers, error=True
-            )
-        else:
-            response = requests.post(
-                self.credentials["REQUEST_URL"],
-                json=data,
-                headers=headers,
-                timeout=HTTP_REQUEST_TIMEOUT,
-            )
-
-            response_data = response.json()
-
-            if response.status_code == 200 and response_data.get("status"):
-                return PyKudaResponse(
-                    status_code=200,
-                    data={
-                        "ledger": response_data["data"]["ledgerBalance"],
-                        "available": response_data["data"]["availableBalance"],
-                        "withdrawable": response_data["data"]["withdrawableBalance"],
-                    },
-                )
-            else:
-                return PyKudaResponse(
-                    status_code=response.status_code, data=response, error=True
-                )
-
-    def _fund_virtual_account_request(self, data: dict) -> PyKudaResponse:
+    def _instrumented_request(
+        self, data: dict, delivery: dict | None = None
+    ) -> PyKudaResponse:
         """
-        Funds a virtual account from the main Kuda account.
+        Same as _request, timing each phase and reporting it to the registered instruments.
 
         Args:
-            data (dict): Request data for the API call.
+            data (dict): Request data for the API call, including its serviceType.
+            delivery (dict | None): See _request.
 
         Returns:
-            A PyKudaResponse object with the transaction reference or an error message.
+            A PyKudaResponse object with the parsed data or an error message.
         """
-        headers = self._generate_headers()
+        event = self._start_event(data)
+        try:
+            response, sent, event.retries = self._send(data, event.timings, delivery)
+            return self._finish_event(event, data, response, sent)
+        except Exception as exc:
+            event.exception = exc
+            event.error = True
+            raise
+        finally:
+            self._emit("after_request", event)
 
-        if isinstance(headers, requests.models.Response):
-            return PyKudaResponse(
-                status_code=headers.status_code, data=headers, error=True
-            )
-        else:
-            response = requests.post(
-                self.credentials["REQUEST_URL"],
-                json=data,
-                headers=headers,
-                timeout=HTTP_REQUEST_TIMEOUT,
-            )
-
-            response_data = response.json()
-
-            if (
-                response.status_code == 200
-                and response_data.get("status")
-                and response_data.get("transactionReference")
-            ):
-                return PyKudaResponse(
-                    status_code=200,
-                    data={"reference": response_data.get("transactionReference")},
-                )
-            else:
-                return PyKudaResponse(
-                    status_code=response.status_code, data=response, error=True
-                )
-
-    def _withdraw_from_virtual_account_request(self, data: dict) -> PyKudaResponse:
+    def _start_send(self, service_type: str) -> tuple:
         """
-        Withdraws funds from a virtual account and deposits to another virtual account.
-
-        Args:
-            data (dict): Request data for the API call.
-
-        Returns:
-            A PyKudaResponse object with the transaction reference or an error message.
+        Returns the retry policy, token bucket and circuit breaker of a service
+        type, and counts the request in the retry budget.
         """
-        headers = self._generate_headers()
+        if self.retry_budget is not None:
+            self.retry_budget.record_request()
+        return (
+            self._retry_policy(service_type),
+            self._rate_limiter(service_type),
+            self._circuit_breaker(service_type),
+        )
 
-        if isinstance(headers, requests.models.Response):
-            return PyKudaResponse(
-                status_code=headers.status_code, data=headers, error=True
-            )
-        else:
-            response = requests.post(
-                self.credentials["REQUEST_URL"],
-                json=data,
-                headers=headers,
-                timeout=HTTP_REQUEST_TIMEOUT,
-            )
-
-            response_data = response.json()
-
-            if (
-                response.status_code == 200
-                and response_data.get("status")
-                and response_data.get("transactionReference")
-            ):
-                return PyKudaResponse(
-                    status_code=200,
-                    data={"reference": response_data.get("transactionReference")},
-                )
-            else:
-                return PyKudaResponse(
-                    status_code=response.status_code, data=response, error=True
-                )
-
-    def _confirm_transfer_recipient_request(self, data: dict) -> PyKudaResponse:
+    def _retries_response(self, policy, attempt: int, response) -> bool:
         """
-        Confirms that a recipient's information is correct.
-
-        Args:
-            data (dict): Request data for the API call.
-
-        Returns:
-            A PyKudaResponse object with the recipient's information or an error message.
+        Checks whether a response is retried after the given attempt.
         """
-        headers = self._generate_headers()
+        return response.status_code in policy.statuses and self._can_retry(
+            policy, attempt
+        )
 
-        if isinstance(headers, requests.models.Response):
-            return PyKudaResponse(
-                status_code=headers.status_code, data=headers, error=True
-            )
-        else:
-            response = requests.post(
-                self.credentials["REQUEST_URL"],
-                json=data,
-                headers=headers,
-                timeout=HTTP_REQUEST_TIMEOUT,
-            )
-
-            response_data = response.json()
-
-            if (
-                response.status_code == 200
-                and response_data.get("status")
-                and response_data.get("data")
-                and response_data.get("data").get("beneficiaryAccountNumber")
-                and response_data.get("data").get("beneficiaryName")
-            ):
-                beneficiary_data = response_data.get("data")
-                return PyKudaResponse(
-                    status_code=200,
-                    data={
-                        "beneficiary_account_number": beneficiary_data.get(
-                            "beneficiaryAccountNumber"
-                        ),
-                        "beneficiary_name": beneficiary_data.get("beneficiaryName"),
-                        "beneficiary_code": beneficiary_data.get("beneficiaryBankCode"),
-                        "session_id": beneficiary_data.get("sessionID"),
-                        "sender_account": beneficiary_data.get("senderAccountNumber"),
-                        "transfer_charge": beneficiary_data.get("transferCharge"),
-                        "name_enquiry_id": beneficiary_data.get("nameEnquiryID"),
-                        "tracking_reference": data["Data"]["SenderTrackingReference"],
-                    },
-                )
-            else:
-                return PyKudaResponse(
-                    status_code=response.status_code, data=response, error=True
-                )
-
-    def _send_funds_from_main_account_request(self, data: dict) -> PyKudaResponse:
+    def _retries_exception(
+        self, policy, attempt: int, exc: Exception, posted: bool
+    ) -> bool:
         """
-        Sends funds from the main account.
-
-        Args:
-            data (dict): Request data for the API call.
-
-        Returns:
-            A PyKudaResponse object with the transaction reference or an error message.
+        Checks whether a transport error is retried after the given attempt.
+        Requests that were certainly not sent are retried under retry_unsent,
+        the others under retry_timeouts.
         """
-        headers = self._generate_headers()
-
-        if isinstance(headers, requests.models.Response):
-            return PyKudaResponse(
-                status_code=headers.status_code, data=headers, error=True
-            )
-        else:
-            response = requests.post(
-                self.credentials["REQUEST_URL"],
-                json=data,
-                headers=headers,
-                timeout=HTTP_REQUEST_TIMEOUT,
-            )
+        unsent = not posted or self._is_unsent_error(exc)
+        retryable = policy.retry_timeouts or (policy.retry_unsent and unsent)
+        return retryable and self._can_retry(policy, attempt)
 
-            response_data = response.json()
-
-            if (
-                response.status_code == 200
-                and response_data.get("status")
-                and response_data.get("transactionReference")
-            ):
-                return PyKudaResponse(
-                    status_code=200,
-                    data={
-                        "transaction_reference": response_data.get(
-                            "transactionReference"
-                        ),
-                        "request_reference": response_data.get("requestReference"),
-                    },
-                )
-            else:
-                return PyKudaResponse(
-                    status_code=response.status_code, data=response, error=True
-                )
-
-    def _send_funds_from_virtual_account_request(self, data: dict) -> PyKudaResponse:
+    @staticmethod
+    def _add_timing(timings: dict | None, phase: str, start: float) -> None:
         """
-        Sends funds from a virtual account.
-
-        Args:
-            data (dict): Request data for the API call.
-
-        Returns:
-            A PyKudaResponse object with the transaction reference or an error message.
+        Adds the seconds elapsed since start to a phase of the timings, if any.
         """
-        headers = self._generate_headers()
+        if timings is not None:
+            timings[phase] = timings.get(phase, 0) + time.perf_counter() - start
 
-        if isinstance(headers, requests.models.Response):
-            return PyKudaResponse(
-                status_code=headers.status_code, data=headers, error=True
-            )
-        else:
-            response = requests.post(
-                self.credentials["REQUEST_URL"],
-                json=data,
-                headers=headers,
-                timeout=HTTP_REQUEST_TIMEOUT,
-            )
-
-            response_data = response.json()
-
-            if (
-                response.status_code == 200
-                and response_data.get("status")
-                and response_data.get("transactionReference")
-            ):
-                return PyKudaResponse(
-                    status_code=200,
-                    data={
-                        "transaction_reference": response_data.get(
-                            "transactionReference"
-                        ),
-                        "request_reference": response_data.get("requestReference"),
-                    },
-                )
-            else:
-                return PyKudaResponse(
-                    status_code=response.status_code, data=response, error=True
-                )
-
-    # Bill Payments
-
-    def _billers_request(self, data: dict) -> PyKudaResponse:
+    def _reply(self, data: dict, response, sent: bool, retries: int) -> PyKudaResponse:
         """
-        Gets billers.
+        Wraps the result of _send in a PyKudaResponse.
 
         Args:
             data (dict): Request data for the API call.
+            response: The last response returned by _send.
+            sent (bool): Whether the response is the reply to the request.
+            retries (int): The number of times the request was retried.
 
         Returns:
-            A PyKudaResponse object with the list of billers or an error message.
+            A PyKudaResponse object with the parsed data or an error message.
         """
-        headers = self._generate_headers()
-
-        if isinstance(headers, requests.models.Response):
+        if not sent:
             return PyKudaResponse(
-                status_code=headers.status_code, data=headers, error=True
+                status_code=response.status_code,
+                data=ErrorResponse.from_response(response, self.codec),
+                error=True,
+                retries=retries,
             )
-        else:
-            response = requests.post(
-                self.credentials["REQUEST_URL"],
-                json=data,
-                headers=headers,
-                timeout=HTTP_REQUEST_TIMEOUT,
-            )
-
-            response_data = response.json()
-
-            if (
-                response.status_code == 200
-                and response_data.get("status")
-                and response_data.get("data")
-                and response_data.get("data").get("billers")
-            ):
-                return PyKudaResponse(
-                    status_code=200,
-                    data=response_data.get("data").get("billers"),
-                )
-            else:
-                return PyKudaResponse(
-                    status_code=response.status_code, data=response, error=True
-                )
-
-    def _verify_bill_customer_request(self, data: dict) -> PyKudaResponse:
-        """
-        Verifies bill information.
-
-        Args:
-            data (dict): Request data for the API call.
-
-        Returns:
-            A PyKudaResponse object with the customer's name or an error message.
-        """
-        headers = self._generate_headers()
-
-        if isinstance(headers, requests.models.Response):
-            return PyKudaResponse(
-                status_code=headers.status_code, data=headers, error=True
-            )
-        else:
-            response = requests.post(
-                self.credentials["REQUEST_URL"],
-                json=data,
-                headers=headers,
-                timeout=HTTP_REQUEST_TIMEOUT,
-            )
-
-            response_data = response.json()
-
-            if (
-                response.status_code == 200
-                and response_data.get("status")
-                and response_data.get("data")
-                and response_data.get("data").get("customerName")
-            ):
-                return PyKudaResponse(
-                    status_code=200,
-                    data={
-                        "customer_name": response_data.get("data").get("customerName"),
-                    },
-                )
-            else:
-                return PyKudaResponse(
-                    status_code=response.status_code, data=response, error=True
-                )
-
-    def _admin_purchase_bill_request(self, data: dict) -> PyKudaResponse:
-        """
-        Makes a bill payment using a virtual account.
-
-        Args:
-            data (dict): Request data for the API call.
-
-        Returns:
-            A PyKudaResponse object with the payment reference or an error message.
-        """
-        headers = self._generate_headers()
-
-        if isinstance(headers, requests.models.Response):
-            return PyKudaResponse(
-                status_code=headers.status_code, data=headers, error=True
-            )
-        else:
-            response = requests.post(
-                self.credentials["REQUEST_URL"],
-                json=data,
-                headers=headers,
-                timeout=HTTP_REQUEST_TIMEOUT,
-            )
-
-            response_data = response.json()
-
-            if (
-                response.status_code == 200
-                and response_data.get("status")
-                and response_data.get("data")
-                and response_data.get("data").get("reference")
-            ):
-                return PyKudaResponse(
-                    status_code=200,
-                    data={
-                        "reference": response_data.get("data").get("reference"),
-                    },
-                )
-            else:
-                return PyKudaResponse(
-                    status_code=response.status_code, data=response, error=True
-                )
-
-    def _virtual_account_purchase_bill_request(self, data: dict) -> PyKudaResponse:
-        """
-        Makes a bill payment using a virtual account.
-
-        Args:
-            data (dict): Request data for the API call.
-
-        Returns:
-            A PyKudaResponse object with the payment reference or an error message.
-        """
-        headers = self._generate_headers()
-
-        if isinstance(headers, requests.models.Response):
-            return PyKudaResponse(
-                status_code=headers.status_code, data=headers, error=True
-            )
-        else:
-            response = requests.post(
-                self.credentials["REQUEST_URL"],
-                json=data,
-                headers=headers,
-                timeout=HTTP_REQUEST_TIMEOUT,
-            )
-
-            response_data = response.json()
-
-            if (
-                response.status_code == 200
-                and response_data.get("status")
-                and response_data.get("data")
-                and response_data.get("data").get("reference")
-            ):
-                return PyKudaResponse(
-                    status_code=200,
-                    data={
-                        "reference": response_data.get("data").get("reference"),
-                    },
-                )
-            else:
-                return PyKudaResponse(
-                    status_code=response.status_code, data=response, error=True
-                )
-
-    def _disable_virtual_account_request(self, data: dict) -> PyKudaResponse:
-        """
-        Makes a bill payment using a virtual account.
-
-        Args:
-            data (dict): Request data for the API call.
 
-        Returns:
-            A PyKudaResponse object with the payment reference or an error message.
-        """
-        headers = self._generate_headers()
+        return self._parse_response(data, response, retries)
 
-        if isinstance(headers, requests.models.Response):
-            return PyKudaResponse(
-                status_code=headers.status_code, data=headers, error=True
-            )
-        else:
-            response = requests.post(
-                self.credentials["REQUEST_URL"],
-                json=data,
-                headers=headers,
-                timeout=HTTP_REQUEST_TIMEOUT,
-            )
-
-            response_data = response.json()
-
-            if response.status_code == 200 and response_data.get("status"):
-                return PyKudaResponse(
-                    status_code=200,
-                    data={
-                        "account_number": response_data.get("data").get(
-                            "accountNumber"
-                        ),
-                    },
-                )
-            else:
-                return PyKudaResponse(
-                    status_code=response.status_code, data=response, error=True
-                )
-
-    def _enable_virtual_account_request(self, data: dict) -> PyKudaResponse:
+    def _start_event(self, data: dict) -> RequestEvent:
         """
-        Makes a bill payment using a virtual account.
-
-        Args:
-            data (dict): Request data for the API call.
-
-        Returns:
-            A PyKudaResponse object with the payment reference or an error message.
+        Creates the instrumentation event of a request and reports its start.
         """
-        headers = self._generate_headers()
-
-        if isinstance(headers, requests.models.Response):
-            return PyKudaResponse(
-                status_code=headers.status_code, data=headers, error=True
-            )
-        else:
-            response = requests.post(
-                self.credentials["REQUEST_URL"],
-                json=data,
-                headers=headers,
-                timeout=HTTP_REQUEST_TIMEOUT,
-            )
+        event = RequestEvent(
+            service_type=data["serviceType"], request_ref=data["requestref"]
+        )
+        self._emit("before_request", event)
+        return event
 
-            response_data = response.json()
-
-            if response.status_code == 200 and response_data.get("status"):
-                return PyKudaResponse(
-                    status_code=200,
-                    data={
-                        "account_number": response_data.get("data").get(
-                            "accountNumber"
-                        ),
-                    },
-                )
-            else:
-                return PyKudaResponse(
-                    status_code=response.status_code, data=response, error=True
-                )
-
-    def _update_virtual_account_info_request(self, data: dict) -> PyKudaResponse:
+    def _finish_event(
+        self, event: RequestEvent, data: dict, response, sent: bool
+    ) -> PyKudaResponse:
         """
-        Makes a bill payment using a virtual account.
-
-        Args:
-            data (dict): Request data for the API call.
-
-        Returns:
-            A PyKudaResponse object with the payment reference or an error message.
+        Wraps the result of _send in a PyKudaResponse, timing the parsing and
+        recording the outcome on the instrumentation event.
         """
-        headers = self._generate_headers()
+        start = time.perf_counter()
+        pykuda_response = self._reply(data, response, sent, event.retries)
+        if sent:
+            # Parse the reply now rather than on first access, so it is timed.
+            pykuda_response._resolve()
+            event.timings["parse"] = time.perf_counter() - start
+            self._record_payload_sizes(event, response)
 
-        if isinstance(headers, requests.models.Response):
-            return PyKudaResponse(
-                status_code=headers.status_code, data=headers, error=True
-            )
-        else:
-            response = requests.post(
-                self.credentials["REQUEST_URL"],
-                json=data,
-                headers=headers,
-                timeout=HTTP_REQUEST_TIMEOUT,
-            )
-
-            response_data = response.json()
-
-            if response.status_code == 200 and response_data.get("status"):
-                return PyKudaResponse(
-                    status_code=200,
-                    data={
-                        "account_number": response_data.get("data").get(
-                            "accountNumber"
-                        ),
-                    },
-                )
-            else:
-                return PyKudaResponse(
-                    status_code=response.status_code, data=response, error=True
-                )
-
-    def _retrieve_single_virtual_account_request(self, data: dict) -> PyKudaResponse:
-        """
-        Makes a bill payment using a virtual account.
-
-        Args:
-            data (dict): Request data for the API call.
-
-        Returns:
-            A PyKudaResponse object with the payment reference or an error message.
-        """
-        headers = self._generate_headers()
-
-        if isinstance(headers, requests.models.Response):
-            return PyKudaResponse(
-                status_code=headers.status_code, data=headers, error=True
-            )
-        else:
-            response = requests.post(
-                self.credentials["REQUEST_URL"],
-                json=data,
-                headers=headers,
-                timeout=HTTP_REQUEST_TIMEOUT,
-            )
+        event.status_code = pykuda_response.status_code
+        event.error = pykuda_response.error
+        return pykuda_response
 
-            response_data = response.json()
-
-            if (
-                response.status_code == 200
-                and response_data.get("status")
-                and response_data.get("data")
-            ):
-                return PyKudaResponse(
-                    status_code=200,
-                    data=response_data.get("data"),
-                )
-            else:
-                return PyKudaResponse(
-                    status_code=response.status_code, data=response, error=True
-                )
-
-    def _retrieve_all_virtual_accounts_request(self, data: dict) -> PyKudaResponse:
+    def _parse_response(
+        self, data: dict, response, retries: int = 0
+    ) -> PyKudaResponse:
         """
-        Makes a bill payment using a virtual account.
+        Wraps Kuda's reply to a request in a PyKudaResponse, parsed on first access
+        with the RequestSpec of its service type.
 
         Args:
             data (dict): Request data for the API call.
+            response: The HTTP response of the request.
+            retries (int): The number of times the request was retried.
 
         Returns:
-            A PyKudaResponse object with the payment reference or an error message.
+            A PyKudaResponse object with the extracted data, or an ErrorResponse
+            as data if Kuda did not process the request.
         """
-        headers = self._generate_headers()
-
-        if isinstance(headers, requests.models.Response):
-            return PyKudaResponse(
-                status_code=headers.status_code, data=headers, error=True
-            )
-        else:
-            response = requests.post(
-                self.credentials["REQUEST_URL"],
-                json=data,
-                headers=headers,
-                timeout=HTTP_REQUEST_TIMEOUT,
-            )
-
-            response_data = response.json()
-
-            if (
-                response.status_code == 200
-                and response_data.get("status")
-                and response_data.get("data")
-                and response_data.get("data").get("accounts")
-            ):
-                return PyKudaResponse(
-                    status_code=200,
-                    data=response_data.get("data").get("accounts"),
-                )
-            else:
-                return PyKudaResponse(
-                    status_code=response.status_code, data=response, error=True
-                )
+        return PyKudaResponse.from_reply(
+            REQUEST_SPECS[data["serviceType"]], data, response, self.codec, retries
+        )
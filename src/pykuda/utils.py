@@ -1,9 +1,26 @@
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from dataclasses import dataclass
-from decouple import config
+from functools import partial
+from typing import TYPE_CHECKING, Any, Callable, Iterable, Iterator
+import logging
 import secrets
-import requests
 
-from pykuda.constants import KUDA_CREDENTIALS_KEYS
+from pykuda.classes.circuit_breaker import TOKEN_CIRCUIT, CircuitBreaker
+from pykuda.classes.json_codec import JsonCodec, default_codec
+from pykuda.classes.rate_limiter import TokenBucket
+from pykuda.classes.retry_policy import NO_RETRY, RetryBudget, RetryPolicy
+from pykuda.constants import (
+    HTTP_REQUEST_TIMEOUT,
+    KUDA_CREDENTIALS_KEYS,
+    MONEY_SERVICE_TYPES,
+    POOL_CONNECTIONS,
+    POOL_MAXSIZE,
+)
+
+if TYPE_CHECKING:
+    import requests
+
+logger = logging.getLogger("pykuda")
 
 
 def check_envs_are_set(credentials: dict | None) -> bool | str:
@@ -15,21 +32,23 @@ def check_envs_are_set(credentials: dict | None) -> bool | str:
         - "EMAIL": Email associated with the KUDA account.
         - "MAIN_ACCOUNT_NUMBER": Main account number.
 
+    The environment (and .env file) is only read if no credentials are passed.
+
     Returns:
         A dictionary of credentials if all environmental variables are set,
         otherwise a string with missing variables.
     """
-    credentials = (
-        credentials
-        if credentials
-        else {
+    if not credentials:
+        # Imported here, so that passing credentials never loads decouple.
+        from decouple import config
+
+        credentials = {
             "KUDA_KEY": config("KUDA_KEY", default=None),
             "TOKEN_URL": config("TOKEN_URL", default=None),
             "REQUEST_URL": config("REQUEST_URL", default=None),
             "EMAIL": config("EMAIL", default=None),
             "MAIN_ACCOUNT_NUMBER": config("MAIN_ACCOUNT_NUMBER", default=None),
         }
-    )
 
     unset_variables = [
         kuda_key for kuda_key in KUDA_CREDENTIALS_KEYS if not credentials.get(kuda_key)
@@ -41,6 +60,75 @@ def check_envs_are_set(credentials: dict | None) -> bool | str:
     )
 
 
+def create_session(
+    pool_connections: int = POOL_CONNECTIONS, pool_maxsize: int = POOL_MAXSIZE
+) -> "requests.Session":
+    """
+    Creates a pooled HTTP session that keeps connections to Kuda alive between requests.
+
+    Args:
+        pool_connections (int): Number of host connection pools to cache.
+        pool_maxsize (int): Maximum number of connections kept alive per host.
+
+    Returns:
+        A requests.Session with an HTTPAdapter mounted for http and https.
+    """
+    import requests
+    from requests.adapters import HTTPAdapter
+
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update({"Connection": "keep-alive"})
+    return session
+
+
+def run_concurrently(
+    func: Callable[[Any], Any], items: Iterable, concurrency: int
+) -> Iterator[tuple[Any, Any]]:
+    """
+    Calls `func` on every item with at most `concurrency` calls in flight.
+
+    Items are consumed lazily from the iterable, so only `concurrency` items are
+    held in memory at a time, and results are yielded as soon as they complete,
+    not in input order.
+
+    Args:
+        func (Callable): The function to call on each item.
+        items (Iterable): The items to process.
+        concurrency (int): The maximum number of concurrent calls.
+
+    Yields:
+        A tuple of the item and the result of func(item).
+    """
+    if concurrency < 1:
+        raise ValueError("concurrency must be at least 1.")
+
+    items = iter(items)
+    in_flight = {}
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        try:
+            for item in items:
+                in_flight[executor.submit(func, item)] = item
+                if len(in_flight) < concurrency:
+                    continue
+
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield in_flight.pop(future), future.result()
+
+            while in_flight:
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield in_flight.pop(future), future.result()
+        finally:
+            # Don't start queued calls if the caller stops iterating early.
+            for future in in_flight:
+                future.cancel()
+
+
 @dataclass
 class Utils:
     """Attributes:
@@ -49,9 +137,243 @@ class Utils:
         - "TOKEN_URL": URL for generating tokens.
         - "REQUEST_URL": URL for making API requests.
         - "EMAIL": Email associated with the KUDA account.
-        - "MAIN_ACCOUNT_NUMBER": Main account number."""
+        - "MAIN_ACCOUNT_NUMBER": Main account number.
+    token_cache (TokenCache | None): Cache for the generated bearer token. When
+        None, a new token is generated for every request.
+    session (requests.Session | None): Session used to send requests. When None,
+        every request opens a new connection.
+    instruments (tuple): Instrumentation hooks called around every request.
+    retry_policy (RetryPolicy): Retry policy of service types without their own.
+    retry_policies (dict): Retry policies per service type value.
+    retry_budget (RetryBudget | None): Caps retries to a share of requests.
+    rate_limit (TokenBucket | None): Paces requests of service types without their own bucket.
+    rate_limits (dict): Token buckets per service type value.
+    circuit_breakers (CircuitBreakers | None): Circuit breakers per service type and
+        for the token endpoint.
+    codec (JsonCodec): Encodes request bodies and decodes response bodies."""
 
     credentials = None
+    token_cache = None
+    session = None
+    instruments = ()
+    retry_policy = NO_RETRY
+    retry_policies = {}
+    retry_budget = None
+    rate_limit = None
+    rate_limits = {}
+    circuit_breakers = None
+    _codec = None
+
+    @property
+    def codec(self) -> JsonCodec:
+        """The JSON codec of request and response bodies, picked on first use if not set."""
+        if self._codec is None:
+            self._codec = default_codec()
+        return self._codec
+
+    @codec.setter
+    def codec(self, codec: JsonCodec | None) -> None:
+        self._codec = codec
+
+    @property
+    def _retryable_exceptions(self) -> tuple:
+        """Transport errors that may be retried, see RetryPolicy.retry_timeouts."""
+        import requests
+
+        return (requests.exceptions.ConnectionError, requests.exceptions.Timeout)
+
+    @staticmethod
+    def _is_unsent_error(exc: Exception) -> bool:
+        """
+        Checks whether a transport error was raised before the request reached Kuda,
+        i.e. the connection could not be established.
+        """
+        import requests
+        from urllib3.exceptions import NewConnectionError
+
+        if isinstance(exc, requests.exceptions.ConnectTimeout):
+            return True
+        reason = getattr(exc.args[0], "reason", None) if exc.args else None
+        return isinstance(exc, requests.exceptions.ConnectionError) and isinstance(
+            reason, NewConnectionError
+        )
+
+    def _mark_sent(self, delivery: dict | None, exc: Exception | None = None) -> None:
+        """
+        Records in `delivery` that a request may have reached Kuda, unless posting
+        it raised an error telling it did not. Requests stopped before they were
+        posted, e.g. by an open circuit or a failed token request, are never marked.
+
+        Args:
+            delivery (dict | None): Its "sent" key is set to True. Nothing is
+                recorded when it is None.
+            exc (Exception | None): The error raised while posting the request.
+        """
+        if delivery is not None and (exc is None or not self._is_unsent_error(exc)):
+            delivery["sent"] = True
+
+    def _configure_retries(
+        self,
+        retry_policy: RetryPolicy | None,
+        retry_policies: dict | None,
+        retry_budget: RetryBudget | None,
+    ) -> None:
+        """
+        Sets up the retry policies and budget of the client.
+
+        Args:
+            retry_policy (RetryPolicy | None): Policy of service types without their
+                own. None uses RetryPolicy(). Service types moving money use it
+                restricted with RetryPolicy.unprocessed_only.
+            retry_policies (dict | None): Policies keyed by ServiceTypeConstants or
+                by service type value.
+            retry_budget (RetryBudget | None): None creates a RetryBudget().
+        """
+        self.retry_policy = retry_policy if retry_policy is not None else RetryPolicy()
+        # Resending a request moving money could move it twice, unless it was
+        # certainly not processed.
+        money_policy = self.retry_policy.unprocessed_only()
+        self.retry_policies = {
+            service_type: money_policy for service_type in MONEY_SERVICE_TYPES
+        }
+        self.retry_policies.update(
+            (getattr(service_type, "value", service_type), policy)
+            for service_type, policy in (retry_policies or {}).items()
+        )
+        self.retry_budget = retry_budget if retry_budget is not None else RetryBudget()
+
+    def _configure_rate_limits(
+        self, rate_limit: TokenBucket | None, rate_limits: dict | None
+    ) -> None:
+        """
+        Sets up the token buckets pacing the requests of the client.
+
+        Args:
+            rate_limit (TokenBucket | None): Bucket of service types without their own.
+                None leaves them unpaced.
+            rate_limits (dict | None): Buckets keyed by ServiceTypeConstants or by
+                service type value.
+        """
+        self.rate_limit = rate_limit
+        self.rate_limits = {
+            getattr(service_type, "value", service_type): bucket
+            for service_type, bucket in (rate_limits or {}).items()
+        }
+
+    def _rate_limiter(self, service_type: str) -> TokenBucket | None:
+        """
+        Returns the token bucket pacing a service type.
+
+        Args:
+            service_type (str): The service type of the request.
+
+        Returns:
+            TokenBucket | None: The bucket registered for the service type, the
+            default one, or None if requests are not paced.
+        """
+        return self.rate_limits.get(service_type, self.rate_limit)
+
+    def _circuit_breaker(self, name: str) -> CircuitBreaker | None:
+        """
+        Returns the circuit breaker guarding a service type or the token endpoint.
+
+        Args:
+            name (str): The service type of the request, or TOKEN_CIRCUIT.
+
+        Returns:
+            CircuitBreaker | None: The breaker, or None if circuit breaking is disabled.
+        """
+        return None if self.circuit_breakers is None else self.circuit_breakers.get(name)
+
+    def circuit_state(self) -> dict:
+        """
+        Returns the state of every circuit breaker used so far, e.g. for health checks.
+
+        Returns:
+            dict: A snapshot per service type (and "token") with the state of the
+            circuit ("closed", "open" or "half_open"), the requests and failures in
+            the current window, the number of requests failed fast and the seconds
+            until an open circuit is probed. Empty if circuit breaking is disabled.
+        """
+        return {} if self.circuit_breakers is None else self.circuit_breakers.snapshot()
+
+    def _retry_policy(self, service_type: str) -> RetryPolicy:
+        """
+        Returns the retry policy of a service type.
+
+        Args:
+            service_type (str): The service type of the request.
+
+        Returns:
+            RetryPolicy: The policy registered for the service type, or the default one.
+        """
+        return self.retry_policies.get(service_type, self.retry_policy)
+
+    def _can_retry(self, policy: RetryPolicy, attempt: int) -> bool:
+        """
+        Checks whether another attempt is allowed by the policy and the retry budget.
+
+        Args:
+            policy (RetryPolicy): The retry policy of the request.
+            attempt (int): Number of attempts made so far.
+
+        Returns:
+            bool: True if the request may be retried.
+        """
+        return attempt < policy.max_attempts and (
+            self.retry_budget is None or self.retry_budget.try_retry()
+        )
+
+    def add_instrument(self, instrument) -> None:
+        """
+        Registers an instrument to be called around every request.
+
+        Args:
+            instrument (Instrumentation): The instrument to register.
+        """
+        self.instruments = (*self.instruments, instrument)
+
+    def _emit(self, hook: str, event) -> None:
+        """
+        Calls a hook of every registered instrument.
+
+        A failing instrument is logged and skipped, so it can never fail a request.
+
+        Args:
+            hook (str): "before_request" or "after_request".
+            event (RequestEvent): The event describing the request.
+        """
+        for instrument in self.instruments:
+            try:
+                getattr(instrument, hook)(event)
+            except Exception:
+                logger.exception("Instrument %r failed in %s.", instrument, hook)
+
+    @staticmethod
+    def _record_payload_sizes(event, response) -> None:
+        """
+        Records the request and response body sizes of an HTTP response on an event.
+
+        Args:
+            event (RequestEvent): The event describing the request.
+            response: The requests or httpx response of the request.
+        """
+        request = getattr(response, "request", None)
+        body = getattr(request, "body", None) or getattr(request, "content", None)
+        if body is not None:
+            event.request_bytes = len(body)
+        event.response_bytes = len(response.content)
+
+    @property
+    def _http(self):
+        """Returns the session used to send requests, or the requests module if none is set."""
+        session = self.session
+        if session is not None:
+            return session
+
+        import requests
+
+        return requests
 
     def _get_token(self) -> str:
         """
@@ -61,7 +383,7 @@ class Utils:
             A string representing the generated token.
         """
 
-        return requests.post(
+        return self._http.post(
             self.credentials["TOKEN_URL"],
             json={
                 "email": self.credentials["EMAIL"],
@@ -71,7 +393,7 @@ class Utils:
             timeout=10,
         )
 
-    def _generate_headers(self) -> requests.models.Response | dict:
+    def _generate_headers(self) -> "requests.Response | dict":
         """
         Generates headers for requests.
             - "content-type": This is used to indicate the original media type of the resource
@@ -81,17 +403,85 @@ class Utils:
         Returns:
             A dictionary containing headers for API requests or a response object.
         """
-        response = self._get_token()
+        breaker = self._circuit_breaker(TOKEN_CIRCUIT)
+        fetch = (
+            self._get_token if breaker is None else partial(breaker.call, self._get_token)
+        )
+
+        if self.token_cache is None:
+            response = fetch()
+            token = response.text if response.status_code == 200 else response
+        else:
+            token = self.token_cache.get(fetch)
+
+        return self._token_headers(token)
+
+    @staticmethod
+    def _token_headers(token: "str | requests.Response"):
+        """
+        Builds request headers from a token.
 
+        Args:
+            token: The bearer token, or the failed token response.
+
+        Returns:
+            A dictionary containing headers for API requests or the failed response.
+        """
         return (
             {
                 "content-type": "application/json",
-                "Authorization": f"bearer {response.text}",
+                "Authorization": f"bearer {token}",
             }
-            if response.status_code == 200
-            else response
+            if isinstance(token, str)
+            else token
         )
 
+    def _post_request(
+        self, data: dict, headers: dict, delivery: dict | None = None
+    ) -> "requests.Response":
+        """
+        Sends a request to KUDA's REQUEST URL.
+
+        If the cached token was rejected with a 401, the token is invalidated
+        and the request is retried once with a freshly generated token.
+
+        Args:
+            data (dict): Request data for the API call.
+            headers (dict): Headers generated by _generate_headers.
+            delivery (dict | None): See _mark_sent.
+
+        Returns:
+            The response object of the request.
+        """
+        body = self.codec.encode(data)
+        try:
+            response = self._http.post(
+                self.credentials["REQUEST_URL"],
+                data=body,
+                headers=headers,
+                timeout=HTTP_REQUEST_TIMEOUT,
+            )
+        except Exception as exc:
+            self._mark_sent(delivery, exc)
+            raise
+        self._mark_sent(delivery)
+
+        if response.status_code == 401 and self.token_cache is not None:
+            self.token_cache.invalidate(
+                headers["Authorization"].removeprefix("bearer ")
+            )
+            headers = self._generate_headers()
+
+            if isinstance(headers, dict):
+                response = self._http.post(
+                    self.credentials["REQUEST_URL"],
+                    data=body,
+                    headers=headers,
+                    timeout=HTTP_REQUEST_TIMEOUT,
+                )
+
+        return response
+
     def _generate_common_data(
         self, service_type: str, tracking_reference: str | None = None
     ):
@@ -0,0 +1,365 @@
+import base64
+import hmac
+import logging
+import os
+import queue
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Iterable
+
+from pykuda.classes.json_codec import JsonCodec, default_codec
+from pykuda.classes.results import TransactionNotification
+from pykuda.classes.ttl_cache import TTLCache
+from pykuda.constants import (
+    WEBHOOK_DEDUPE_SIZE,
+    WEBHOOK_DEDUPE_TTL,
+    WEBHOOK_QUEUE_SIZE,
+    WEBHOOK_WORKERS,
+)
+
+logger = logging.getLogger("pykuda")
+
+# Marks the end of the queue for a worker thread.
+_STOP = object()
+
+
+class WebhookReceiver:
+    """
+    Verifies, parses, deduplicates and dispatches Kuda's transaction notifications.
+
+    Notifications are acknowledged as soon as they are queued, and handled by
+    `workers` threads. When `queue_size` notifications are already waiting, new
+    ones are answered with a 503 so Kuda delivers them again later, rather than
+    piling up in memory. Transaction references of the last `dedupe_size`
+    notifications every handler succeeded on are remembered, so a notification
+    delivered twice is only handled once, and one delivered again while it is
+    being handled is answered with a 503.
+
+    Kuda got its 200 once a notification was queued, so it does not deliver it
+    again when a handler raises on it or the process stops before handling it.
+    Set record_path to keep every notification before it is acknowledged, and
+    replay the recording to handle those notifications again. Notifications
+    every handler succeeded on are skipped as duplicates while they are
+    remembered, which is not across restarts.
+
+    Attributes:
+        received (int): Number of notifications received.
+        accepted (int): Number of notifications queued for the handlers.
+        duplicates (int): Number of notifications dropped as already received.
+        rejected (int): Number of notifications turned away with a 503, because
+            the queue was full or the notification was being handled.
+        invalid (int): Number of requests failing verification or parsing.
+        handled (int): Number of notifications passed to every handler.
+        failed (int): Number of handler calls that raised.
+    """
+
+    def __init__(
+        self,
+        handlers: Iterable[Callable[[TransactionNotification], None]] = (),
+        workers: int = WEBHOOK_WORKERS,
+        queue_size: int = WEBHOOK_QUEUE_SIZE,
+        dedupe_size: int = WEBHOOK_DEDUPE_SIZE,
+        dedupe_ttl: float = WEBHOOK_DEDUPE_TTL,
+        username: str | None = None,
+        password: str | None = None,
+        json_codec: JsonCodec | None = None,
+        record_path: str | None = None,
+    ):
+        """
+        Args:
+            handlers (Iterable[Callable]): Functions called with every new
+                                           TransactionNotification. More can be
+                                           added with add_handler.
+            workers (int): Number of threads calling the handlers.
+            queue_size (int): Maximum number of notifications waiting for a worker.
+            dedupe_size (int): Maximum number of transaction references remembered.
+            dedupe_ttl (float): Number of seconds a transaction reference is
+                                remembered for.
+            username (str | None): Username of the webhook's basic authentication,
+                                   as set up with Kuda. None accepts every request.
+            password (str | None): Password of the webhook's basic authentication.
+            json_codec (JsonCodec | None): Decodes notification bodies. None uses the
+                                           fastest installed codec.
+            record_path (str | None): Path of a file every valid notification is
+                                      appended to before it is acknowledged, one
+                                      per line, to be replayed later with replay.
+                                      It is the only way to handle a notification
+                                      again after a handler failed on it or the
+                                      process stopped. Created readable by the
+                                      owner only.
+
+        Raises:
+            ValueError: If only one of username and password is set.
+        """
+        if (username is None) != (password is None):
+            raise ValueError("The webhook's username and password must be set together.")
+
+        self.handlers = list(handlers)
+        self.codec = json_codec if json_codec is not None else default_codec()
+        self.received = 0
+        self.accepted = 0
+        self.duplicates = 0
+        self.rejected = 0
+        self.invalid = 0
+        self.handled = 0
+        self.failed = 0
+        self._lock = threading.Lock()
+
+        # Compared as a whole in constant time, so verification costs the same
+        # for every request.
+        self._authorization = (
+            b"Basic " + base64.b64encode(f"{username}:{password}".encode())
+            if username is not None
+            else None
+        )
+        self._seen = TTLCache(ttl=dedupe_ttl, maxsize=dedupe_size)
+        # References of the notifications queued or being handled.
+        self._in_flight = set()
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._record_lock = threading.Lock()
+        self._record_fd = (
+            os.open(record_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o600)
+            if record_path
+            else None
+        )
+        self._workers = [
+            threading.Thread(target=self._work, daemon=True) for _ in range(workers)
+        ]
+        for worker in self._workers:
+            worker.start()
+
+    def add_handler(
+        self, handler: Callable[[TransactionNotification], None]
+    ) -> Callable[[TransactionNotification], None]:
+        """
+        Registers a function called with every new notification. Can be used as a
+        decorator.
+
+        Args:
+            handler (Callable): The function, called from a worker thread.
+
+        Returns:
+            Callable: The function, unchanged.
+        """
+        self.handlers.append(handler)
+        return handler
+
+    def handle(self, body: bytes, headers=None, block: bool = False) -> int:
+        """
+        Receives a notification posted by Kuda.
+
+        Args:
+            body (bytes): The body of the request.
+            headers: The headers of the request, a mapping.
+            block (bool): Wait for room in the queue instead of turning the
+                          notification away when it is full.
+
+        Returns:
+            int: The status code to answer Kuda with: 200 when the notification was
+            queued or already handled, 401 when the credentials are wrong, 400
+            when the body is not a notification and 503 when the queue is full or
+            the notification is being handled.
+        """
+        return self._receive(body, headers, block, record=True)
+
+    def _receive(self, body: bytes, headers, block: bool, record: bool) -> int:
+        self._count("received")
+
+        if not self._verify(headers):
+            self._count("invalid")
+            return 401
+
+        try:
+            notification = TransactionNotification.from_payload(self.codec.decode(body))
+        except ValueError:
+            self._count("invalid")
+            return 400
+
+        if record and self._record_fd is not None:
+            self._record(body)
+
+        reference = notification.transaction_reference
+        with self._lock:
+            if reference in self._in_flight:
+                # Answered once its handling succeeded or failed, on the next delivery.
+                self.rejected += 1
+                return 503
+            if self._seen.get(reference) is not None:
+                self.duplicates += 1
+                return 200
+            self._in_flight.add(reference)
+
+        try:
+            self._queue.put(notification, block=block)
+        except queue.Full:
+            # Forgotten, so the notification is handled when Kuda delivers it again
+            # after the 503.
+            with self._lock:
+                self._in_flight.discard(reference)
+                self.rejected += 1
+            return 503
+
+        self._count("accepted")
+        return 200
+
+    def _count(self, counter: str) -> None:
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def _verify(self, headers) -> bool:
+        if self._authorization is None:
+            return True
+        if headers is None:
+            return False
+        authorization = headers.get("Authorization") or headers.get("authorization")
+        return hmac.compare_digest(
+            (authorization or "").encode(), self._authorization
+        )
+
+    def _record(self, body: bytes) -> None:
+        # Raw newlines can only be whitespace in JSON, so each body fits on a line.
+        line = body.replace(b"\r", b" ").replace(b"\n", b" ") + b"\n"
+        with self._record_lock:
+            os.write(self._record_fd, line)
+
+    def _work(self) -> None:
+        while True:
+            notification = self._queue.get()
+            try:
+                if notification is _STOP:
+                    return
+                failed = 0
+                for handler in self.handlers:
+                    try:
+                        handler(notification)
+                    except Exception:
+                        failed += 1
+                        logger.exception(
+                            "Webhook handler %r failed on %s, replay the recording "
+                            "to handle it again.",
+                            handler,
+                            notification.transaction_reference,
+                        )
+                reference = notification.transaction_reference
+                with self._lock:
+                    # Only remembered once every handler succeeded, so a failed
+                    # notification is not dropped as a duplicate when replayed.
+                    if not failed:
+                        self._seen.set(reference, True)
+                    self._in_flight.discard(reference)
+                    self.failed += failed
+                    self.handled += 1
+            finally:
+                self._queue.task_done()
+
+    def replay(self, path: str) -> dict:
+        """
+        Feeds notifications recorded with record_path through the receiver, to
+        handle the ones a handler failed on or the process stopped before
+        handling, or to test handlers and measure throughput offline.
+
+        Notifications are replayed in order, waiting for room in the queue rather
+        than being turned away, and the method returns once every handler ran.
+        Notifications a handler raised on are handled again. Replayed
+        notifications are not recorded again.
+
+        Args:
+            path (str): Path of the recording, one notification body per line.
+
+        Returns:
+            dict: The number of notifications replayed per status code.
+        """
+        headers = (
+            {"Authorization": self._authorization.decode()}
+            if self._authorization is not None
+            else {}
+        )
+        statuses = {}
+        with open(path, "rb") as file:
+            for line in file:
+                if not line.strip():
+                    continue
+                status = self._receive(line, headers, block=True, record=False)
+                if status == 503:
+                    # Delivered again while being handled, retried once it was.
+                    self.join()
+                    status = self._receive(line, headers, block=True, record=False)
+                statuses[status] = statuses.get(status, 0) + 1
+        self.join()
+        return statuses
+
+    def join(self) -> None:
+        """
+        Waits until every queued notification was handled.
+        """
+        self._queue.join()
+
+    def stats(self) -> dict:
+        """
+        Returns the receiver counters.
+
+        Returns:
+            dict: The counters, and the number of notifications waiting for a worker.
+        """
+        with self._lock:
+            return {
+                "received": self.received,
+                "accepted": self.accepted,
+                "duplicates": self.duplicates,
+                "rejected": self.rejected,
+                "invalid": self.invalid,
+                "handled": self.handled,
+                "failed": self.failed,
+                "queued": self._queue.qsize(),
+            }
+
+    def server(self, host: str = "127.0.0.1", port: int = 8080) -> ThreadingHTTPServer:
+        """
+        Returns an HTTP server passing every POST to handle, for running the
+        receiver on its own. Call serve_forever on it to start serving.
+
+        Args:
+            host (str): Interface to listen on.
+            port (int): Port to listen on.
+
+        Returns:
+            ThreadingHTTPServer: The server.
+        """
+        receiver = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                length = int(self.headers.get("content-length") or 0)
+                status = receiver.handle(self.rfile.read(length), self.headers)
+                self.send_response(status)
+                self.send_header("content-length", "0")
+                self.end_headers()
+
+            def log_message(self, format, *args):
+                pass
+
+        httpd = ThreadingHTTPServer((host, port), Handler)
+        httpd.daemon_threads = True
+        return httpd
+
+    def close(self) -> None:
+        """
+        Handles the queued notifications, then stops the workers and closes the
+        recording.
+        """
+        for _ in self._workers:
+            self._queue.put(_STOP)
+        for worker in self._workers:
+            worker.join()
+        if self._record_fd is not None:
+            with self._record_lock:
+                os.close(self._record_fd)
+                self._record_fd = None
+
+    def __enter__(self) -> "WebhookReceiver":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
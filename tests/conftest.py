@@ -0,0 +1,100 @@
+import os
+import sys
+from http import HTTPStatus
+from urllib.parse import urlsplit
+
+import pytest
+import requests
+from requests.structures import CaseInsensitiveDict
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# The package is not installed, it is imported from src like in the benchmarks.
+sys.path[:0] = [os.path.join(ROOT, "src"), os.path.join(ROOT, "benchmarks")]
+
+from harness import StubAdapter  # noqa: E402
+
+from pykuda.classes.retry_policy import RetryPolicy  # noqa: E402
+from pykuda.fake_server import REQUEST_PATH, FakeKudaServer  # noqa: E402
+from pykuda.pykuda import PyKuda  # noqa: E402
+
+
+class ScriptedAdapter(StubAdapter):
+    """
+    A StubAdapter that answers API requests from a script before handing them to
+    the FakeKudaServer. Each step of the script is a status code, answered with an
+    empty body, or an exception, raised instead of answering.
+
+    Attributes:
+        script (list): The steps left, used up one per API request.
+        sent (int): Number of API requests that reached the adapter.
+    """
+
+    def __init__(self, server: FakeKudaServer):
+        super().__init__(server)
+        self.script = []
+        self.sent = 0
+
+    def send(self, request, **kwargs):
+        if urlsplit(request.url).path != REQUEST_PATH:
+            return super().send(request, **kwargs)
+
+        self.sent += 1
+        if not self.script:
+            return super().send(request, **kwargs)
+
+        step = self.script.pop(0)
+        if isinstance(step, Exception):
+            raise step
+
+        response = requests.Response()
+        response.status_code = step
+        response.reason = HTTPStatus(step).phrase
+        response.headers = CaseInsensitiveDict({"content-type": "application/json"})
+        response._content = b"{}"
+        response.url = request.url
+        response.request = request
+        return response
+
+
+@pytest.fixture
+def server():
+    server = FakeKudaServer()
+    yield server
+    server.httpd.server_close()
+
+
+@pytest.fixture
+def adapter(server):
+    return ScriptedAdapter(server)
+
+
+@pytest.fixture
+def make_kuda(server, adapter):
+    """Returns a factory of PyKuda clients answered in-process by the adapter."""
+    clients = []
+
+    def make(**options):
+        session = requests.Session()
+        session.mount("http://", adapter)
+        options.setdefault("retry_policy", RetryPolicy(backoff=0))
+        client = PyKuda(server.credentials, session=session, **options)
+        clients.append(client)
+        return client
+
+    yield make
+    for client in clients:
+        client.close()
+
+
+@pytest.fixture
+def kuda(make_kuda):
+    return make_kuda()
+
+
+@pytest.fixture
+def tracking_reference(kuda):
+    """The tracking reference of a virtual account created on the fake server."""
+    response = kuda.create_virtual_account(
+        "Ada", "Obi", "08012345678", "ada@example.com", 1, "https://example.com/ada.png"
+    )
+    return response.data["tracking_reference"]
@@ -0,0 +1,121 @@
+import pytest
+
+from pykuda.classes.circuit_breaker import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    CircuitBreaker,
+    CircuitOpenError,
+)
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return Clock()
+
+
+@pytest.fixture
+def breaker(clock):
+    return CircuitBreaker(
+        "fund",
+        failure_threshold=0.5,
+        minimum_requests=4,
+        window=10,
+        reset_timeout=30,
+        half_open_probes=1,
+        clock=clock,
+    )
+
+
+def fail(breaker: CircuitBreaker, times: int) -> None:
+    for _ in range(times):
+        breaker.before_request()
+        breaker.record(failed=True)
+
+
+def test_stays_closed_below_minimum_requests(breaker):
+    fail(breaker, 3)
+
+    assert breaker.state == CLOSED
+
+
+def test_opens_when_failures_reach_the_threshold(breaker):
+    breaker.before_request()
+    breaker.record(failed=False)
+    breaker.before_request()
+    breaker.record(failed=False)
+    fail(breaker, 2)
+
+    assert breaker.state == OPEN
+
+
+def test_failures_outside_the_window_are_forgotten(breaker, clock):
+    fail(breaker, 3)
+    clock.now += 11
+    breaker.before_request()
+    breaker.record(failed=True)
+
+    assert breaker.state == CLOSED
+    assert breaker.snapshot()["failures"] == 1
+
+
+def test_open_circuit_fails_fast(breaker, clock):
+    fail(breaker, 4)
+    clock.now += 10
+
+    with pytest.raises(CircuitOpenError) as raised:
+        breaker.before_request()
+
+    assert raised.value.name == "fund"
+    assert raised.value.retry_after == 20
+    assert breaker.rejected == 1
+
+
+def test_half_open_after_reset_timeout(breaker, clock):
+    fail(breaker, 4)
+    clock.now += 30
+
+    assert breaker.state == HALF_OPEN
+    breaker.before_request()
+    with pytest.raises(CircuitOpenError) as raised:
+        breaker.before_request()
+    assert raised.value.retry_after == 0
+    assert breaker.rejected == 1
+
+
+def test_successful_probe_closes_the_circuit(breaker, clock):
+    fail(breaker, 4)
+    clock.now += 30
+    breaker.before_request()
+    breaker.record(failed=False)
+
+    assert breaker.state == CLOSED
+    assert breaker.snapshot()["requests"] == 0
+
+
+def test_failed_probe_opens_the_circuit_again(breaker, clock):
+    fail(breaker, 4)
+    clock.now += 30
+    breaker.before_request()
+    breaker.record(failed=True)
+
+    assert breaker.state == OPEN
+    assert breaker.snapshot()["retry_after"] == 30
+
+
+def test_call_records_server_errors_as_failures(breaker):
+    class Response:
+        status_code = 503
+
+    for _ in range(4):
+        assert breaker.call(Response).status_code == 503
+
+    assert breaker.state == OPEN
@@ -0,0 +1,81 @@
+import pytest
+
+from pykuda.classes.journal import SUCCEEDED, Journal
+from pykuda.classes.ledger import Ledger
+from pykuda.classes.results import Balance
+from pykuda.constants import ServiceTypeConstants
+
+
+def fund_request(kuda, tracking_reference: str, amount: str) -> dict:
+    data = kuda._generate_common_data(
+        ServiceTypeConstants.FUND_VIRTUAL_ACCOUNT.value, tracking_reference
+    )
+    data["Data"].update({"amount": amount, "narration": "top up"})
+    return data
+
+
+@pytest.fixture
+def crashed_journal(kuda, tracking_reference, tmp_path):
+    """
+    A journal left by a crash: the first request was processed by Kuda and the
+    second was never sent, neither has an outcome.
+    """
+    path = str(tmp_path / "journal.log")
+    journal = Journal(path)
+    processed = fund_request(kuda, tracking_reference, "500")
+    journal.record_request(processed, "500", None, tracking_reference)
+    kuda._request(processed)
+    unsent = fund_request(kuda, tracking_reference, "700")
+    journal.record_request(unsent, "700", None, tracking_reference)
+    journal.close()
+    return path, processed["requestref"], unsent["requestref"]
+
+
+def balance(kuda, tracking_reference: str) -> int:
+    response = kuda.virtual_account_balance(tracking_reference, use_cache=False)
+    return response.data.available
+
+
+def test_notified_requests_are_resolved(
+    make_kuda, server, tracking_reference, crashed_journal
+):
+    path, processed, unsent = crashed_journal
+    ledger = Ledger()
+    ledger.set(tracking_reference, Balance(0, 0, 0))
+    kuda = make_kuda(journal=Journal(path), ledger=ledger)
+    before = balance(kuda, tracking_reference)
+
+    results = {
+        entry["requestref"]: response
+        for entry, response in kuda.recover_journal(notifications=server.notifications)
+    }
+
+    assert not results[processed].error
+    assert results[unsent].status_code == 0
+    assert isinstance(results[unsent].data, LookupError)
+    assert [entry["requestref"] for entry in kuda.journal.in_doubt()] == [unsent]
+    assert kuda.journal.entries()[processed]["state"] == SUCCEEDED
+    assert ledger.stale() == [tracking_reference]
+    assert balance(kuda, tracking_reference) == before
+
+
+def test_requests_in_doubt_can_be_resent(
+    make_kuda, server, tracking_reference, crashed_journal
+):
+    path, processed, unsent = crashed_journal
+    kuda = make_kuda(journal=Journal(path))
+    before = balance(kuda, tracking_reference)
+
+    summary = kuda.recover_journal(
+        notifications=server.notifications, resend=True
+    ).wait()
+
+    assert summary.succeeded == 2
+    assert kuda.journal.in_doubt() == []
+    assert balance(kuda, tracking_reference) == before + 700
+    assert kuda.journal.compact() == 0
+
+
+def test_recovery_needs_a_journal(kuda):
+    with pytest.raises(ValueError):
+        kuda.recover_journal()
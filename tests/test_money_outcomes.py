@@ -0,0 +1,116 @@
+import pytest
+import requests
+
+from pykuda.classes.circuit_breaker import CircuitBreakers, CircuitOpenError
+from pykuda.classes.journal import DECLINED, SUCCEEDED, UNKNOWN, Journal
+from pykuda.classes.ledger import Ledger
+from pykuda.classes.py_kuda_response import ErrorResponse, PyKudaResponse
+from pykuda.classes.results import Balance
+from pykuda.classes.service_type import ServiceType
+
+
+def error(status_code: int) -> PyKudaResponse:
+    return PyKudaResponse(status_code, ErrorResponse(status_code), error=True)
+
+
+@pytest.mark.parametrize(
+    "response, sent, outcome",
+    [
+        (PyKudaResponse(200, {"transaction_reference": "t"}), True, SUCCEEDED),
+        (error(200), True, DECLINED),
+        (error(400), True, DECLINED),
+        (error(429), True, DECLINED),
+        (error(500), True, UNKNOWN),
+        (error(504), True, UNKNOWN),
+        (None, True, UNKNOWN),
+        (None, False, DECLINED),
+        (error(500), False, DECLINED),
+    ],
+)
+def test_outcome(response, sent, outcome):
+    assert ServiceType._outcome(response, sent) == outcome
+
+
+@pytest.fixture
+def journal(tmp_path):
+    journal = Journal(str(tmp_path / "journal.log"))
+    yield journal
+    journal.close()
+
+
+def last_state(journal: Journal) -> str:
+    (entry,) = journal.entries().values()
+    return entry["state"]
+
+
+def test_processed_request_moves_the_ledger(
+    make_kuda, journal, tracking_reference
+):
+    ledger = Ledger()
+    ledger.set(tracking_reference, Balance(1000, 1000, 1000))
+    kuda = make_kuda(journal=journal, ledger=ledger)
+
+    kuda.fund_virtual_account(tracking_reference, "500", "top up")
+
+    assert last_state(journal) == SUCCEEDED
+    assert ledger.get(tracking_reference).available == 1500
+
+
+def test_timed_out_request_is_in_doubt(
+    make_kuda, adapter, journal, tracking_reference
+):
+    ledger = Ledger()
+    ledger.set(tracking_reference, Balance(1000, 1000, 1000))
+    kuda = make_kuda(journal=journal, ledger=ledger)
+    adapter.script = [requests.exceptions.ReadTimeout()]
+
+    with pytest.raises(requests.exceptions.ReadTimeout):
+        kuda.fund_virtual_account(tracking_reference, "500", "top up")
+
+    assert last_state(journal) == UNKNOWN
+    assert ledger.get(tracking_reference) is None
+    assert ledger.stale() == [tracking_reference]
+
+
+def test_request_stopped_by_an_open_circuit_is_declined(
+    make_kuda, adapter, journal, tracking_reference
+):
+    ledger = Ledger()
+    ledger.set(tracking_reference, Balance(1000, 1000, 1000))
+    breakers = CircuitBreakers(minimum_requests=1, failure_threshold=0.5)
+    kuda = make_kuda(journal=journal, ledger=ledger, circuit_breakers=breakers)
+    adapter.script = [503]
+    kuda.fund_virtual_account(tracking_reference, "1", "trips the breaker")
+    sent = adapter.sent
+
+    with pytest.raises(CircuitOpenError):
+        kuda.fund_virtual_account(tracking_reference, "500", "top up")
+
+    assert adapter.sent == sent
+    assert [entry["state"] for entry in journal.entries().values()] == [
+        UNKNOWN,
+        DECLINED,
+    ]
+
+
+def test_request_without_a_token_is_declined(
+    make_kuda, journal, tracking_reference, monkeypatch
+):
+    ledger = Ledger()
+    ledger.set(tracking_reference, Balance(1000, 1000, 1000))
+    kuda = make_kuda(journal=journal, ledger=ledger)
+    token_failure = ErrorResponse(500, b"token service down")
+    monkeypatch.setattr(kuda, "_generate_headers", lambda: token_failure)
+
+    response = kuda.fund_virtual_account(tracking_reference, "500", "top up")
+
+    assert response.error
+    assert last_state(journal) == DECLINED
+    assert ledger.get(tracking_reference).available == 1000
+
+
+def test_closed_journal_rejects_requests(journal):
+    journal.close()
+
+    with pytest.raises(ValueError, match="journal is closed"):
+        journal.record_outcome("ref", SUCCEEDED)
@@ -0,0 +1,61 @@
+from pykuda.classes.provisioning_checkpoint import ProvisioningCheckpoint
+
+
+def record(number: int) -> dict:
+    return {
+        "first_name": f"Ada{number}",
+        "last_name": "Obi",
+        "phone_number": f"0801234{number:04}",
+        "email": f"ada{number}@example.com",
+        "verification_type": 1,
+        "face_image_url": "https://example.com/ada.png",
+    }
+
+
+def test_resumed_run_skips_created_accounts(kuda, server, tmp_path):
+    path = str(tmp_path / "onboarding.ckpt")
+    records = [record(number) for number in range(3)]
+
+    first = kuda.create_virtual_accounts(records, checkpoint=path).wait()
+    second = kuda.create_virtual_accounts(records, checkpoint=path).wait()
+
+    assert first.succeeded == 3
+    assert second.skipped == 3
+    assert len(server.accounts) == 3
+
+
+def test_interrupted_creation_is_looked_up_not_repeated(kuda, server, tmp_path):
+    path = str(tmp_path / "onboarding.ckpt")
+    records = [record(number) for number in range(3)]
+    kuda.create_virtual_accounts(records[:1], checkpoint=path).wait()
+
+    # A crash after Kuda created the second account, before its outcome was written.
+    checkpoint = ProvisioningCheckpoint(path)
+    tracking_reference, attempted = checkpoint.start(records[1])
+    checkpoint.close()
+    assert not attempted
+    kuda.create_virtual_account(**records[1], tracking_reference=tracking_reference)
+
+    run = kuda.create_virtual_accounts(records, checkpoint=path)
+    responses = {record["first_name"]: response for record, response in run}
+
+    assert run.summary.skipped == 1
+    assert run.summary.succeeded == 2
+    assert responses["Ada1"].data["tracking_reference"] == tracking_reference
+    assert len(server.accounts) == 3
+
+    checkpoint = ProvisioningCheckpoint(path)
+    assert all(checkpoint.is_created(record) for record in records)
+    checkpoint.close()
+
+
+def test_repeated_record_is_created_once(kuda, server, tmp_path):
+    path = str(tmp_path / "onboarding.ckpt")
+
+    summary = kuda.create_virtual_accounts(
+        [record(0), record(0)], checkpoint=path
+    ).wait()
+
+    assert summary.succeeded == 1
+    assert summary.skipped == 1
+    assert len(server.accounts) == 1
@@ -0,0 +1,84 @@
+import pytest
+import requests
+from urllib3.exceptions import MaxRetryError, NewConnectionError
+
+from pykuda.classes.retry_policy import MONEY_RETRY, RetryPolicy
+
+
+def connection_refused() -> requests.exceptions.ConnectionError:
+    reason = NewConnectionError(None, "Connection refused")
+    return requests.exceptions.ConnectionError(MaxRetryError(None, "/", reason))
+
+
+def test_unprocessed_only_keeps_statuses_kuda_did_not_process():
+    policy = RetryPolicy(statuses=(429, 500, 503)).unprocessed_only()
+
+    assert policy.statuses == (429,)
+    assert not policy.retry_timeouts
+    assert policy.retry_unsent
+    assert MONEY_RETRY.statuses == (429,)
+
+
+def test_reads_are_retried_on_server_errors(kuda, adapter):
+    adapter.script = [503, 500]
+
+    response = kuda.main_account_balance(use_cache=False)
+
+    assert not response.error
+    assert response.retries == 2
+    assert adapter.sent == 3
+
+
+def test_money_is_not_resent_after_a_server_error(kuda, adapter, tracking_reference):
+    adapter.script = [503]
+    sent = adapter.sent
+
+    response = kuda.fund_virtual_account(tracking_reference, "500", "top up")
+
+    assert response.error
+    assert response.status_code == 503
+    assert response.retries == 0
+    assert adapter.sent == sent + 1
+
+
+def test_money_is_resent_when_rate_limited(kuda, adapter, tracking_reference):
+    adapter.script = [429]
+    sent = adapter.sent
+
+    response = kuda.fund_virtual_account(tracking_reference, "500", "top up")
+
+    assert not response.error
+    assert response.retries == 1
+    assert adapter.sent == sent + 2
+
+
+def test_money_is_not_resent_after_a_timeout(kuda, adapter, tracking_reference):
+    adapter.script = [requests.exceptions.ReadTimeout()]
+    sent = adapter.sent
+
+    with pytest.raises(requests.exceptions.ReadTimeout):
+        kuda.fund_virtual_account(tracking_reference, "500", "top up")
+    assert adapter.sent == sent + 1
+
+
+def test_money_is_resent_when_the_connection_was_refused(
+    kuda, adapter, tracking_reference
+):
+    adapter.script = [connection_refused()]
+    sent = adapter.sent
+
+    response = kuda.fund_virtual_account(tracking_reference, "500", "top up")
+
+    assert not response.error
+    assert response.retries == 1
+    assert adapter.sent == sent + 2
+
+
+def test_retries_stop_after_max_attempts(make_kuda, adapter):
+    kuda = make_kuda(retry_policy=RetryPolicy(max_attempts=2, backoff=0))
+    adapter.script = [503, 503, 503]
+
+    response = kuda.main_account_balance(use_cache=False)
+
+    assert response.status_code == 503
+    assert response.retries == 1